@@ -4,7 +4,7 @@ Configuração do Django Admin para o SGEA
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
-from .models import Usuario, Evento, Inscricao, Certificado, Auditoria
+from .models import Usuario, Evento, EventoExcluido, Inscricao, ListaEspera, Certificado, Auditoria, EmailPendente
 
 
 @admin.register(Usuario)
@@ -41,6 +41,7 @@ class EventoAdmin(admin.ModelAdmin):
         "vagas_display", "organizador", "ativo_badge"
     ]
     list_filter = ["tipo", "ativo", "data_inicial", "data_criacao"]
+    list_select_related = ["organizador"]
     search_fields = ["nome", "descricao", "local"]
     date_hierarchy = "data_inicial"
     ordering = ["-data_inicial"]
@@ -56,7 +57,7 @@ class EventoAdmin(admin.ModelAdmin):
             )
         }),
         ("Local e Capacidade", {
-            "fields": ("local", "vagas_totais")
+            "fields": ("local", "vagas_totais", "inscritos_ativos")
         }),
         ("Organização", {
             "fields": ("organizador",)
@@ -67,10 +68,10 @@ class EventoAdmin(admin.ModelAdmin):
         }),
     )
     
-    readonly_fields = ["data_criacao", "data_atualizacao"]
+    readonly_fields = ["data_criacao", "data_atualizacao", "inscritos_ativos"]
     
     def vagas_display(self, obj):
-        inscritos = obj.inscricoes.filter(ativa=True).count()
+        inscritos = obj.inscritos_ativos
         percentual = (inscritos / obj.vagas_totais) * 100 if obj.vagas_totais > 0 else 0
         
         if percentual >= 90:
@@ -80,9 +81,10 @@ class EventoAdmin(admin.ModelAdmin):
         else:
             color = "green"
         
+        # format_html escapa os argumentos, então o número já vai formatado
         return format_html(
-            '<span style="color: {};">{}/{} ({:.0f}%)</span>',
-            color, inscritos, obj.vagas_totais, percentual
+            '<span style="color: {};">{}/{} ({}%)</span>',
+            color, inscritos, obj.vagas_totais, f"{percentual:.0f}"
         )
     vagas_display.short_description = "Vagas"
     
@@ -110,6 +112,8 @@ class InscricaoAdmin(admin.ModelAdmin):
         "usuario__email", "evento__nome"
     ]
     date_hierarchy = "data_inscricao"
+    # certificado (relação reversa 1-1) vem no mesmo JOIN para tem_certificado
+    list_select_related = ["usuario", "evento", "certificado"]
     ordering = ["-data_inscricao"]
     
     fieldsets = (
@@ -150,26 +154,55 @@ class InscricaoAdmin(admin.ModelAdmin):
     tem_certificado.short_description = "Certificado"
 
 
+@admin.register(EventoExcluido)
+class EventoExcluidoAdmin(admin.ModelAdmin):
+    """Admin para o registro de eventos excluídos (sincronização da API)"""
+    list_display = ["evento_id", "data_exclusao"]
+    date_hierarchy = "data_exclusao"
+    ordering = ["-data_exclusao"]
+    readonly_fields = ["evento_id", "data_exclusao"]
+
+
+@admin.register(ListaEspera)
+class ListaEsperaAdmin(admin.ModelAdmin):
+    """Admin para o modelo ListaEspera"""
+    list_display = [
+        "usuario", "evento", "status", "data_entrada",
+        "data_promocao", "notificado"
+    ]
+    list_filter = ["status", "notificado", "data_entrada"]
+    search_fields = [
+        "usuario__first_name", "usuario__last_name",
+        "usuario__email", "evento__nome"
+    ]
+    list_select_related = ["usuario", "evento"]
+    date_hierarchy = "data_entrada"
+    ordering = ["evento", "data_entrada"]
+    readonly_fields = ["data_promocao", "notificado"]
+
+
 @admin.register(Certificado)
 class CertificadoAdmin(admin.ModelAdmin):
     """Admin para o modelo Certificado"""
     list_display = [
         "codigo_verificacao", "participante_nome",
-        "evento_nome", "data_emissao", "emitido_por_nome"
+        "evento_nome", "data_emissao", "emitido_por_nome", "revogado"
     ]
-    list_filter = ["data_emissao", "inscricao__evento__tipo"]
+    list_filter = ["revogado", "data_emissao", "inscricao__evento__tipo"]
     search_fields = [
         "codigo_verificacao",
+        "codigo_legado",
         "inscricao__usuario__first_name",
         "inscricao__usuario__last_name",
         "inscricao__evento__nome"
     ]
+    list_select_related = ["inscricao__usuario", "inscricao__evento", "emitido_por"]
     date_hierarchy = "data_emissao"
     ordering = ["-data_emissao"]
     
     fieldsets = (
         ("Certificado", {
-            "fields": ("inscricao", "codigo_verificacao", "emitido_por")
+            "fields": ("inscricao", "codigo_verificacao", "codigo_legado", "emitido_por", "revogado")
         }),
         ("Arquivo", {
             "fields": ("arquivo_pdf",)
@@ -180,7 +213,18 @@ class CertificadoAdmin(admin.ModelAdmin):
         }),
     )
     
-    readonly_fields = ["codigo_verificacao", "data_emissao"]
+    readonly_fields = ["codigo_verificacao", "codigo_legado", "data_emissao"]
+    actions = ["revogar_certificados"]
+    
+    def revogar_certificados(self, request, queryset):
+        # save() individual para disparar a invalidação do cache de validação
+        total = 0
+        for certificado in queryset.filter(revogado=False):
+            certificado.revogado = True
+            certificado.save(update_fields=["revogado"])
+            total += 1
+        self.message_user(request, f"{total} certificado(s) revogado(s).")
+    revogar_certificados.short_description = "Revogar certificados selecionados"
     
     def participante_nome(self, obj):
         return obj.inscricao.usuario.get_full_name()
@@ -203,6 +247,7 @@ class AuditoriaAdmin(admin.ModelAdmin):
     ]
     list_filter = ["acao", "data_hora"]
     search_fields = ["descricao", "usuario__username", "ip_address"]
+    list_select_related = ["usuario"]
     date_hierarchy = "data_hora"
     ordering = ["-data_hora"]
     readonly_fields = ["usuario", "acao", "descricao", "ip_address", "data_hora", "dados_adicionais"]
@@ -237,6 +282,26 @@ class AuditoriaAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(EmailPendente)
+class EmailPendenteAdmin(admin.ModelAdmin):
+    """Admin para a caixa de saída de emails"""
+    list_display = [
+        "id", "tipo", "objeto_id", "status", "tentativas",
+        "proxima_tentativa", "data_criacao", "data_envio"
+    ]
+    list_filter = ["status", "tipo", "data_criacao"]
+    date_hierarchy = "data_criacao"
+    ordering = ["-id"]
+    readonly_fields = [
+        "tipo", "objeto_id", "tentativas", "lote", "ultimo_erro",
+        "data_criacao", "data_envio"
+    ]
+    
+    def has_add_permission(self, request):
+        """Emails entram na fila apenas pelo sistema"""
+        return False
+
+
 # Personalização do Admin Site
 admin.site.site_header = "SGEA - Administração"
 admin.site.site_title = "SGEA Admin"
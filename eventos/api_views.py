@@ -4,14 +4,21 @@ Views da API REST do SGEA
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.utils import timezone
-from .models import Evento, Inscricao, Auditoria
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.core.exceptions import ValidationError as DjangoValidationError
+from .autocompletar import LIMITE_PADRAO, sugerir
+from .busca import buscar_eventos
+from .models import Usuario, Evento, Inscricao, ListaEspera, Auditoria
 from .serializers import (
     EventoListSerializer, EventoDetailSerializer,
-    InscricaoCreateSerializer, InscricaoListSerializer
+    InscricaoCreateSerializer, InscricaoListSerializer, InscricaoLoteSerializer,
+    ListaEsperaCreateSerializer, ListaEsperaSerializer
 )
-from .throttles import EventosListThrottle, InscricoesCreateThrottle
+from .sincronizacao import TokenInvalido, alteracoes_desde
+from .throttles import EventosAutocompletarThrottle, EventosChangesThrottle, EventosListThrottle, InscricoesCreateThrottle
 
 
 def get_client_ip(request):
@@ -35,15 +42,21 @@ class EventoAPIViewSet(viewsets.ReadOnlyModelViewSet):
     """
     permission_classes = [IsAuthenticated]
     throttle_classes = [EventosListThrottle]
+    ordenacao_cursor = ('data_inicial', 'horario_inicio', 'id')
+    lookup_value_regex = r'\d+'
     
     def get_queryset(self):
         """
-        Retorna apenas eventos ativos e futuros
+        Retorna apenas eventos ativos e futuros; na listagem, ?q= filtra
+        pela busca textual e ordena por relevância
         """
-        return Evento.objects.filter(
+        queryset = Evento.objects.with_seat_stats().filter(
             ativo=True,
             data_inicial__gte=timezone.now().date()
         ).select_related('organizador', 'professor_responsavel')
+        if self.action == 'list':
+            queryset = buscar_eventos(queryset, self.request.query_params.get('q'))
+        return queryset
     
     def get_serializer_class(self):
         """
@@ -74,9 +87,32 @@ class EventoAPIViewSet(viewsets.ReadOnlyModelViewSet):
     
     def retrieve(self, request, *args, **kwargs):
         """
-        Detalhes de evento com registro de auditoria
+        Detalhes de evento com registro de auditoria.
+        
+        ETag e Last-Modified vêm de data_atualizacao (que também avança a
+        cada inscrição ou cancelamento); se o cliente já tem a versão atual,
+        responde 304 sem executar o serializer.
         """
-        response = super().retrieve(request, *args, **kwargs)
+        data_atualizacao = self.get_queryset().filter(
+            pk=kwargs.get('pk')
+        ).values_list('data_atualizacao', flat=True).first()
+        
+        response = etag = None
+        if data_atualizacao is not None:
+            # O corpo varia com o formato (JSON ou API navegável)
+            etag = quote_etag(
+                f'evento-{kwargs.get("pk")}-{data_atualizacao.timestamp()}-{request.accepted_renderer.format}'
+            )
+            response = get_conditional_response(
+                request, etag=etag, last_modified=int(data_atualizacao.timestamp())
+            )
+        
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        
+        if etag is not None:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(data_atualizacao.timestamp())
         
         # Registra auditoria
         Auditoria.registrar(
@@ -90,6 +126,53 @@ class EventoAPIViewSet(viewsets.ReadOnlyModelViewSet):
         )
         
         return response
+    
+    @action(detail=False, methods=['get'], throttle_classes=[EventosChangesThrottle])
+    def changes(self, request):
+        """
+        Sincronização incremental: eventos criados, alterados, desativados ou
+        excluídos desde o token (?since=) devolvido pela chamada anterior.
+        Sem token, devolve o catálogo ativo completo em páginas.
+        """
+        try:
+            eventos, removidos, token, mais = alteracoes_desde(request.query_params.get('since'))
+        except TokenInvalido as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Registra auditoria
+        Auditoria.registrar(
+            usuario=request.user,
+            acao='API_CONSULTA',
+            descricao='Sincronização de eventos via API',
+            ip_address=get_client_ip(request),
+            dados_adicionais={
+                'alterados': len(eventos),
+                'removidos': len(removidos)
+            }
+        )
+        
+        return Response({
+            'eventos': EventoListSerializer(eventos, many=True).data,
+            'removidos': removidos,
+            'since': token,
+            'mais': mais,
+        })
+    
+    @action(
+        detail=False, methods=['get'],
+        permission_classes=[AllowAny], throttle_classes=[EventosAutocompletarThrottle]
+    )
+    def autocompletar(self, request):
+        """
+        Sugestões de nome e local para a caixa de busca (?q=prefixo,
+        ?limite=), respondidas pelo índice em memória sem consultar o banco.
+        Sem auditoria: é chamado a cada tecla digitada.
+        """
+        try:
+            limite = int(request.query_params.get('limite', LIMITE_PADRAO))
+        except ValueError:
+            limite = LIMITE_PADRAO
+        return Response(sugerir(request.query_params.get('q', ''), max(1, limite)))
 
 
 class InscricaoAPIViewSet(viewsets.ModelViewSet):
@@ -102,6 +185,7 @@ class InscricaoAPIViewSet(viewsets.ModelViewSet):
     """
     permission_classes = [IsAuthenticated]
     serializer_class = InscricaoListSerializer
+    ordenacao_cursor = ('-data_inscricao', '-id')
     
     def get_queryset(self):
         """
@@ -118,13 +202,16 @@ class InscricaoAPIViewSet(viewsets.ModelViewSet):
         """
         if self.action == 'create':
             return InscricaoCreateSerializer
+        if self.action == 'lote':
+            return InscricaoLoteSerializer
         return InscricaoListSerializer
     
     def get_throttles(self):
         """
-        Aplica throttle apenas para criação de inscrições
+        Aplica throttle apenas para criação de inscrições (uma chamada em
+        lote conta como uma requisição)
         """
-        if self.action == 'create':
+        if self.action in ('create', 'lote'):
             return [InscricoesCreateThrottle()]
         return []
     
@@ -156,6 +243,81 @@ class InscricaoAPIViewSet(viewsets.ModelViewSet):
             headers=headers
         )
     
+    @action(detail=False, methods=['post'])
+    def lote(self, request):
+        """
+        Inscrições em lote, com resultado por item.
+        
+        Usuários e eventos são carregados com uma consulta cada; regras,
+        vagas e gravação ficam em Inscricao.reservar_em_lote (uma transação).
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        dados = serializer.validated_data
+        
+        if dados.get('eventos'):
+            pares_ids = [(request.user.pk, evento_id) for evento_id in dados['eventos']]
+        else:
+            pares_ids = [(item['usuario'], item['evento']) for item in dados['itens']]
+        
+        usuarios = Usuario.objects.in_bulk({usuario_id for usuario_id, _ in pares_ids})
+        # Eventos desativados contam como inexistentes, como na inscrição individual
+        eventos = Evento.objects.filter(ativo=True).with_seat_stats().in_bulk(
+            {evento_id for _, evento_id in pares_ids}
+        )
+        
+        resultados = [None] * len(pares_ids)
+        pares, indices = [], []
+        for indice, (usuario_id, evento_id) in enumerate(pares_ids):
+            evento = eventos.get(evento_id)
+            if evento is None:
+                resultados[indice] = (None, 'Evento não encontrado.')
+            elif usuario_id not in usuarios:
+                resultados[indice] = (None, 'Usuário não encontrado.')
+            elif usuario_id != request.user.pk and evento.organizador_id != request.user.pk and not request.user.is_staff:
+                resultados[indice] = (None, 'Apenas o organizador do evento pode inscrever outros usuários.')
+            else:
+                pares.append((usuarios[usuario_id], evento))
+                indices.append(indice)
+        
+        try:
+            reservados = Inscricao.reservar_em_lote(pares, notificar=dados['notificar'])
+        except DjangoValidationError as e:
+            return Response({'detail': ' '.join(e.messages)}, status=status.HTTP_409_CONFLICT)
+        
+        for indice, resultado in zip(indices, reservados):
+            resultados[indice] = resultado
+        
+        itens = [
+            {
+                'usuario': usuario_id,
+                'evento': evento_id,
+                'inscricao': inscricao.pk if inscricao else None,
+                'status': 'inscrito' if inscricao else 'recusado',
+                'erro': erro,
+            }
+            for (usuario_id, evento_id), (inscricao, erro) in zip(pares_ids, resultados)
+        ]
+        total_inscritos = sum(1 for item in itens if item['inscricao'])
+        
+        # Registra auditoria (as inscrições já foram auditadas em lote)
+        Auditoria.registrar(
+            usuario=request.user,
+            acao='API_INSCRICAO',
+            descricao=f'Inscrição em lote via API: {total_inscritos} de {len(itens)} item(ns)',
+            ip_address=get_client_ip(request),
+            dados_adicionais={
+                'total_itens': len(itens),
+                'total_inscritos': total_inscritos
+            }
+        )
+        
+        return Response({
+            'total_inscritos': total_inscritos,
+            'total_recusados': len(itens) - total_inscritos,
+            'resultados': itens,
+        })
+    
     def destroy(self, request, *args, **kwargs):
         """
         Cancela uma inscrição
@@ -173,3 +335,69 @@ class InscricaoAPIViewSet(viewsets.ModelViewSet):
         inscricao.cancelar()
         
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ListaEsperaAPIViewSet(viewsets.ModelViewSet):
+    """
+    API ViewSet para a lista de espera de eventos lotados
+    
+    list: Lista as entradas do usuário autenticado (aguardando e promovidas)
+    create: Entra na fila de espera de um evento
+    destroy: Sai da fila de espera
+    """
+    permission_classes = [IsAuthenticated]
+    http_method_names = ['get', 'post', 'delete', 'head', 'options']
+    
+    def get_queryset(self):
+        """
+        Retorna apenas as entradas do usuário autenticado
+        """
+        return ListaEspera.objects.filter(
+            usuario=self.request.user,
+            status__in=['AGUARDANDO', 'PROMOVIDO']
+        ).select_related('evento', 'evento__organizador')
+    
+    def get_serializer_class(self):
+        """
+        Retorna o serializer apropriado
+        """
+        if self.action == 'create':
+            return ListaEsperaCreateSerializer
+        return ListaEsperaSerializer
+    
+    def get_throttles(self):
+        """
+        Entrar na fila conta no mesmo limite das inscrições
+        """
+        if self.action == 'create':
+            return [InscricoesCreateThrottle()]
+        return []
+    
+    def create(self, request, *args, **kwargs):
+        """
+        Entra na fila e devolve a posição (ou a promoção imediata)
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        
+        return Response(
+            ListaEsperaSerializer(serializer.instance).data,
+            status=status.HTTP_201_CREATED
+        )
+    
+    def destroy(self, request, *args, **kwargs):
+        """
+        Sai da fila de espera
+        """
+        entrada = self.get_object()
+        
+        if entrada.status != 'AGUARDANDO':
+            return Response(
+                {'detail': 'Esta entrada não está mais aguardando vaga.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        entrada.desistir()
+        
+        return Response(status=status.HTTP_204_NO_CONTENT)
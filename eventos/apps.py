@@ -1,4 +1,6 @@
 from django.apps import AppConfig
+from django.core import checks
+from django.db.models.signals import post_migrate
 
 
 class EventosConfig(AppConfig):
@@ -11,3 +13,50 @@ class EventosConfig(AppConfig):
         Importa os signals quando o app estiver pronto
         """
         import eventos.signals
+        
+        post_migrate.connect(garantir_indice_busca, sender=self)
+        checks.register(verificar_chave_certificados)
+        checks.register(verificar_chave_certificados_producao, checks.Tags.security, deploy=True)
+
+
+def garantir_indice_busca(sender, using, **kwargs):
+    """
+    Recria os triggers de busca textual se uma migration tiver reconstruído
+    a tabela de eventos (o SQLite descarta os triggers nesse caso)
+    """
+    from django.db import connections
+    from eventos.busca import garantir_indice
+    
+    garantir_indice(connections[using])
+
+
+def verificar_chave_certificados(app_configs, **kwargs):
+    """
+    Sem CERTIFICADO_CHAVE_ASSINATURA nenhum certificado pode ser emitido ou
+    validado
+    """
+    from django.conf import settings
+    
+    if getattr(settings, 'CERTIFICADO_CHAVE_ASSINATURA', None):
+        return []
+    return [checks.Error(
+        'CERTIFICADO_CHAVE_ASSINATURA não está definida.',
+        hint='Defina uma chave própria, independente da SECRET_KEY.',
+        id='eventos.E001',
+    )]
+
+
+def verificar_chave_certificados_producao(app_configs, **kwargs):
+    """
+    Recusa a chave de exemplo do settings no check --deploy
+    """
+    from django.conf import settings
+    
+    chave = getattr(settings, 'CERTIFICADO_CHAVE_ASSINATURA', None) or ''
+    if str(chave).startswith('django-insecure'):
+        return [checks.Error(
+            'CERTIFICADO_CHAVE_ASSINATURA ainda usa a chave de exemplo.',
+            hint='Defina uma chave própria antes de emitir certificados em produção.',
+            id='eventos.E002',
+        )]
+    return []
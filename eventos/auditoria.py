@@ -0,0 +1,155 @@
+"""
+Buffer em memória para gravação em lote dos registros de auditoria
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+# Enviado após cada lote gravado pelo buffer, com os registros gravados
+# (registros=[Auditoria, ...]; o bulk_create preenche o pk no SQLite e no
+# PostgreSQL). O bulk_create não dispara post_save.
+lote_gravado = Signal()
+
+CONFIGURACAO_PADRAO = {
+    'ATIVO': False,
+    'TAMANHO_LOTE': 100,
+    'INTERVALO': 5.0,
+}
+
+
+def configuracao():
+    """
+    Retorna a configuração do buffer (settings.AUDITORIA_BUFFER)
+    """
+    return {**CONFIGURACAO_PADRAO, **getattr(settings, 'AUDITORIA_BUFFER', {})}
+
+
+class BufferAuditoria:
+    """
+    Fila de registros de Auditoria ainda não gravados.
+
+    Os registros são gravados com um único bulk_create quando o lote atinge
+    TAMANHO_LOTE, quando o registro mais antigo passa de INTERVALO segundos
+    (verificado ao fim de cada requisição e por uma thread temporizadora) e
+    sempre na finalização do processo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._registros = []
+        self._mais_antigo = None
+        self._temporizador = None
+        self._atexit_registrado = False
+
+    def __len__(self):
+        return len(self._registros)
+
+    def adicionar(self, registro):
+        """
+        Enfileira um registro (instância não salva de Auditoria)
+        """
+        config = configuracao()
+        with self._lock:
+            if not self._registros:
+                self._mais_antigo = time.monotonic()
+            self._registros.append(registro)
+            cheio = len(self._registros) >= config['TAMANHO_LOTE']
+            self._garantir_finalizacao(config)
+
+        if cheio:
+            self.descarregar()
+
+    def pendente_vencido(self):
+        """
+        Indica se o lote atual já deveria ter sido gravado
+        """
+        config = configuracao()
+        with self._lock:
+            if not self._registros:
+                return False
+            return (
+                len(self._registros) >= config['TAMANHO_LOTE'] or
+                time.monotonic() - self._mais_antigo >= config['INTERVALO']
+            )
+
+    def descarregar_se_necessario(self):
+        if self.pendente_vencido():
+            self.descarregar()
+
+    def descarregar(self):
+        """
+        Grava todos os registros pendentes com bulk_create.
+        Retorna a quantidade de registros gravados.
+        """
+        from .models import Auditoria
+
+        with self._lock:
+            registros, self._registros = self._registros, []
+            self._mais_antigo = None
+
+        if not registros:
+            return 0
+
+        try:
+            with transaction.atomic():
+                Auditoria.objects.bulk_create(registros)
+        except DatabaseError:
+            # Um registro inválido (ex.: usuário removido) não derruba o lote
+            logger.exception('Falha ao gravar lote de auditoria; gravando um a um')
+            gravados = []
+            for registro in registros:
+                try:
+                    with transaction.atomic():
+                        registro.save(force_insert=True)
+                    gravados.append(registro)
+                except DatabaseError:
+                    logger.exception('Registro de auditoria descartado: %s', registro.descricao)
+            registros = gravados
+
+        lote_gravado.send(sender=BufferAuditoria, registros=registros)
+        return len(registros)
+
+    def _garantir_finalizacao(self, config):
+        """
+        Registra o flush no encerramento do processo e inicia a thread
+        temporizadora (chamado com o lock adquirido)
+        """
+        if not self._atexit_registrado:
+            atexit.register(self.descarregar)
+            self._atexit_registrado = True
+
+        if config['INTERVALO'] and (self._temporizador is None or not self._temporizador.is_alive()):
+            self._temporizador = threading.Thread(
+                target=self._executar_temporizador,
+                args=(config['INTERVALO'],),
+                name='auditoria-buffer',
+                daemon=True
+            )
+            self._temporizador.start()
+
+    def _executar_temporizador(self, intervalo):
+        while True:
+            time.sleep(intervalo)
+            try:
+                self.descarregar_se_necessario()
+            except Exception:
+                logger.exception('Falha no flush periódico da auditoria')
+            finally:
+                connection.close()
+
+
+buffer_auditoria = BufferAuditoria()
+
+
+def registrar_bufferizado(registro):
+    """
+    Enfileira o registro apenas se a transação atual for confirmada
+    """
+    transaction.on_commit(lambda: buffer_auditoria.adicionar(registro))
@@ -0,0 +1,254 @@
+"""
+Autocompletar da busca de eventos (api/eventos/autocompletar/)
+
+Índice de prefixos em memória sobre o nome e o local dos eventos ativos: uma
+lista ordenada de chaves normalizadas (minúsculas, sem acentos), consultada
+com bisect. Cada palavra do texto gera uma chave a partir dela, então
+"djan" encontra "Minicurso de Django". As consultas não acessam o banco.
+
+O índice de cada processo é montado fora das requisições: a primeira carga
+é disparada quando o processo sobe (sgea/wsgi.py e sgea/asgi.py) e cada
+recarga periódica (settings.AUTOCOMPLETAR_RECARGA, em segundos) pelo
+primeiro uso depois do vencimento. Uma thread lê os eventos ativos, monta um
+índice novo e o troca pelo atual sob o lock; enquanto isso as consultas
+respondem com o índice anterior. Se a primeira carga ainda não terminou, a
+consulta espera por ela até settings.AUTOCOMPLETAR_ESPERA_INICIAL segundos
+em vez de responder vazio. Uma única recarga roda por vez. Entre recargas o índice é mantido pelos signals de Evento (após o
+commit); alterações que não disparam signals (update(), bulk_create) e as
+feitas por outros processos aparecem na recarga seguinte.
+"""
+import logging
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connection
+
+CAMPOS = ('nome', 'local')
+RECARGA_PADRAO = 300
+ESPERA_INICIAL_PADRAO = 2.0
+LIMITE_PADRAO = 10
+LIMITE_MAXIMO = 20
+ESCALA_CANDIDATOS = 10
+
+logger = logging.getLogger(__name__)
+
+
+def normalizar(texto):
+    """
+    Minúsculas e sem acentos ("Computação" -> "computacao")
+    """
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold().strip()
+
+
+def _chaves(texto):
+    """
+    Uma chave por palavra: (texto normalizado a partir daquela palavra,
+    posição da palavra)
+    """
+    palavras = normalizar(texto).split()
+    return [(' '.join(palavras[i:]), i) for i in range(len(palavras))]
+
+
+class IndicePrefixos:
+    """
+    Lista ordenada de (chave, posição, texto, campo, evento_id) com remoção
+    por evento
+    """
+
+    def __init__(self):
+        self._entradas = []
+        self._por_evento = {}
+        self._lock = threading.Lock()
+        self._carregado_em = None
+        # Alterações recebidas durante uma recarga, reaplicadas sobre o
+        # índice novo (None: nenhuma recarga em andamento)
+        self._alteracoes = None
+        self._recarga_concluida = threading.Event()
+        self._recarga_concluida.set()
+
+    def _entradas_evento(self, evento_id, valores):
+        return [
+            (chave, posicao, texto, campo, evento_id)
+            for campo, texto in zip(CAMPOS, valores) if texto
+            for chave, posicao in _chaves(texto)
+        ]
+
+    def iniciar_recarga(self):
+        """
+        Marca o início de uma recarga; False se já houver outra em andamento
+        """
+        with self._lock:
+            if self._alteracoes is not None:
+                return False
+            self._alteracoes = []
+            self._recarga_concluida.clear()
+            return True
+
+    def cancelar_recarga(self):
+        with self._lock:
+            self._alteracoes = None
+            self._recarga_concluida.set()
+
+    def aguardar_recarga(self, timeout):
+        """
+        Espera a recarga em andamento terminar; False se o tempo acabar
+        """
+        return self._recarga_concluida.wait(timeout)
+
+    def carregar(self, eventos):
+        """
+        Reconstrói o índice a partir de tuplas (id, nome, local), fora do
+        lock, e troca o atual pelo novo de uma vez. As alterações recebidas
+        durante a leitura são reaplicadas sobre o índice novo.
+        """
+        entradas = []
+        por_evento = {}
+        for evento_id, *valores in eventos:
+            por_evento[evento_id] = self._entradas_evento(evento_id, valores)
+            entradas.extend(por_evento[evento_id])
+        entradas.sort()
+
+        with self._lock:
+            alteracoes, self._alteracoes = self._alteracoes or [], None
+            self._entradas = entradas
+            self._por_evento = por_evento
+            for evento_id, valores in alteracoes:
+                self._aplicar(evento_id, valores)
+            self._carregado_em = time.monotonic()
+            self._recarga_concluida.set()
+
+    @property
+    def carregado(self):
+        return self._carregado_em is not None
+
+    @property
+    def em_uso(self):
+        """
+        Carregado ou em carga: precisa receber as alterações dos signals
+        """
+        return self._carregado_em is not None or self._alteracoes is not None
+
+    def expirado(self, recarga):
+        return not self.carregado or time.monotonic() - self._carregado_em > recarga
+
+    def _remover(self, evento_id):
+        for entrada in self._por_evento.pop(evento_id, []):
+            posicao = bisect_left(self._entradas, entrada)
+            if posicao < len(self._entradas) and self._entradas[posicao] == entrada:
+                del self._entradas[posicao]
+
+    def _aplicar(self, evento_id, valores):
+        """
+        valores: (nome, local) do evento ativo, ou None para removê-lo
+        """
+        self._remover(evento_id)
+        if valores is not None:
+            entradas = self._entradas_evento(evento_id, valores)
+            self._por_evento[evento_id] = entradas
+            for entrada in entradas:
+                insort(self._entradas, entrada)
+
+    def _alterar(self, evento_id, valores):
+        with self._lock:
+            self._aplicar(evento_id, valores)
+            if self._alteracoes is not None:
+                self._alteracoes.append((evento_id, valores))
+
+    def atualizar(self, evento_id, nome, local, ativo=True):
+        self._alterar(evento_id, (nome, local) if ativo else None)
+
+    def remover(self, evento_id):
+        self._alterar(evento_id, None)
+
+    def buscar(self, prefixo, limite=LIMITE_PADRAO):
+        """
+        Sugestões cujo nome ou local tem uma palavra começando por `prefixo`,
+        sem repetir o mesmo texto; textos que começam pelo prefixo vêm antes
+        """
+        prefixo = normalizar(prefixo)
+        if not prefixo:
+            return []
+
+        # Examina um número limitado de candidatos para manter o custo fixo
+        candidatos = []
+        with self._lock:
+            posicao = bisect_left(self._entradas, (prefixo,))
+            for entrada in self._entradas[posicao:posicao + limite * ESCALA_CANDIDATOS]:
+                if not entrada[0].startswith(prefixo):
+                    break
+                candidatos.append(entrada)
+        candidatos.sort(key=lambda entrada: entrada[1] > 0)
+
+        sugestoes = []
+        vistos = set()
+        for chave, posicao, texto, campo, evento_id in candidatos:
+            if (campo, texto) in vistos:
+                continue
+            vistos.add((campo, texto))
+            sugestoes.append({'texto': texto, 'campo': campo, 'evento': evento_id})
+            if len(sugestoes) >= limite:
+                break
+        return sugestoes
+
+
+indice = IndicePrefixos()
+
+
+def _eventos_ativos():
+    from .models import Evento
+    return Evento.objects.filter(ativo=True).values_list('id', *CAMPOS).iterator(chunk_size=2000)
+
+
+def recarregar():
+    """
+    Lê os eventos ativos do banco e troca o índice do processo pelo novo.
+    Deve ser precedida de indice.iniciar_recarga().
+    """
+    try:
+        indice.carregar(_eventos_ativos())
+    except Exception:
+        indice.cancelar_recarga()
+        logger.exception('Falha ao recarregar o índice de autocompletar')
+
+
+def _recarregar_em_thread():
+    try:
+        recarregar()
+    finally:
+        connection.close()
+
+
+def agendar_recarga():
+    """
+    Dispara a recarga do índice em uma thread, se nenhuma estiver em
+    andamento; retorna a thread (ou None)
+    """
+    if not indice.iniciar_recarga():
+        return None
+    thread = threading.Thread(target=_recarregar_em_thread, name='autocompletar-recarga', daemon=True)
+    thread.start()
+    return thread
+
+
+def sugerir(prefixo, limite=LIMITE_PADRAO):
+    """
+    Sugestões do índice do processo. Com o índice vencido agenda a recarga e
+    responde com o índice atual; se ele ainda não foi montado, espera um
+    pouco pela primeira carga. Com settings.AUTOCOMPLETAR_SEGUNDO_PLANO =
+    False a recarga roda na própria chamada.
+    """
+    recarga = getattr(settings, 'AUTOCOMPLETAR_RECARGA', RECARGA_PADRAO)
+    if indice.expirado(recarga):
+        if getattr(settings, 'AUTOCOMPLETAR_SEGUNDO_PLANO', True):
+            agendar_recarga()
+            if not indice.carregado:
+                indice.aguardar_recarga(
+                    getattr(settings, 'AUTOCOMPLETAR_ESPERA_INICIAL', ESPERA_INICIAL_PADRAO)
+                )
+        elif indice.iniciar_recarga():
+            recarregar()
+    return indice.buscar(prefixo, min(limite, LIMITE_MAXIMO))
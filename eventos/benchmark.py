@@ -0,0 +1,392 @@
+"""
+Benchmark HTTP reproduzível do SGEA (comando benchmark_http)
+
+Cada cenário gera, a partir de uma semente e dos dados do banco, o roteiro
+de requisições de cada usuário virtual (navegação no catálogo, abertura de
+inscrições, validação de certificados, dashboard do organizador). Os
+roteiros rodam pelo cliente de teste do Django, sem rede e no mesmo
+processo, passando pelos middlewares e pelas URLs reais (eventos/urls.py e
+eventos/api_urls.py); com concorrência, cada usuário virtual roda em uma
+thread com a própria sessão e a própria conexão com o banco.
+
+Para cada cenário, e para cada URL dentro dele, são medidos latência
+(p50/p95/p99), vazão e consultas SQL por requisição. Os registros que os
+cenários criam (inscrições, auditoria, emails, sessões) são anotados pelo
+pk à medida que são gravados neste processo e removidos ao final; o que
+usuários reais gravarem no mesmo banco durante a execução não é tocado.
+Execuções seguidas sobre o mesmo banco são comparáveis. Os resultados vão
+para um JSON com o commit e o ambiente (ver relatorio e comparar).
+"""
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import django
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import connection, connections
+from django.db.models.signals import post_save
+from django.test import Client
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from .auditoria import buffer_auditoria, lote_gravado
+from .middleware import ContadorConsultas
+from .models import Auditoria, Certificado, EmailPendente, Evento, Inscricao, ListaEspera, Usuario
+
+PERCENTIS = (50, 95, 99)
+
+# Tabelas em que os cenários gravam; os registros criados pela execução são
+# removidos depois
+TABELAS_GRAVADAS = (Inscricao, ListaEspera, EmailPendente, Auditoria)
+
+
+def _participantes(rng, quantidade, exceto_evento=None):
+    usuarios = Usuario.objects.exclude(perfil='ORGANIZADOR').filter(is_active=True)
+    if exceto_evento:
+        usuarios = usuarios.exclude(inscricoes__evento_id=exceto_evento)
+    candidatos = list(usuarios.order_by('pk').values_list('pk', flat=True)[:quantidade * 4])
+    return rng.sample(candidatos, min(quantidade, len(candidatos)))
+
+
+def _eventos_futuros(limite=500):
+    return list(
+        Evento.objects.filter(ativo=True, data_inicial__gte=date.today())
+        .order_by('data_inicial', 'horario_inicio', 'id').values_list('pk', flat=True)[:limite]
+    )
+
+
+def navegacao_catalogo(rng, usuarios):
+    """
+    Visitantes e participantes percorrendo a home, a lista de eventos
+    (páginas, filtros e busca), detalhes de eventos e a API
+    """
+    eventos = _eventos_futuros()
+    if not eventos:
+        return []
+
+    participantes = _participantes(rng, usuarios)
+    tipos = [codigo for codigo, _ in Evento.TIPO_CHOICES]
+    termos = ['python', 'django', 'dados', 'seguranca', 'semana', 'palestra']
+    roteiros = []
+    for indice in range(usuarios):
+        # Cerca de 30% navega sem login
+        usuario = participantes[indice] if indice < len(participantes) and rng.random() >= 0.3 else None
+        requisicoes = [
+            ('get', reverse('home')),
+            ('get', reverse('eventos_list')),
+            ('get', reverse('eventos_list') + '?page=2'),
+            ('get', reverse('eventos_list') + f'?tipo={rng.choice(tipos)}'),
+            ('get', reverse('eventos_list') + f'?search={rng.choice(termos)}'),
+        ]
+        requisicoes += [('get', reverse('evento_detail', args=[pk])) for pk in rng.sample(eventos, min(3, len(eventos)))]
+        if usuario:
+            requisicoes += [
+                ('get', reverse('api-evento-list')),
+                ('get', reverse('api-evento-list') + '?cursor='),
+                ('get', reverse('api-evento-autocompletar') + f'?q={rng.choice(termos)[:3]}'),
+            ]
+        roteiros.append((usuario, requisicoes))
+    return roteiros
+
+
+def abertura_inscricoes(rng, usuarios):
+    """
+    Participantes diferentes disputando as vagas de um mesmo evento no
+    momento em que as inscrições abrem
+    """
+    evento = Evento.objects.with_seat_stats().filter(
+        ativo=True, data_inicial__gte=date.today(), vagas_livres__gt=0
+    ).order_by('-vagas_livres', 'pk').values_list('pk', flat=True).first()
+    if evento is None:
+        return []
+
+    detalhe = reverse('evento_detail', args=[evento])
+    inscricao = reverse('inscricao_create', args=[evento])
+    return [
+        (usuario, [('get', detalhe), ('post', inscricao), ('get', detalhe)])
+        for usuario in _participantes(rng, usuarios, exceto_evento=evento)
+    ]
+
+
+def validacao_certificados(rng, usuarios):
+    """
+    Rajada de validações anônimas de certificados, com parte dos códigos
+    adulterados (varredura)
+    """
+    codigos = list(
+        Certificado.objects.filter(revogado=False).order_by('pk')
+        .values_list('codigo_verificacao', flat=True)[:1000]
+    )
+    if not codigos:
+        return []
+
+    roteiros = []
+    for _ in range(usuarios):
+        requisicoes = []
+        for _ in range(10):
+            codigo = rng.choice(codigos)
+            if rng.random() < 0.2:
+                codigo = codigo[:-2] + ('AA' if not codigo.endswith('AA') else 'BB')
+            requisicoes.append(('get', reverse('certificado_validar', args=[codigo])))
+        roteiros.append((None, requisicoes))
+    return roteiros
+
+
+def dashboard_organizador(rng, usuarios):
+    """
+    Organizadores abrindo o dashboard, a lista de inscritos de um evento e a
+    auditoria
+    """
+    eventos = dict(
+        Evento.objects.filter(ativo=True).order_by('organizador_id', 'pk')
+        .values_list('organizador_id', 'pk')[:usuarios * 20]
+    )
+    if not eventos:
+        return []
+
+    organizadores = sorted(eventos)
+    roteiros = []
+    for indice in range(usuarios):
+        organizador = organizadores[indice % len(organizadores)]
+        roteiros.append((organizador, [
+            ('get', reverse('dashboard')),
+            ('get', reverse('evento_inscritos', args=[eventos[organizador]])),
+            ('get', reverse('auditoria_list')),
+            ('get', reverse('auditoria_list') + f'?acao={rng.choice(["INSCRICAO", "CONSULTAR_CERTIFICADO"])}'),
+            ('get', reverse('dashboard')),
+        ]))
+    return roteiros
+
+
+CENARIOS = {
+    'navegacao_catalogo': navegacao_catalogo,
+    'abertura_inscricoes': abertura_inscricoes,
+    'validacao_certificados': validacao_certificados,
+    'dashboard_organizador': dashboard_organizador,
+}
+
+
+def percentis(valores):
+    """
+    {'p50', 'p95', 'p99'} dos valores (interpolação linear)
+    """
+    if not valores:
+        return {f'p{p}': None for p in PERCENTIS}
+    if len(valores) == 1:
+        return {f'p{p}': valores[0] for p in PERCENTIS}
+    cortes = statistics.quantiles(valores, n=100, method='inclusive')
+    return {f'p{p}': cortes[p - 1] for p in PERCENTIS}
+
+
+def resumir(medicoes, duracao):
+    """
+    Estatísticas de uma lista de medições (url, status, segundos, consultas)
+    """
+    latencias = [segundos * 1000 for _, _, segundos, _ in medicoes]
+    consultas = [total for _, _, _, total in medicoes]
+    status = {}
+    for _, codigo, _, _ in medicoes:
+        status[str(codigo)] = status.get(str(codigo), 0) + 1
+
+    return {
+        'requisicoes': len(medicoes),
+        'vazao_rps': round(len(medicoes) / duracao, 2) if duracao else None,
+        'latencia_ms': {
+            'media': round(statistics.fmean(latencias), 3) if latencias else None,
+            **{nome: round(valor, 3) if valor is not None else None for nome, valor in percentis(latencias).items()},
+            'max': round(max(latencias), 3) if latencias else None,
+        },
+        'consultas': {
+            'media': round(statistics.fmean(consultas), 2) if consultas else None,
+            'p95': percentis(consultas)['p95'],
+            'max': max(consultas) if consultas else None,
+        },
+        'status': status,
+    }
+
+
+class Execucao:
+    """
+    Roda os roteiros de um cenário e desfaz o que eles gravaram
+    """
+
+    def __init__(self, concorrencia=1):
+        self.concorrencia = concorrencia
+        self.sessoes = []
+        self.criados = {modelo: set() for modelo in TABELAS_GRAVADAS}
+
+    def executar_roteiro(self, roteiro):
+        usuario, requisicoes = roteiro
+        cliente = Client(raise_request_exception=False)
+        if usuario:
+            cliente.force_login(Usuario.objects.get(pk=usuario))
+            self.sessoes.append(cliente.session.session_key)
+
+        medicoes = []
+        for metodo, caminho in requisicoes:
+            contador = ContadorConsultas()
+            with connection.execute_wrapper(contador):
+                inicio = time.perf_counter()
+                resposta = getattr(cliente, metodo)(caminho)
+                segundos = time.perf_counter() - inicio
+            medicoes.append((resolve(caminho.split('?')[0]).url_name, resposta.status_code, segundos, contador.total))
+        return medicoes
+
+    def _executar_em_thread(self, roteiro):
+        try:
+            return self.executar_roteiro(roteiro)
+        finally:
+            connections.close_all()
+
+    def executar(self, roteiros):
+        """
+        Retorna (medições, duração em segundos)
+        """
+        inicio = time.perf_counter()
+        if self.concorrencia > 1:
+            with ThreadPoolExecutor(max_workers=self.concorrencia) as executor:
+                resultados = list(executor.map(self._executar_em_thread, roteiros))
+        else:
+            resultados = [self.executar_roteiro(roteiro) for roteiro in roteiros]
+        duracao = time.perf_counter() - inicio
+        return [medicao for resultado in resultados for medicao in resultado], duracao
+
+    def _registro_criado(self, sender, instance, created, **kwargs):
+        if created:
+            self.criados[sender].add(instance.pk)
+
+    def _lote_auditoria(self, sender, registros, **kwargs):
+        self.criados[Auditoria].update(registro.pk for registro in registros if registro.pk)
+
+    def acompanhar(self):
+        """
+        Passa a anotar os registros gravados por este processo (as
+        requisições dos cenários)
+        """
+        for modelo in TABELAS_GRAVADAS:
+            post_save.connect(self._registro_criado, sender=modelo, weak=False)
+        lote_gravado.connect(self._lote_auditoria, weak=False)
+
+    def desfazer(self):
+        """
+        Remove os registros anotados e as sessões dos usuários virtuais (a
+        exclusão das inscrições devolve as vagas ao contador dos eventos)
+        """
+        try:
+            buffer_auditoria.descarregar()
+        finally:
+            for modelo in TABELAS_GRAVADAS:
+                post_save.disconnect(self._registro_criado, sender=modelo)
+            lote_gravado.disconnect(self._lote_auditoria)
+
+        for modelo, pks in self.criados.items():
+            pks = sorted(pks)
+            for inicio in range(0, len(pks), 500):
+                modelo.objects.filter(pk__in=pks[inicio:inicio + 500]).delete()
+        Session.objects.filter(session_key__in=self.sessoes).delete()
+        self.criados = {modelo: set() for modelo in TABELAS_GRAVADAS}
+        self.sessoes = []
+
+
+def executar_cenario(nome, usuarios=50, concorrencia=1, semente=42, aquecimento=5):
+    """
+    Executa um cenário e retorna o resumo geral e por URL. Os primeiros
+    `aquecimento` roteiros rodam antes da medição (caches e conexões) e não
+    entram no resultado.
+    """
+    rng = random.Random(f'{semente}-{nome}')
+    roteiros = CENARIOS[nome](rng, usuarios + aquecimento)
+    if not roteiros:
+        return {'ignorado': True}
+
+    execucao = Execucao(concorrencia)
+    execucao.acompanhar()
+    try:
+        execucao.executar(roteiros[:aquecimento])
+        medicoes, duracao = execucao.executar(roteiros[aquecimento:])
+    finally:
+        execucao.desfazer()
+
+    por_url = {}
+    for medicao in medicoes:
+        por_url.setdefault(medicao[0], []).append(medicao)
+    return {
+        'ignorado': False,
+        'usuarios_virtuais': len(roteiros[aquecimento:]),
+        'duracao_s': round(duracao, 3),
+        **resumir(medicoes, duracao),
+        'por_url': {url: resumir(lista, duracao) for url, lista in sorted(por_url.items())},
+    }
+
+
+def commit_atual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def relatorio(cenarios, usuarios=50, concorrencia=1, semente=42, aquecimento=5):
+    """
+    Executa os cenários e monta o relatório completo (pronto para JSON)
+    """
+    return {
+        'commit': commit_atual(),
+        'data': timezone.now().isoformat(),
+        'ambiente': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'banco': connection.vendor,
+            'sistema': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'parametros': {
+            'usuarios': usuarios,
+            'concorrencia': concorrencia,
+            'semente': semente,
+            'aquecimento': aquecimento,
+        },
+        'dados': {
+            modelo._meta.model_name: modelo.objects.count()
+            for modelo in (Usuario, Evento, Inscricao, Certificado, Auditoria)
+        },
+        'cenarios': {
+            nome: executar_cenario(nome, usuarios, concorrencia, semente, aquecimento)
+            for nome in cenarios
+        },
+    }
+
+
+def comparar(atual, anterior):
+    """
+    Linhas com a variação de cada cenário em relação a um relatório anterior
+    """
+    def variacao(novo, antigo):
+        if novo is None or not antigo:
+            return 'n/d'
+        return f'{(novo - antigo) / antigo * 100:+.1f}%'
+
+    linhas = [f'Comparação com {anterior.get("commit") or "?"} ({anterior.get("data", "?")}):']
+    for nome, resultado in atual['cenarios'].items():
+        antigo = anterior.get('cenarios', {}).get(nome)
+        if resultado['ignorado'] or not antigo or antigo.get('ignorado'):
+            continue
+        latencia, latencia_antiga = resultado['latencia_ms'], antigo['latencia_ms']
+        linhas.append(
+            f'  {nome}: '
+            + ', '.join(
+                f'p{p} {variacao(latencia[f"p{p}"], latencia_antiga[f"p{p}"])}' for p in PERCENTIS
+            )
+            + f', vazão {variacao(resultado["vazao_rps"], antigo["vazao_rps"])}'
+            + f', consultas/req {variacao(resultado["consultas"]["media"], antigo["consultas"]["media"])}'
+        )
+    return linhas
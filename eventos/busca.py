@@ -0,0 +1,177 @@
+"""
+Busca textual de eventos (nome, local e descrição)
+
+- SQLite: tabela virtual FTS5 (eventos_evento_fts) com conteúdo externo,
+  tokenizador unicode61 sem acentos e triggers que a mantêm sincronizada
+  com eventos_evento (inclusive em update() e bulk_create). O modelo não
+  gerenciado EventoBusca expõe a tabela ao ORM: a busca é uma junção pelo
+  rowid, com um único MATCH e a relevância lida da coluna rank.
+- PostgreSQL: índice GIN sobre o tsvector em português de
+  nome/local/descrição sem acentos (extensão unaccent).
+- Outros bancos: icontains, como antes.
+
+O resultado vem ordenado por relevância (nome pesa mais que local, que pesa
+mais que descrição).
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, F, FloatField, Lookup, Q
+from django.db.models.expressions import RawSQL
+
+from .models import EventoBusca
+
+TABELA_FTS = 'eventos_evento_fts'
+
+# Pesos de nome, descrição e local no bm25 (mesma ordem das colunas do FTS5)
+PESOS_BM25 = (10.0, 1.0, 4.0)
+
+SQL_FTS5 = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_FTS} USING fts5(
+        nome, descricao, local,
+        content='eventos_evento', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ai AFTER INSERT ON eventos_evento BEGIN
+        INSERT INTO {TABELA_FTS}(rowid, nome, descricao, local)
+        VALUES (new.id, new.nome, new.descricao, new.local);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ad AFTER DELETE ON eventos_evento BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, nome, descricao, local)
+        VALUES ('delete', old.id, old.nome, old.descricao, old.local);
+    END
+    """,
+    # Só dispara quando os campos indexados mudam (não a cada inscrição)
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_au AFTER UPDATE OF nome, descricao, local ON eventos_evento BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, nome, descricao, local)
+        VALUES ('delete', old.id, old.nome, old.descricao, old.local);
+        INSERT INTO {TABELA_FTS}(rowid, nome, descricao, local)
+        VALUES (new.id, new.nome, new.descricao, new.local);
+    END
+    """,
+]
+
+# unaccent() não é IMMUTABLE, então não pode ir direto em um índice
+VETOR_POSTGRESQL = (
+    "(setweight(to_tsvector('portuguese', sgea_unaccent(eventos_evento.nome)), 'A') || "
+    "setweight(to_tsvector('portuguese', sgea_unaccent(eventos_evento.local)), 'B') || "
+    "setweight(to_tsvector('portuguese', sgea_unaccent(eventos_evento.descricao)), 'C'))"
+)
+
+SQL_POSTGRESQL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    CREATE OR REPLACE FUNCTION sgea_unaccent(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+    """,
+    f"CREATE INDEX IF NOT EXISTS eventos_evento_busca_idx ON eventos_evento USING GIN ({VETOR_POSTGRESQL})",
+]
+
+
+class Match(Lookup):
+    """
+    coluna MATCH valor: consulta na coluna com o nome da tabela FTS5, ou
+    configuração da função de relevância na coluna rank
+    """
+    lookup_name = 'match'
+    prepare_rhs = False
+    
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+EventoBusca._meta.get_field('documento').register_lookup(Match)
+EventoBusca._meta.get_field('rank').register_lookup(Match)
+
+
+def garantir_indice(conexao=None):
+    """
+    Cria (se faltar) a estrutura de busca do banco configurado.
+
+    No SQLite, migrations que reconstroem eventos_evento descartam os
+    triggers; nesse caso eles são recriados e o índice é reconstruído.
+    """
+    conexao = conexao or connection
+    with conexao.cursor() as cursor:
+        if conexao.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+                [f'{TABELA_FTS}_a_']
+            )
+            triggers_completos = cursor.fetchone()[0] == 3
+            for sql in SQL_FTS5:
+                cursor.execute(sql)
+            if not triggers_completos:
+                cursor.execute(f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')")
+        elif conexao.vendor == 'postgresql':
+            for sql in SQL_POSTGRESQL:
+                cursor.execute(sql)
+
+
+def remover_indice(conexao=None):
+    conexao = conexao or connection
+    with conexao.cursor() as cursor:
+        if conexao.vendor == 'sqlite':
+            for sufixo in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {TABELA_FTS}_{sufixo}')
+            cursor.execute(f'DROP TABLE IF EXISTS {TABELA_FTS}')
+        elif conexao.vendor == 'postgresql':
+            cursor.execute('DROP INDEX IF EXISTS eventos_evento_busca_idx')
+            cursor.execute('DROP FUNCTION IF EXISTS sgea_unaccent(text)')
+
+
+def consulta_fts5(termo):
+    """
+    Converte o texto digitado em uma consulta FTS5 segura: cada palavra vira
+    um prefixo entre aspas, todas obrigatórias (o usuário não controla a
+    sintaxe do MATCH)
+    """
+    palavras = re.findall(r'\w+', termo)
+    return ' '.join(f'"{palavra}"*' for palavra in palavras)
+
+
+def buscar_eventos(queryset, termo):
+    """
+    Filtra o queryset de eventos pelo termo e ordena por relevância
+    """
+    termo = (termo or '').strip()
+    if not termo:
+        return queryset
+
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        consulta = consulta_fts5(termo)
+        if not consulta:
+            return queryset.none()
+        pesos = ', '.join(str(peso) for peso in PESOS_BM25)
+        # Junção com a tabela FTS5 pelo rowid: o MATCH roda uma vez e a
+        # coluna rank traz o bm25 com os pesos configurados na própria consulta
+        return queryset.filter(
+            busca_textual__documento__match=consulta,
+            busca_textual__rank__match=f'bm25({pesos})',
+        ).annotate(
+            relevancia=F('busca_textual__rank')
+        ).order_by('relevancia', 'data_inicial', 'id')
+
+    if vendor == 'postgresql':
+        consulta = "websearch_to_tsquery('portuguese', sgea_unaccent(%s))"
+        return queryset.filter(
+            RawSQL(f'{VETOR_POSTGRESQL} @@ {consulta}', [termo], output_field=BooleanField())
+        ).annotate(
+            relevancia=RawSQL(f'ts_rank({VETOR_POSTGRESQL}, {consulta})', [termo], output_field=FloatField())
+        ).order_by('-relevancia', 'data_inicial', 'id')
+
+    return queryset.filter(
+        Q(nome__icontains=termo) |
+        Q(descricao__icontains=termo) |
+        Q(local__icontains=termo)
+    )
@@ -0,0 +1,359 @@
+"""
+Geração dos certificados em PDF (ReportLab)
+
+A parte fixa (moldura, ornamentos, logo, títulos e linhas de assinatura) vem
+de ModeloCertificado, criado uma única vez por processo. O logo é preparado
+nessa hora (reduzido, aplicado sobre o fundo branco e codificado em JPEG),
+então cada PDF embute os bytes prontos em vez de recomprimir a imagem. Os
+traços vetoriais do fundo são emitidos de novo em cada PDF (poucos
+operadores, custo pequeno perto da imagem), seguidos dos textos do
+participante.
+Os arquivos são guardados em Certificado.arquivo_pdf com nome derivado do
+hash do conteúdo, então downloads repetidos não renderizam de novo.
+"""
+import hashlib
+import io
+import json
+import os
+import zipfile
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from django.utils.text import slugify
+from reportlab.lib.colors import HexColor, white
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+# Altere ao mudar o layout para invalidar os PDFs já armazenados
+VERSAO_LAYOUT = 2
+
+COR_PRIMARIA = HexColor('#8b5cf6')
+COR_SECUNDARIA = HexColor('#6d28d9')
+COR_TEXTO = HexColor('#1e293b')
+COR_TEXTO_SUAVE = HexColor('#64748b')
+
+LARGURA, ALTURA = landscape(A4)
+TAMANHO_LOGO = 72
+
+# Tamanho dos blocos lidos do storage ao montar o ZIP
+TAMANHO_BLOCO_ZIP = 64 * 1024
+
+
+class ModeloCertificado:
+    """
+    Parte fixa do certificado, preparada uma única vez por processo
+    """
+
+    def __init__(self):
+        self.logo = self._carregar_logo()
+
+    def _carregar_logo(self):
+        """
+        Carrega o logo já reduzido para o tamanho impresso e codificado em
+        JPEG: o ReportLab embute JPEG sem decodificar, enquanto um PNG com
+        transparência seria recomprimido (imagem e máscara) em cada PDF
+        """
+        from PIL import Image
+
+        logo_path = os.path.join(
+            settings.STATICFILES_DIRS[0], 'images/favicon_io/android-chrome-512x512.png'
+        )
+        if not os.path.exists(logo_path):
+            return None
+
+        with Image.open(logo_path) as imagem:
+            # 2x o tamanho em pontos para manter a nitidez na impressão
+            imagem = imagem.convert('RGBA').resize((TAMANHO_LOGO * 2, TAMANHO_LOGO * 2))
+            # O logo fica sobre a área interna branca
+            fundo = Image.new('RGB', imagem.size, 'white')
+            fundo.paste(imagem, mask=imagem.getchannel('A'))
+            buffer = io.BytesIO()
+            fundo.save(buffer, format='JPEG', quality=90)
+        return buffer.getvalue()
+
+    def desenhar_fundo(self, pdf):
+        """
+        Desenha a parte fixa do certificado
+        """
+        # Moldura externa
+        pdf.setFillColor(COR_PRIMARIA)
+        pdf.rect(0, 0, LARGURA, ALTURA, stroke=0, fill=1)
+
+        # Área interna
+        pdf.setFillColor(white)
+        pdf.roundRect(30, 30, LARGURA - 60, ALTURA - 60, 10, stroke=0, fill=1)
+        pdf.setStrokeColor(COR_SECUNDARIA)
+        pdf.setLineWidth(1.5)
+        pdf.roundRect(42, 42, LARGURA - 84, ALTURA - 84, 6, stroke=1, fill=0)
+
+        # Ornamentos nos cantos
+        pdf.setFillColor(COR_PRIMARIA)
+        for x, y, dx, dy in (
+            (42, ALTURA - 42, 1, -1),
+            (LARGURA - 42, ALTURA - 42, -1, -1),
+            (42, 42, 1, 1),
+            (LARGURA - 42, 42, -1, 1),
+        ):
+            caminho = pdf.beginPath()
+            caminho.moveTo(x, y)
+            caminho.lineTo(x + 60 * dx, y)
+            caminho.lineTo(x, y + 60 * dy)
+            caminho.close()
+            pdf.drawPath(caminho, stroke=0, fill=1)
+
+        # Cabeçalho
+        topo = ALTURA - 70
+        if self.logo:
+            pdf.drawImage(
+                ImageReader(io.BytesIO(self.logo)), (LARGURA - TAMANHO_LOGO) / 2, topo - TAMANHO_LOGO,
+                TAMANHO_LOGO, TAMANHO_LOGO
+            )
+        pdf.setFillColor(COR_PRIMARIA)
+        pdf.setFont('Helvetica-Bold', 14)
+        pdf.drawCentredString(LARGURA / 2, topo - TAMANHO_LOGO - 18, 'SGEA')
+        pdf.setFont('Helvetica-Bold', 30)
+        pdf.setFillColor(COR_TEXTO)
+        pdf.drawCentredString(LARGURA / 2, topo - TAMANHO_LOGO - 55, 'Certificado de Participação')
+
+        # Textos fixos do corpo
+        pdf.setFont('Helvetica', 14)
+        pdf.setFillColor(COR_TEXTO_SUAVE)
+        pdf.drawCentredString(LARGURA / 2, 355, 'Certificamos que')
+        pdf.drawCentredString(LARGURA / 2, 285, 'participou do evento')
+
+        # Assinaturas
+        pdf.setStrokeColor(COR_TEXTO)
+        pdf.setLineWidth(1)
+        for centro in (LARGURA / 3, 2 * LARGURA / 3):
+            pdf.line(centro - 110, 140, centro + 110, 140)
+        pdf.setFont('Helvetica', 10)
+        pdf.setFillColor(COR_TEXTO_SUAVE)
+        pdf.drawCentredString(LARGURA / 3, 110, 'Organizador do Evento')
+        pdf.drawCentredString(2 * LARGURA / 3, 110, 'Sistema de Gestão de Eventos')
+        pdf.setFont('Helvetica-Bold', 12)
+        pdf.setFillColor(COR_TEXTO)
+        pdf.drawCentredString(2 * LARGURA / 3, 124, 'EventLabs')
+
+    def renderizar(self, dados):
+        """
+        Gera o PDF (bytes) de um certificado a partir de dados_certificado()
+        """
+        buffer = io.BytesIO()
+        # invariant=1 torna o arquivo determinístico (sem data/ID aleatório)
+        pdf = canvas.Canvas(buffer, pagesize=(LARGURA, ALTURA), invariant=1)
+        pdf.setTitle(f"Certificado - {dados['nome']}")
+        pdf.setAuthor('SGEA')
+
+        self.desenhar_fundo(pdf)
+
+        # Dados do participante
+        pdf.setFillColor(COR_PRIMARIA)
+        pdf.setFont('Helvetica-Bold', 26)
+        pdf.drawCentredString(LARGURA / 2, 318, dados['nome'])
+
+        pdf.setFillColor(COR_TEXTO)
+        pdf.setFont('Helvetica-Bold', 18)
+        pdf.drawCentredString(LARGURA / 2, 255, dados['evento'])
+
+        pdf.setFont('Helvetica', 13)
+        pdf.setFillColor(COR_TEXTO_SUAVE)
+        pdf.drawCentredString(LARGURA / 2, 225, f"Realizado em {dados['data_evento']}")
+
+        pdf.setFont('Helvetica-Bold', 12)
+        pdf.setFillColor(COR_TEXTO)
+        pdf.drawCentredString(LARGURA / 3, 124, dados['organizador'])
+
+        pdf.setFont('Helvetica', 9)
+        pdf.setFillColor(COR_TEXTO_SUAVE)
+        pdf.drawCentredString(
+            LARGURA / 2, 70,
+            f"Código de Verificação: {dados['codigo']}  •  Emitido em {dados['data_emissao']}"
+        )
+
+        pdf.showPage()
+        pdf.save()
+        return buffer.getvalue()
+
+
+@lru_cache(maxsize=1)
+def modelo_certificado():
+    """
+    Instância única do modelo por processo
+    """
+    return ModeloCertificado()
+
+
+def dados_certificado(certificado):
+    """
+    Textos variáveis do certificado
+    """
+    inscricao = certificado.inscricao
+    evento = inscricao.evento
+    emissao = certificado.data_emissao
+    return {
+        'nome': inscricao.usuario.get_full_name() or inscricao.usuario.username,
+        'evento': evento.nome,
+        'data_evento': evento.data_inicial.strftime('%d/%m/%Y'),
+        'organizador': evento.organizador.get_full_name() or 'Organizador',
+        'codigo': certificado.codigo_verificacao,
+        'data_emissao': timezone.localtime(emissao).strftime('%d/%m/%Y %H:%M') if emissao else '',
+    }
+
+
+def caminho_pdf(dados):
+    """
+    Caminho no storage derivado do hash do conteúdo do certificado
+    """
+    conteudo = json.dumps({'layout': VERSAO_LAYOUT, **dados}, sort_keys=True)
+    digest = hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+    return f'certificados/{digest[:2]}/{digest}.pdf'
+
+
+def renderizar_certificado(certificado):
+    """
+    Gera o PDF do certificado sem consultar ou gravar o storage
+    """
+    return modelo_certificado().renderizar(dados_certificado(certificado))
+
+
+def gravar_pdf(dados):
+    """
+    Renderiza e grava o PDF no storage, se o conteúdo ainda não existir.
+
+    Não acessa o banco, então pode rodar em processos do pool de
+    manage.py gerar_certificados. Retorna (nome, gerado).
+    """
+    from .models import Certificado
+
+    nome = caminho_pdf(dados)
+    storage = Certificado._meta.get_field('arquivo_pdf').storage
+    if storage.exists(nome):
+        return nome, False
+
+    salvo = storage.save(nome, ContentFile(modelo_certificado().renderizar(dados)))
+    if salvo != nome:
+        # Outro processo gravou o mesmo conteúdo primeiro
+        storage.delete(salvo)
+    return nome, True
+
+
+def obter_pdf_certificado(certificado):
+    """
+    Garante que certificado.arquivo_pdf aponte para o PDF atual.
+
+    Se o arquivo com o hash do conteúdo já existe no storage, nada é
+    renderizado. Retorna True quando um novo PDF foi gerado.
+    """
+    from .models import Certificado
+
+    dados = dados_certificado(certificado)
+    nome = caminho_pdf(dados)
+
+    if certificado.arquivo_pdf.name == nome and certificado.arquivo_pdf.storage.exists(nome):
+        return False
+
+    nome, gerado = gravar_pdf(dados)
+    certificado.arquivo_pdf.name = nome
+    Certificado.objects.filter(pk=certificado.pk).update(arquivo_pdf=nome)
+    return gerado
+
+
+def atualizar_pdfs(certificados):
+    """
+    Versão em lote de obter_pdf_certificado: grava os PDFs que faltam e
+    atualiza arquivo_pdf de todos com um único bulk_update
+    """
+    from .models import Certificado
+
+    alterados = []
+    for certificado in certificados:
+        dados = dados_certificado(certificado)
+        nome = caminho_pdf(dados)
+        if certificado.arquivo_pdf.name == nome and certificado.arquivo_pdf.storage.exists(nome):
+            continue
+        certificado.arquivo_pdf.name, _ = gravar_pdf(dados)
+        alterados.append(certificado)
+
+    if alterados:
+        Certificado.objects.bulk_update(alterados, ['arquivo_pdf'])
+    return len(alterados)
+
+
+class _SaidaZip:
+    """
+    Destino não posicionável para o ZipFile: acumula os bytes escritos até
+    serem consumidos pelo gerador da resposta
+    """
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def consumir(self):
+        dados = b''.join(self._partes)
+        self._partes = []
+        return dados
+
+
+def certificados_do_evento(evento, tamanho_lote=200):
+    """
+    Percorre os certificados não revogados do evento em lotes pela chave
+    primária, sem manter um cursor aberto enquanto os PDFs faltantes são
+    gravados (um UPDATE por lote)
+    """
+    from .models import Certificado
+
+    ultimo_id = 0
+    while True:
+        lote = list(
+            Certificado.objects.filter(
+                inscricao__evento=evento,
+                revogado=False,
+                pk__gt=ultimo_id
+            ).select_related(
+                'inscricao__usuario', 'inscricao__evento__organizador'
+            ).order_by('pk')[:tamanho_lote]
+        )
+        if not lote:
+            return
+        atualizar_pdfs(lote)
+        yield from lote
+        ultimo_id = lote[-1].pk
+
+
+def zip_certificados(certificados):
+    """
+    Gera, em partes, um ZIP com o PDF de cada certificado.
+
+    Cada arquivo é copiado do storage em blocos de TAMANHO_BLOCO_ZIP, então
+    a memória usada não depende da quantidade de participantes. PDFs ainda
+    não gerados são renderizados na hora.
+    """
+    saida = _SaidaZip()
+    # Os PDFs já são comprimidos; ZIP_STORED evita gastar CPU à toa
+    with zipfile.ZipFile(saida, 'w', compression=zipfile.ZIP_STORED) as arquivo_zip:
+        for certificado in certificados:
+            obter_pdf_certificado(certificado)
+
+            usuario = certificado.inscricao.usuario
+            nome = slugify(usuario.get_full_name() or usuario.username) or 'participante'
+            info = zipfile.ZipInfo(
+                f'{nome}-{certificado.codigo_verificacao}.pdf',
+                date_time=timezone.localtime(certificado.data_emissao).timetuple()[:6]
+            )
+
+            with certificado.arquivo_pdf.open('rb') as origem, arquivo_zip.open(info, 'w') as destino:
+                for bloco in iter(lambda: origem.read(TAMANHO_BLOCO_ZIP), b''):
+                    destino.write(bloco)
+                    yield saida.consumir()
+            yield saida.consumir()
+    yield saida.consumir()
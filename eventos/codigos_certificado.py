@@ -0,0 +1,108 @@
+"""
+Códigos de verificação assinados dos certificados
+
+Formato: SGEA-<id da inscrição em base 36>-<assinatura>, onde a assinatura
+são os primeiros 120 bits de um HMAC-SHA256 do prefixo, em base 32. A
+autenticidade é conferida sem consultar o banco; o banco só é usado para
+saber se o certificado continua válido (não foi revogado nem excluído).
+
+As funções verificar_codigo e gerar_codigo não dependem do Django e podem
+ser copiadas para um verificador externo junto com a chave.
+"""
+import base64
+import hashlib
+import hmac
+import uuid
+
+PREFIXO = 'SGEA'
+BYTES_ASSINATURA = 15
+
+
+def _base36(numero):
+    digitos = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    resultado = ''
+    while True:
+        numero, resto = divmod(numero, 36)
+        resultado = digitos[resto] + resultado
+        if not numero:
+            return resultado
+
+
+def _assinatura(identificador36, chave):
+    mensagem = f'{PREFIXO}-{identificador36}'.encode('ascii')
+    digest = hmac.new(chave, mensagem, hashlib.sha256).digest()[:BYTES_ASSINATURA]
+    return base64.b32encode(digest).decode('ascii')
+
+
+def gerar_codigo(identificador, chave):
+    """
+    Gera o código assinado para o identificador (id da inscrição)
+    """
+    identificador36 = _base36(identificador)
+    return f'{PREFIXO}-{identificador36}-{_assinatura(identificador36, chave)}'
+
+
+def verificar_codigo(codigo, chave):
+    """
+    Confere a assinatura do código sem acessar o banco.
+
+    Retorna o id da inscrição se o código for autêntico, ou None.
+    """
+    partes = codigo.strip().upper().split('-')
+    if len(partes) != 3 or partes[0] != PREFIXO:
+        return None
+
+    identificador36, assinatura = partes[1], partes[2]
+    try:
+        identificador = int(identificador36, 36)
+    except ValueError:
+        return None
+
+    # Rejeita zeros à esquerda para que cada id tenha um único código
+    if _base36(identificador) != identificador36:
+        return None
+    if not hmac.compare_digest(assinatura, _assinatura(identificador36, chave)):
+        return None
+    return identificador
+
+
+def chave_assinatura():
+    """
+    Chave usada pelo sistema (settings.CERTIFICADO_CHAVE_ASSINATURA).
+
+    É obrigatória e separada da SECRET_KEY: trocar a chave invalida todos
+    os códigos já impressos, então ela não pode acompanhar a rotação do
+    segredo do Django.
+    """
+    from django.conf import settings
+    from django.core.exceptions import ImproperlyConfigured
+
+    chave = getattr(settings, 'CERTIFICADO_CHAVE_ASSINATURA', None)
+    if not chave:
+        raise ImproperlyConfigured(
+            'Defina CERTIFICADO_CHAVE_ASSINATURA para assinar os códigos dos certificados.'
+        )
+    return chave.encode('utf-8') if isinstance(chave, str) else chave
+
+
+def codigo_para_inscricao(inscricao_id):
+    return gerar_codigo(inscricao_id, chave_assinatura())
+
+
+def inscricao_do_codigo(codigo):
+    """
+    Id da inscrição embutido em um código assinado válido, ou None
+    (inclusive para os códigos UUID antigos)
+    """
+    return verificar_codigo(codigo, chave_assinatura())
+
+
+def normalizar_codigo_legado(codigo):
+    """
+    Código UUID (formato anterior aos códigos assinados) na forma em que foi
+    gravado, ou None se o código não tiver esse formato
+    """
+    try:
+        return str(uuid.UUID(codigo.strip()))
+    except ValueError:
+        return None
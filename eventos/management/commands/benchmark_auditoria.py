@@ -0,0 +1,66 @@
+"""
+Benchmark do custo de escrita da auditoria: gravação síncrona x bufferizada
+"""
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.test.utils import override_settings
+from eventos.auditoria import buffer_auditoria, configuracao
+from eventos.models import Auditoria
+
+
+class Command(BaseCommand):
+    help = 'Mede o custo por requisição de Auditoria.registrar com e sem buffer'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requisicoes',
+            type=int,
+            default=1000,
+            help='Quantidade de registros simulados (um por requisição)'
+        )
+    
+    def handle(self, *args, **options):
+        total = options['requisicoes']
+        ultimo_id = Auditoria.objects.aggregate(maximo=Max('id'))['maximo'] or 0
+        # Marca os registros desta execução para não remover os gravados
+        # pela aplicação enquanto o benchmark roda
+        self.execucao = uuid.uuid4().hex
+        
+        try:
+            sincrono = self.medir(total, ativo=False)
+            bufferizado = self.medir(total, ativo=True)
+        finally:
+            Auditoria.objects.filter(
+                id__gt=ultimo_id,
+                acao='API_CONSULTA',
+                dados_adicionais__benchmark=self.execucao
+            ).delete()
+        
+        self.stdout.write(f'Registros por modo: {total}')
+        self.stdout.write(f'Síncrono:     {sincrono * 1000:.3f} ms/requisição')
+        self.stdout.write(f'Bufferizado:  {bufferizado * 1000:.3f} ms/requisição (inclui os flushes)')
+        if bufferizado:
+            self.stdout.write(self.style.SUCCESS(f'Ganho: {sincrono / bufferizado:.1f}x'))
+    
+    def medir(self, total, ativo):
+        config = {**configuracao(), 'ATIVO': ativo}
+        
+        with override_settings(AUDITORIA_BUFFER=config):
+            inicio = time.perf_counter()
+            for i in range(total):
+                Auditoria.registrar(
+                    usuario=None,
+                    acao='API_CONSULTA',
+                    descricao=f'Benchmark de auditoria #{i}',
+                    dados_adicionais={'benchmark': self.execucao}
+                )
+                # Fim de requisição, como no AuditoriaBufferMiddleware
+                if ativo:
+                    buffer_auditoria.descarregar_se_necessario()
+            buffer_auditoria.descarregar()
+            duracao = time.perf_counter() - inicio
+        
+        return duracao / total
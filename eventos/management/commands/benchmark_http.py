@@ -0,0 +1,102 @@
+"""
+Benchmark HTTP reproduzível dos fluxos principais (ver eventos/benchmark.py)
+"""
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from eventos.benchmark import CENARIOS, PERCENTIS, comparar, relatorio
+
+
+class Command(BaseCommand):
+    help = (
+        'Executa os cenários de carga (abertura de inscrições, navegação no catálogo, '
+        'validação de certificados, dashboard do organizador) contra as URLs reais e '
+        'grava latência p50/p95/p99, vazão e consultas por requisição em JSON'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cenario',
+            action='append',
+            choices=sorted(CENARIOS),
+            help='Cenário a executar (pode repetir); padrão: todos'
+        )
+        parser.add_argument(
+            '--usuarios',
+            type=int,
+            default=50,
+            help='Usuários virtuais por cenário'
+        )
+        parser.add_argument(
+            '--concorrencia',
+            type=int,
+            default=1,
+            help='Usuários virtuais simultâneos (threads)'
+        )
+        parser.add_argument(
+            '--semente',
+            type=int,
+            default=42,
+            help='Semente dos roteiros (mesma semente e mesmos dados = mesmas requisições)'
+        )
+        parser.add_argument(
+            '--aquecimento',
+            type=int,
+            default=5,
+            help='Usuários virtuais executados antes da medição e descartados'
+        )
+        parser.add_argument(
+            '--saida',
+            help='Arquivo JSON do resultado; padrão: benchmarks/<commit>-<data>.json'
+        )
+        parser.add_argument(
+            '--comparar',
+            help='JSON de uma execução anterior para comparar com esta'
+        )
+    
+    def handle(self, *args, **options):
+        if options['usuarios'] < 1 or options['concorrencia'] < 1 or options['aquecimento'] < 0:
+            raise CommandError('--usuarios e --concorrencia devem ser positivos e --aquecimento não negativo.')
+        
+        anterior = None
+        if options['comparar']:
+            try:
+                with open(options['comparar'], encoding='utf-8') as arquivo:
+                    anterior = json.load(arquivo)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Não foi possível ler {options["comparar"]}: {e}')
+        
+        resultado = relatorio(
+            options['cenario'] or list(CENARIOS),
+            usuarios=options['usuarios'],
+            concorrencia=options['concorrencia'],
+            semente=options['semente'],
+            aquecimento=options['aquecimento'],
+        )
+        
+        for nome, cenario in resultado['cenarios'].items():
+            if cenario['ignorado']:
+                self.stdout.write(self.style.WARNING(f'{nome}: ignorado (sem dados para o cenário)'))
+                continue
+            latencia = cenario['latencia_ms']
+            self.stdout.write(
+                f'{nome}: {cenario["requisicoes"]} req em {cenario["duracao_s"]:.2f}s '
+                f'({cenario["vazao_rps"]} req/s) - '
+                + ' '.join(f'p{p} {latencia[f"p{p}"]:.1f}ms' for p in PERCENTIS)
+                + f' - {cenario["consultas"]["media"]} consultas/req - status {cenario["status"]}'
+            )
+        
+        if anterior:
+            for linha in comparar(resultado, anterior):
+                self.stdout.write(linha)
+        
+        saida = options['saida'] or os.path.join(
+            settings.BASE_DIR, 'benchmarks',
+            f'{resultado["commit"] or "sem-commit"}-{resultado["data"][:19].replace(":", "")}.json'
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+        with open(saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Resultado gravado em {saida}'))
@@ -0,0 +1,237 @@
+"""
+Comando para emitir em lote os certificados dos eventos encerrados
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Q
+from eventos.certificados import dados_certificado, gravar_pdf
+from eventos.codigos_certificado import codigo_para_inscricao
+from eventos.models import Auditoria, Certificado, Evento, Inscricao
+
+
+class Command(BaseCommand):
+    help = (
+        'Emite os certificados das inscrições ativas de eventos encerrados em lotes '
+        '(bulk_create), renderiza os PDFs em paralelo e grava um checkpoint para retomar'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-final',
+            help='Data de término dos eventos (AAAA-MM-DD); padrão: ontem'
+        )
+        parser.add_argument(
+            '--evento',
+            type=int,
+            action='append',
+            help='ID de evento a processar (pode repetir); ignora --data-final'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=500,
+            help='Quantidade de inscrições processadas por lote'
+        )
+        parser.add_argument(
+            '--processos',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Processos usados para renderizar os PDFs (1 = no próprio processo)'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default=os.path.join(settings.BASE_DIR, 'gerar_certificados.checkpoint.json'),
+            help='Arquivo onde o progresso é gravado a cada lote'
+        )
+        parser.add_argument(
+            '--reiniciar',
+            action='store_true',
+            help='Ignora o checkpoint existente e começa do início'
+        )
+
+    def handle(self, *args, **options):
+        filtro = self.montar_filtro(options)
+        caminho_checkpoint = options['checkpoint']
+        checkpoint = self.ler_checkpoint(caminho_checkpoint, filtro, options['reiniciar'])
+
+        ultimo_id = checkpoint['ultimo_inscricao_id']
+        self.total_emitidos = checkpoint['emitidos']
+        total_pdfs = checkpoint['pdfs']
+        if ultimo_id:
+            self.stdout.write(f'Retomando a partir da inscrição #{ultimo_id}.')
+
+        # Inscrições sem certificado ou com certificado ainda sem PDF
+        elegiveis = Inscricao.objects.filter(
+            ativa=True,
+            evento__ativo=True,
+            **filtro
+        ).filter(
+            Q(certificado__isnull=True) |
+            Q(certificado__arquivo_pdf='') |
+            Q(certificado__arquivo_pdf__isnull=True)
+        )
+
+        executor = None
+        self.processos = options['processos']
+        if self.processos > 1:
+            # Os processos filhos não podem herdar conexões abertas com o banco
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=self.processos, initializer=django.setup)
+
+        inicio = time.monotonic()
+        emitidos_execucao = 0
+        try:
+            while True:
+                ids = list(
+                    elegiveis.filter(pk__gt=ultimo_id).order_by('pk').values_list('pk', flat=True)[:options['lote']]
+                )
+                if not ids:
+                    break
+
+                emitidos = self.emitir_certificados(ids)
+                pdfs = self.gravar_pdfs(ids, executor)
+
+                ultimo_id = ids[-1]
+                emitidos_execucao += emitidos
+                self.total_emitidos += emitidos
+                total_pdfs += pdfs
+                self.gravar_checkpoint(caminho_checkpoint, {
+                    'filtro': filtro,
+                    'ultimo_inscricao_id': ultimo_id,
+                    'emitidos': self.total_emitidos,
+                    'pdfs': total_pdfs,
+                })
+
+                decorrido = time.monotonic() - inicio
+                self.stdout.write(
+                    f'Lote até inscrição #{ultimo_id}: {emitidos} certificado(s), {pdfs} PDF(s) '
+                    f'- {emitidos_execucao / decorrido:.1f} certificados/s'
+                )
+        finally:
+            if executor:
+                executor.shutdown()
+
+        decorrido = time.monotonic() - inicio
+        if os.path.exists(caminho_checkpoint):
+            os.remove(caminho_checkpoint)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{self.total_emitidos} certificado(s) emitido(s) e {total_pdfs} PDF(s) gerado(s) '
+            f'em {decorrido:.1f}s ({emitidos_execucao / decorrido if decorrido else 0:.1f} certificados/s).'
+        ))
+
+    def montar_filtro(self, options):
+        """
+        Filtro dos eventos processados (também identifica o checkpoint)
+        """
+        if options['evento']:
+            return {'evento_id__in': sorted(options['evento'])}
+
+        if options['data_final']:
+            try:
+                data_final = date.fromisoformat(options['data_final'])
+            except ValueError:
+                raise CommandError('--data-final deve estar no formato AAAA-MM-DD.')
+        else:
+            data_final = date.today() - timedelta(days=1)
+        return {'evento__data_final': data_final.isoformat()}
+
+    def ler_checkpoint(self, caminho, filtro, reiniciar):
+        vazio = {'ultimo_inscricao_id': 0, 'emitidos': 0, 'pdfs': 0}
+        if reiniciar or not os.path.exists(caminho):
+            return vazio
+
+        with open(caminho, encoding='utf-8') as arquivo:
+            checkpoint = json.load(arquivo)
+        if checkpoint.get('filtro') != filtro:
+            self.stdout.write(self.style.WARNING('Checkpoint de outra execução ignorado.'))
+            return vazio
+        return checkpoint
+
+    def gravar_checkpoint(self, caminho, dados):
+        temporario = f'{caminho}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(dados, arquivo)
+        os.replace(temporario, caminho)
+
+    def emitir_certificados(self, ids):
+        """
+        Cria os certificados que faltam no lote com um único bulk_create,
+        registrando a auditoria também em lote
+        """
+        with transaction.atomic():
+            pendentes = Inscricao.objects.filter(
+                pk__in=ids,
+                certificado__isnull=True
+            ).select_related('usuario', 'evento')
+
+            certificados = [
+                Certificado(
+                    inscricao=inscricao,
+                    emitido_por_id=inscricao.evento.organizador_id,
+                    codigo_verificacao=codigo_para_inscricao(inscricao.pk)
+                )
+                for inscricao in pendentes
+            ]
+            if not certificados:
+                return 0
+
+            # Uma emissão manual concorrente faz o lote falhar por inteiro;
+            # a próxima execução retoma pelo checkpoint
+            Certificado.objects.bulk_create(certificados)
+            Certificado.limpar_cache_validacao(*[c.codigo_verificacao for c in certificados])
+            Evento.limpar_cache_estatisticas(*{c.emitido_por_id for c in certificados})
+            criados = Certificado.objects.filter(
+                inscricao_id__in=[c.inscricao_id for c in certificados]
+            ).select_related('inscricao__usuario', 'inscricao__evento')
+
+            Auditoria.objects.bulk_create([
+                Auditoria(
+                    usuario_id=certificado.emitido_por_id,
+                    acao='EMITIR_CERTIFICADO',
+                    descricao=f'Certificado emitido para {certificado.inscricao.usuario.get_full_name()}',
+                    dados_adicionais={
+                        'certificado_id': certificado.id,
+                        'codigo': certificado.codigo_verificacao,
+                        'evento': certificado.inscricao.evento.nome
+                    }
+                )
+                for certificado in criados
+            ])
+            return len(criados)
+
+    def gravar_pdfs(self, ids, executor):
+        """
+        Renderiza os PDFs ainda não gerados do lote (no pool de processos,
+        se houver) e atualiza arquivo_pdf com um único bulk_update
+        """
+        certificados = list(
+            Certificado.objects.filter(inscricao_id__in=ids).filter(
+                Q(arquivo_pdf='') | Q(arquivo_pdf__isnull=True)
+            ).select_related('inscricao__usuario', 'inscricao__evento__organizador')
+        )
+        if not certificados:
+            return 0
+
+        dados = [dados_certificado(certificado) for certificado in certificados]
+        if executor:
+            tamanho = max(1, len(dados) // (self.processos * 4))
+            resultados = executor.map(gravar_pdf, dados, chunksize=tamanho)
+        else:
+            resultados = map(gravar_pdf, dados)
+
+        gerados = 0
+        for certificado, (nome, gerado) in zip(certificados, resultados):
+            certificado.arquivo_pdf.name = nome
+            gerados += gerado
+
+        Certificado.objects.bulk_update(certificados, ['arquivo_pdf'])
+        return gerados
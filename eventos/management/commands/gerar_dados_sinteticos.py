@@ -0,0 +1,518 @@
+"""
+Comando para gerar dados sintéticos em volume de produção (benchmarks)
+"""
+import math
+import os
+import random
+import time as time_module
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from eventos.codigos_certificado import codigo_para_inscricao
+from eventos.models import Auditoria, Certificado, Evento, Inscricao, Usuario
+
+SENHA_PADRAO = 'Senha@123'
+
+# Inscrições e auditoria são geradas em blocos com semente própria, então o
+# resultado não depende da quantidade de processos
+EVENTOS_POR_BLOCO = 500
+AUDITORIAS_POR_BLOCO = 100_000
+
+NOMES = [
+    'Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Henrique', 'Isabela',
+    'João', 'Larissa', 'Lucas', 'Mariana', 'Mateus', 'Natália', 'Pedro', 'Rafaela', 'Thiago',
+]
+SOBRENOMES = [
+    'Almeida', 'Barbosa', 'Cardoso', 'Costa', 'Ferreira', 'Gomes', 'Lima', 'Martins',
+    'Oliveira', 'Pereira', 'Ribeiro', 'Rodrigues', 'Santos', 'Silva', 'Souza',
+]
+INSTITUICOES = [
+    'Universidade Federal', 'Universidade Estadual', 'Instituto Federal', 'Centro Universitário',
+]
+TEMAS = [
+    'Python', 'Django', 'Inteligência Artificial', 'Ciência de Dados', 'Redes de Computadores',
+    'Segurança da Informação', 'Engenharia de Software', 'Computação em Nuvem', 'Banco de Dados',
+    'Robótica', 'Física Quântica', 'Biotecnologia', 'Matemática Aplicada', 'Sustentabilidade',
+    'Empreendedorismo', 'Educação Inclusiva', 'Direito Digital', 'Economia Criativa',
+]
+FORMATOS_NOME = {
+    'SEMINARIO': 'Seminário de {tema}',
+    'PALESTRA': 'Palestra: {tema}',
+    'MINICURSO': 'Minicurso de {tema}',
+    'SEMANA_ACADEMICA': 'Semana Acadêmica de {tema}',
+}
+LOCAIS = [
+    'Auditório Principal', 'Laboratório de Informática - Bloco {n}', 'Sala {n}',
+    'Anfiteatro {n}', 'Centro de Convenções',
+]
+PESOS_PERFIS = {'ALUNO': 90, 'PROFESSOR': 8, 'ORGANIZADOR': 2}
+PESOS_TIPOS = {'PALESTRA': 40, 'MINICURSO': 30, 'SEMINARIO': 20, 'SEMANA_ACADEMICA': 10}
+PESOS_ACOES = {
+    'API_CONSULTA': 35, 'INSCRICAO': 25, 'CONSULTAR_CERTIFICADO': 15, 'CANCELAR_INSCRICAO': 8,
+    'EMITIR_CERTIFICADO': 8, 'API_INSCRICAO': 5, 'CRIAR_USUARIO': 2, 'CRIAR_EVENTO': 1,
+    'EDITAR_EVENTO': 1,
+}
+
+# Usuários que podem se inscrever e que geram auditoria; preenchidos uma vez
+# em cada processo (ver _iniciar_processo)
+_usuarios = {'participantes': [], 'todos': []}
+
+
+def pesos(texto, validos):
+    """
+    Converte "ALUNO=90,PROFESSOR=8" em {'ALUNO': 90.0, 'PROFESSOR': 8.0}
+    """
+    resultado = {}
+    try:
+        for parte in texto.split(','):
+            chave, valor = parte.split('=')
+            resultado[chave.strip().upper()] = float(valor)
+    except ValueError:
+        raise CommandError(f'Distribuição inválida: "{texto}" (use CHAVE=peso,CHAVE=peso).')
+
+    desconhecidas = set(resultado) - set(validos)
+    if desconhecidas:
+        raise CommandError(f'Valores desconhecidos em "{texto}": {", ".join(sorted(desconhecidas))}.')
+    if sum(resultado.values()) <= 0 or min(resultado.values()) < 0:
+        raise CommandError(f'Distribuição inválida: "{texto}" (pesos não negativos com soma positiva).')
+    return resultado
+
+
+def escolher(rng, distribuicao, quantidade):
+    chaves = list(distribuicao)
+    return rng.choices(chaves, weights=[distribuicao[chave] for chave in chaves], k=quantidade)
+
+
+def instante(rng, dia, hora_inicial=8, hora_final=22):
+    segundos = rng.randrange(hora_inicial * 3600, hora_final * 3600)
+    return timezone.make_aware(datetime.combine(dia, time.min) + timedelta(seconds=segundos))
+
+
+@contextmanager
+def sem_datas_automaticas(*modelos):
+    """
+    Desliga auto_now/auto_now_add dos modelos, para as datas geradas (no
+    passado) serem gravadas como estão pelo bulk_create
+    """
+    campos = [
+        (campo, campo.auto_now, campo.auto_now_add)
+        for modelo in modelos for campo in modelo._meta.concrete_fields
+        if getattr(campo, 'auto_now', False) or getattr(campo, 'auto_now_add', False)
+    ]
+    for campo, _, _ in campos:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, auto_now, auto_now_add in campos:
+            campo.auto_now, campo.auto_now_add = auto_now, auto_now_add
+
+
+def _iniciar_processo(participantes, todos, configurar=True):
+    if configurar:
+        django.setup()
+    _usuarios['participantes'] = participantes
+    _usuarios['todos'] = todos
+
+
+def _gravar(lotes, tamanho):
+    """
+    Grava (modelo, objetos) na ordem, na mesma transação
+    """
+    with transaction.atomic(), sem_datas_automaticas(Inscricao, Certificado):
+        for modelo, objetos in lotes:
+            modelo.objects.bulk_create(objetos, batch_size=tamanho)
+
+
+def gerar_bloco_inscricoes(bloco):
+    """
+    Inscrições de participantes distintos em cada evento do bloco (as
+    primeiras `ativas` ativas, as demais canceladas) e os certificados das
+    ativas de eventos já encerrados. O certificado usa o id da inscrição
+    deslocado, então os ids não dependem de outros blocos.
+
+    Retorna (inscrições, certificados) criados.
+    """
+    rng = random.Random(f'{bloco["semente"]}-inscricoes-{bloco["indice"]}')
+    participantes = _usuarios['participantes']
+    pk = bloco['primeira_inscricao']
+    inscricoes, certificados = [], []
+    total_inscricoes = total_certificados = 0
+
+    for evento_id, quantidade, ativas, criacao, data_inicial, data_final, organizador in bloco['planos']:
+        janela = max(1, int((instante(rng, data_inicial) - criacao).total_seconds()))
+        encerrado = data_final < bloco['hoje']
+
+        for posicao, usuario_id in enumerate(rng.sample(participantes, quantidade)):
+            data_inscricao = criacao + timedelta(seconds=rng.randrange(janela))
+            ativa = posicao < ativas
+            inscricoes.append(Inscricao(
+                pk=pk,
+                usuario_id=usuario_id,
+                evento_id=evento_id,
+                data_inscricao=data_inscricao,
+                ativa=ativa,
+                data_cancelamento=None if ativa else data_inscricao + timedelta(hours=rng.randint(1, 72)),
+            ))
+            if ativa and encerrado and rng.random() < bloco['certificados']:
+                certificados.append(Certificado(
+                    pk=pk + bloco['deslocamento_certificado'],
+                    inscricao_id=pk,
+                    codigo_verificacao=codigo_para_inscricao(pk),
+                    data_emissao=instante(rng, data_final + timedelta(days=1)),
+                    emitido_por_id=organizador,
+                ))
+            pk += 1
+
+            if len(inscricoes) >= bloco['lote']:
+                _gravar([(Inscricao, inscricoes), (Certificado, certificados)], bloco['lote'])
+                total_inscricoes += len(inscricoes)
+                total_certificados += len(certificados)
+                inscricoes, certificados = [], []
+
+    _gravar([(Inscricao, inscricoes), (Certificado, certificados)], bloco['lote'])
+    return total_inscricoes + len(inscricoes), total_certificados + len(certificados)
+
+
+def gerar_bloco_auditoria(bloco):
+    """
+    Registros de auditoria do bloco, espalhados pelo último ano
+    """
+    rng = random.Random(f'{bloco["semente"]}-auditoria-{bloco["indice"]}')
+    usuarios = _usuarios['todos']
+    descricoes = dict(Auditoria.ACAO_CHOICES)
+    objetos = [
+        Auditoria(
+            pk=pk,
+            usuario_id=rng.choice(usuarios),
+            acao=acao,
+            descricao=descricoes[acao],
+            ip_address=f'10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}',
+            data_hora=instante(rng, bloco['hoje'] - timedelta(days=rng.randrange(365)), 0, 24),
+        )
+        for pk, acao in enumerate(
+            escolher(rng, bloco['acoes'], bloco['quantidade']), start=bloco['primeira_auditoria']
+        )
+    ]
+    with transaction.atomic():
+        Auditoria.objects.bulk_create(objetos, batch_size=bloco['lote'])
+    return len(objetos)
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera usuários, eventos, inscrições, certificados e registros de auditoria sintéticos '
+        'com bulk_create (sem signals, emails nem auditoria automática). A mesma semente e a '
+        'mesma data de referência sobre o mesmo banco geram os mesmos dados. O volume padrão '
+        '(cerca de 22 milhões de linhas) é pensado para PostgreSQL com --processos; no SQLite a '
+        'gravação é sequencial (8 a 10 mil linhas/s) e leva dezenas de minutos, então reduza as '
+        'quantidades (ex.: --usuarios 20000 --eventos 2000 --inscricoes 200000 --auditorias 200000)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=1_000_000, help='Usuários a criar')
+        parser.add_argument('--eventos', type=int, default=100_000, help='Eventos a criar')
+        parser.add_argument(
+            '--inscricoes',
+            type=int,
+            default=10_000_000,
+            help='Inscrições a criar (aproximado: a procura de cada evento é arredondada)'
+        )
+        parser.add_argument('--auditorias', type=int, default=10_000_000, help='Registros de auditoria a criar')
+        parser.add_argument('--semente', type=int, default=42, help='Semente do gerador pseudoaleatório')
+        parser.add_argument(
+            '--data-referencia',
+            help='Data "de hoje" dos dados gerados (AAAA-MM-DD); padrão: hoje'
+        )
+        parser.add_argument(
+            '--perfis',
+            default=','.join(f'{perfil}={peso}' for perfil, peso in PESOS_PERFIS.items()),
+            help='Pesos dos perfis dos usuários'
+        )
+        parser.add_argument(
+            '--tipos',
+            default=','.join(f'{tipo}={peso}' for tipo, peso in PESOS_TIPOS.items()),
+            help='Pesos dos tipos de evento'
+        )
+        parser.add_argument(
+            '--acoes',
+            default=','.join(f'{acao}={peso}' for acao, peso in PESOS_ACOES.items()),
+            help='Pesos das ações de auditoria'
+        )
+        parser.add_argument(
+            '--popularidade',
+            type=float,
+            default=1.0,
+            help='Desvio (lognormal) da procura pelos eventos; 0 = todos com a mesma procura'
+        )
+        parser.add_argument(
+            '--dias-passados',
+            type=int,
+            default=365,
+            help='Os eventos começam entre esta quantidade de dias atrás e --dias-futuros'
+        )
+        parser.add_argument('--dias-futuros', type=int, default=180, help='Ver --dias-passados')
+        parser.add_argument(
+            '--cancelamentos',
+            type=float,
+            default=0.1,
+            help='Fração das inscrições canceladas'
+        )
+        parser.add_argument(
+            '--certificados',
+            type=float,
+            default=0.8,
+            help='Fração das inscrições ativas de eventos encerrados com certificado'
+        )
+        parser.add_argument(
+            '--eventos-inativos',
+            type=float,
+            default=0.05,
+            help='Fração dos eventos desativados'
+        )
+        parser.add_argument('--lote', type=int, default=5000, help='Linhas por bulk_create')
+        parser.add_argument(
+            '--processos',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Processos que geram inscrições e auditoria em paralelo (sempre 1 no SQLite)'
+        )
+
+    def handle(self, *args, **options):
+        if options['usuarios'] < 1 or min(options['eventos'], options['inscricoes'], options['auditorias']) < 0:
+            raise CommandError('--usuarios deve ser positivo e as demais quantidades não podem ser negativas.')
+        if options['data_referencia']:
+            try:
+                self.hoje = date.fromisoformat(options['data_referencia'])
+            except ValueError:
+                raise CommandError('--data-referencia deve estar no formato AAAA-MM-DD.')
+        else:
+            self.hoje = date.today()
+
+        self.options = options
+        self.perfis = pesos(options['perfis'], dict(Usuario.PERFIL_CHOICES))
+        self.tipos = pesos(options['tipos'], dict(Evento.TIPO_CHOICES))
+        self.acoes = pesos(options['acoes'], dict(Auditoria.ACAO_CHOICES))
+        self.rng = random.Random(options['semente'])
+
+        # Vários processos escrevendo no SQLite só disputariam o mesmo lock
+        processos = 1 if connection.vendor == 'sqlite' else max(1, options['processos'])
+
+        if connection.vendor == 'sqlite':
+            # Cache de páginas maior para as inserções nos índices (256 MB)
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA cache_size = -262144')
+
+        inicio = time_module.monotonic()
+        with sem_datas_automaticas(Usuario, Evento):
+            self.gerar_usuarios()
+            planos = self.gerar_eventos()
+
+        usuarios = (self.participantes, self.organizadores + self.participantes)
+        executor = None
+        if processos > 1:
+            # Os processos filhos não podem herdar conexões abertas com o banco
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo, initargs=usuarios)
+        else:
+            _iniciar_processo(*usuarios, configurar=False)
+
+        try:
+            self.gerar_inscricoes(planos, executor)
+            self.gerar_auditorias(executor)
+        finally:
+            if executor:
+                executor.shutdown()
+
+        # Os ids foram definidos aqui; as sequências do banco precisam acompanhar
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), [Usuario, Evento, Inscricao, Certificado, Auditoria]
+            ):
+                cursor.execute(sql)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Dados sintéticos gerados em {time_module.monotonic() - inicio:.1f}s '
+            f'(senha de todos os usuários: {SENHA_PADRAO}).'
+        ))
+
+    def proximo_id(self, modelo):
+        return (modelo.objects.aggregate(maximo=Max('pk'))['maximo'] or 0) + 1
+
+    def progresso(self, rotulo, total, inicio):
+        if self.options['verbosity'] >= 2:
+            decorrido = time_module.monotonic() - inicio
+            self.stdout.write(f'  {rotulo}: {total} ({total / decorrido if decorrido else 0:.0f}/s)')
+
+    def executar(self, funcao, blocos, executor):
+        if executor:
+            return executor.map(funcao, blocos)
+        return map(funcao, blocos)
+
+    def gerar_usuarios(self):
+        """
+        Usuários com username/email derivados do id; todos com a mesma
+        senha, cujo hash é calculado uma única vez
+        """
+        quantidade = self.options['usuarios']
+        senha = make_password(SENHA_PADRAO)
+        primeiro_id = self.proximo_id(Usuario)
+        self.organizadores, self.professores, alunos = [], [], []
+        por_perfil = {'ORGANIZADOR': self.organizadores, 'PROFESSOR': self.professores, 'ALUNO': alunos}
+
+        inicio = time_module.monotonic()
+        objetos = []
+        for pk, perfil in enumerate(escolher(self.rng, self.perfis, quantidade), start=primeiro_id):
+            por_perfil[perfil].append(pk)
+            confirmado = self.rng.random() < 0.9
+            cadastro = instante(self.rng, self.hoje - timedelta(days=self.rng.randrange(730)))
+            objetos.append(Usuario(
+                pk=pk,
+                username=f'usuario{pk}',
+                email=f'usuario{pk}@sgea.test',
+                password=senha,
+                first_name=self.rng.choice(NOMES),
+                last_name=self.rng.choice(SOBRENOMES),
+                telefone=f'(11) 9{pk % 10000:04d}-{pk // 10000 % 10000:04d}',
+                instituicao=None if perfil == 'ORGANIZADOR' else self.rng.choice(INSTITUICOES),
+                perfil=perfil,
+                email_confirmado=confirmado,
+                token_confirmacao=None if confirmado else f'sintetico-{pk}',
+                date_joined=cadastro,
+                data_cadastro=cadastro,
+            ))
+            if len(objetos) >= self.options['lote'] or pk - primeiro_id + 1 == quantidade:
+                with transaction.atomic():
+                    Usuario.objects.bulk_create(objetos, batch_size=self.options['lote'])
+                objetos = []
+                self.progresso('usuários', pk - primeiro_id + 1, inicio)
+
+        # Professores também se inscrevem em eventos
+        self.participantes = alunos + self.professores
+        if self.options['eventos'] and not (self.organizadores and self.professores):
+            raise CommandError('A distribuição de perfis precisa gerar organizadores e professores.')
+        self.stdout.write(
+            f'{quantidade} usuário(s): {len(self.organizadores)} organizador(es), '
+            f'{len(self.professores)} professor(es).'
+        )
+
+    def gerar_eventos(self):
+        """
+        Cria os eventos e retorna o plano de inscrições de cada um:
+        (id, inscrições, ativas, data de criação, data inicial, data final,
+        organizador). A procura segue uma lognormal (poucos eventos
+        concentram boa parte das inscrições) e as vagas acompanham a procura
+        com ocupação entre 50% e 100% (cerca de um terço lota).
+        """
+        quantidade = self.options['eventos']
+        if not quantidade:
+            return []
+
+        procura = [self.rng.lognormvariate(0, self.options['popularidade']) for _ in range(quantidade)]
+        escala = self.options['inscricoes'] / sum(procura)
+        tipos = escolher(self.rng, self.tipos, quantidade)
+
+        primeiro_id = self.proximo_id(Evento)
+        planos = []
+        objetos = []
+        inicio = time_module.monotonic()
+        for pk, peso, tipo in zip(range(primeiro_id, primeiro_id + quantidade), procura, tipos):
+            inscricoes = min(len(self.participantes), round(peso * escala))
+            ativas = inscricoes - round(inscricoes * self.options['cancelamentos'])
+            ocupacao = min(1.0, self.rng.uniform(0.5, 1.25))
+
+            data_inicial = self.hoje + timedelta(
+                days=self.rng.randint(-self.options['dias_passados'], self.options['dias_futuros'])
+            )
+            duracao = 4 if tipo == 'SEMANA_ACADEMICA' else self.rng.choice([0, 0, 0, 1])
+            data_final = data_inicial + timedelta(days=duracao)
+            criacao = instante(self.rng, data_inicial - timedelta(days=self.rng.randint(7, 90)))
+            hora = self.rng.randrange(8, 20)
+            organizador = self.rng.choice(self.organizadores)
+
+            objetos.append(Evento(
+                pk=pk,
+                tipo=tipo,
+                nome=FORMATOS_NOME[tipo].format(tema=self.rng.choice(TEMAS)) + f' {data_inicial.year}',
+                descricao=f'Evento sobre {self.rng.choice(TEMAS)} e {self.rng.choice(TEMAS)}.',
+                data_inicial=data_inicial,
+                data_final=data_final,
+                horario_inicio=time(hora),
+                horario_fim=time(min(hora + self.rng.randint(1, 4), 23)),
+                local=self.rng.choice(LOCAIS).format(n=self.rng.randint(1, 20)),
+                vagas_totais=max(1, math.ceil(ativas / ocupacao)),
+                organizador_id=organizador,
+                professor_responsavel_id=self.rng.choice(self.professores),
+                data_criacao=criacao,
+                data_atualizacao=criacao,
+                ativo=self.rng.random() >= self.options['eventos_inativos'],
+                inscritos_ativos=ativas,
+            ))
+            planos.append((pk, inscricoes, ativas, criacao, data_inicial, data_final, organizador))
+            if len(objetos) >= self.options['lote'] or len(planos) == quantidade:
+                with transaction.atomic():
+                    Evento.objects.bulk_create(objetos, batch_size=self.options['lote'])
+                objetos = []
+                self.progresso('eventos', len(planos), inicio)
+
+        self.stdout.write(f'{quantidade} evento(s).')
+        return planos
+
+    def gerar_inscricoes(self, planos, executor):
+        primeira_inscricao = self.proximo_id(Inscricao)
+        # Certificado de cada inscrição = id da inscrição + deslocamento
+        deslocamento = max(0, self.proximo_id(Certificado) - primeira_inscricao)
+        blocos = []
+        inicio_bloco = primeira_inscricao
+        for indice, posicao in enumerate(range(0, len(planos), EVENTOS_POR_BLOCO)):
+            planos_bloco = planos[posicao:posicao + EVENTOS_POR_BLOCO]
+            blocos.append({
+                'indice': indice,
+                'semente': self.options['semente'],
+                'hoje': self.hoje,
+                'lote': self.options['lote'],
+                'certificados': self.options['certificados'],
+                'primeira_inscricao': inicio_bloco,
+                'deslocamento_certificado': deslocamento,
+                'planos': planos_bloco,
+            })
+            inicio_bloco += sum(plano[1] for plano in planos_bloco)
+
+        inicio = time_module.monotonic()
+        inscricoes = certificados = 0
+        for criadas, emitidos in self.executar(gerar_bloco_inscricoes, blocos, executor):
+            inscricoes += criadas
+            certificados += emitidos
+            self.progresso('inscrições', inscricoes, inicio)
+        self.stdout.write(f'{inscricoes} inscrição(ões) e {certificados} certificado(s).')
+
+    def gerar_auditorias(self, executor):
+        quantidade = self.options['auditorias']
+        primeiro_id = self.proximo_id(Auditoria)
+        blocos = [
+            {
+                'indice': indice,
+                'semente': self.options['semente'],
+                'hoje': self.hoje,
+                'lote': self.options['lote'],
+                'acoes': self.acoes,
+                'quantidade': min(AUDITORIAS_POR_BLOCO, quantidade - posicao),
+                'primeira_auditoria': primeiro_id + posicao,
+            }
+            for indice, posicao in enumerate(range(0, quantidade, AUDITORIAS_POR_BLOCO))
+        ]
+
+        inicio = time_module.monotonic()
+        total = 0
+        for criados in self.executar(gerar_bloco_auditoria, blocos, executor):
+            total += criados
+            self.progresso('auditoria', total, inicio)
+        self.stdout.write(f'{total} registro(s) de auditoria.')
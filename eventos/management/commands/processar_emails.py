@@ -0,0 +1,167 @@
+"""
+Worker que esvazia a caixa de saída de emails (EmailPendente)
+"""
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from eventos.models import EmailPendente, ListaEspera
+from eventos.signals import MONTADORES_EMAIL
+
+
+class Command(BaseCommand):
+    help = 'Envia os emails pendentes em lotes, reutilizando uma conexão SMTP, com retry/backoff'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=50,
+            help='Quantidade de emails processados por lote'
+        )
+        parser.add_argument(
+            '--max-tentativas',
+            type=int,
+            default=5,
+            help='Tentativas antes de marcar o email como falho'
+        )
+        parser.add_argument(
+            '--backoff',
+            type=int,
+            default=60,
+            help='Espera (segundos) após a primeira falha; dobra a cada nova falha'
+        )
+        parser.add_argument(
+            '--reserva',
+            type=int,
+            default=300,
+            help='Segundos que um lote fica reservado para este worker'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Continua executando e verificando novos emails'
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=5.0,
+            help='Segundos entre verificações quando em --loop'
+        )
+    
+    def handle(self, *args, **options):
+        total_enviados = total_falhas = 0
+        
+        while True:
+            enviados, falhas = self.processar_lote(options)
+            total_enviados += enviados
+            total_falhas += falhas
+            
+            if not options['loop'] and not (enviados or falhas):
+                break
+            if options['loop'] and not (enviados or falhas):
+                time.sleep(options['intervalo'])
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'{total_enviados} email(s) enviado(s), {total_falhas} falha(s).'
+        ))
+    
+    def reservar_lote(self, tamanho, reserva):
+        """
+        Reserva um lote marcando as linhas com um identificador próprio, para
+        que vários workers possam rodar sem enviar o mesmo email duas vezes
+        """
+        agora = timezone.now()
+        lote = uuid.uuid4().hex
+        
+        ids = list(
+            EmailPendente.objects.filter(
+                status='PENDENTE',
+                proxima_tentativa__lte=agora
+            ).order_by('proxima_tentativa', 'id').values_list('id', flat=True)[:tamanho]
+        )
+        if not ids:
+            return []
+        
+        EmailPendente.objects.filter(
+            pk__in=ids,
+            status='PENDENTE',
+            proxima_tentativa__lte=agora
+        ).update(lote=lote, proxima_tentativa=agora + timedelta(seconds=reserva))
+        
+        return list(EmailPendente.objects.filter(lote=lote, status='PENDENTE'))
+    
+    def processar_lote(self, options):
+        pendentes = self.reservar_lote(options['lote'], options['reserva'])
+        if not pendentes:
+            return 0, 0
+        
+        # Carrega os objetos de origem em uma consulta por tipo
+        objetos = {}
+        for tipo, (queryset, _) in MONTADORES_EMAIL.items():
+            ids = [p.objeto_id for p in pendentes if p.tipo == tipo]
+            if ids:
+                objetos[tipo] = queryset().in_bulk(ids)
+        
+        enviados, falhas = [], []
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as e:
+            # Sem conexão nenhum email do lote sai: todos contam a tentativa e
+            # são reagendados com backoff, liberando a reserva
+            self.stderr.write(f'Falha ao abrir a conexão de email: {e}')
+            for pendente in pendentes:
+                self.registrar_falha(pendente, e, options)
+            falhas = pendentes
+        else:
+            try:
+                for pendente in pendentes:
+                    objeto = objetos.get(pendente.tipo, {}).get(pendente.objeto_id)
+                    if objeto is None:
+                        pendente.status = 'FALHOU'
+                        pendente.ultimo_erro = 'Registro de origem não encontrado'
+                        falhas.append(pendente)
+                        continue
+                    
+                    try:
+                        _, montar = MONTADORES_EMAIL[pendente.tipo]
+                        montar(objeto, connection=connection).send()
+                    except Exception as e:
+                        self.registrar_falha(pendente, e, options)
+                        falhas.append(pendente)
+                        self.stderr.write(f'Falha ao enviar {pendente}: {e}')
+                        continue
+                    
+                    pendente.status = 'ENVIADO'
+                    pendente.data_envio = timezone.now()
+                    enviados.append(pendente)
+            finally:
+                connection.close()
+        
+        EmailPendente.objects.bulk_update(
+            enviados + falhas,
+            ['status', 'tentativas', 'proxima_tentativa', 'ultimo_erro', 'data_envio']
+        )
+        
+        promovidos = [p.objeto_id for p in enviados if p.tipo == 'PROMOCAO_LISTA_ESPERA']
+        if promovidos:
+            ListaEspera.objects.filter(pk__in=promovidos).update(notificado=True)
+        
+        return len(enviados), len(falhas)
+    
+    def registrar_falha(self, pendente, erro, options):
+        """
+        Conta a tentativa e reagenda com backoff exponencial, ou marca o
+        email como falho ao esgotar as tentativas
+        """
+        pendente.tentativas += 1
+        pendente.ultimo_erro = str(erro)
+        if pendente.tentativas >= options['max_tentativas']:
+            pendente.status = 'FALHOU'
+        else:
+            espera = options['backoff'] * 2 ** (pendente.tentativas - 1)
+            pendente.proxima_tentativa = timezone.now() + timedelta(seconds=espera)
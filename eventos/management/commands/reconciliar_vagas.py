@@ -0,0 +1,52 @@
+"""
+Comando para reconciliar o contador de inscrições ativas dos eventos
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from eventos.models import Evento, Inscricao
+
+
+class Command(BaseCommand):
+    help = 'Recalcula Evento.inscritos_ativos a partir das inscrições ativas e corrige divergências'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas lista as divergências, sem corrigi-las'
+        )
+    
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        
+        eventos = Evento.objects.annotate(
+            total_real=Count('inscricoes', filter=Q(inscricoes__ativa=True))
+        ).values_list('id', 'nome', 'inscritos_ativos', 'total_real').order_by('id')
+        
+        divergentes = []
+        for evento_id, nome, contador, total_real in eventos.iterator(chunk_size=1000):
+            if contador != total_real:
+                self.stdout.write(
+                    f'Evento #{evento_id} "{nome}": contador={contador}, real={total_real}'
+                )
+                divergentes.append(evento_id)
+        
+        if dry_run:
+            self.stdout.write(f'{len(divergentes)} evento(s) com divergência.')
+            return
+        
+        # Recalcula dentro do próprio UPDATE para não perder inscrições concorrentes
+        contagem = Inscricao.objects.filter(
+            evento=OuterRef('pk'),
+            ativa=True
+        ).order_by().values('evento').annotate(total=Count('pk')).values('total')
+        
+        for inicio in range(0, len(divergentes), 500):
+            Evento.objects.filter(pk__in=divergentes[inicio:inicio + 500]).update(
+                inscritos_ativos=Coalesce(Subquery(contagem, output_field=IntegerField()), 0),
+                data_atualizacao=timezone.now()
+            )
+        
+        self.stdout.write(self.style.SUCCESS(f'{len(divergentes)} evento(s) corrigido(s).'))
@@ -0,0 +1,61 @@
+"""
+Comando para detectar consultas frequentes que passaram a ler tabelas inteiras
+"""
+from django.core.management.base import BaseCommand, CommandError
+from eventos.planos_consulta import CONSULTAS, LIMITE_LINHAS_PADRAO, verificar_planos
+
+
+class Command(BaseCommand):
+    help = (
+        'Executa as consultas registradas em eventos/planos_consulta.py, roda EXPLAIN nos '
+        'SELECTs e falha se algum plano ler por completo uma tabela grande'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--consulta',
+            action='append',
+            choices=list(CONSULTAS),
+            help='Nome da consulta a verificar (pode repetir); padrão: todas'
+        )
+        parser.add_argument(
+            '--limite-linhas',
+            type=int,
+            default=LIMITE_LINHAS_PADRAO,
+            help='Tabelas a partir deste número de linhas não podem ser lidas por completo'
+        )
+        parser.add_argument(
+            '--mostrar-planos',
+            action='store_true',
+            help='Exibe o plano completo das consultas com regressão'
+        )
+    
+    def handle(self, *args, **options):
+        resultados = verificar_planos(options['consulta'], options['limite_linhas'])
+        
+        total_regressoes = 0
+        for resultado in resultados:
+            nome = resultado['nome']
+            if resultado['ignorada']:
+                self.stdout.write(self.style.WARNING(f'-- {nome}: ignorada (faltam dados no banco)'))
+                continue
+            
+            if resultado['status'] != 200:
+                self.stdout.write(self.style.WARNING(
+                    f'!! {nome}: resposta HTTP {resultado["status"]}, o plano pode não refletir a view'
+                ))
+            
+            if not resultado['regressoes']:
+                self.stdout.write(f'ok {nome}: {resultado["consultas"]} consulta(s)')
+                continue
+            
+            total_regressoes += len(resultado['regressoes'])
+            self.stdout.write(self.style.ERROR(f'XX {nome}: {len(resultado["regressoes"])} leitura(s) completa(s)'))
+            for regressao in resultado['regressoes']:
+                self.stdout.write(f'   {regressao["tabela"]} ({regressao["linhas"]} linhas): {regressao["sql"][:300]}')
+                if options['mostrar_planos']:
+                    self.stdout.write(f'   plano: {regressao["plano"]}')
+        
+        if total_regressoes:
+            raise CommandError(f'{total_regressoes} consulta(s) lendo tabelas inteiras.')
+        self.stdout.write(self.style.SUCCESS('Nenhuma regressão de plano encontrada.'))
@@ -0,0 +1,110 @@
+"""
+Middlewares do SGEA
+"""
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .auditoria import buffer_auditoria, configuracao
+
+logger_consultas = logging.getLogger('eventos.consultas')
+
+ORCAMENTO_CONSULTAS_PADRAO = {
+    'ATIVO': True,
+    'SERVER_TIMING': False,
+    'PADRAO': 20,
+    'TEMPO_MS': 200,
+    'POR_URL': {},
+}
+
+
+def configuracao_orcamento():
+    return {**ORCAMENTO_CONSULTAS_PADRAO, **getattr(settings, 'ORCAMENTO_CONSULTAS', {})}
+
+
+class ContadorConsultas:
+    """
+    execute_wrapper que acumula o número de consultas e o tempo gasto
+    """
+    
+    def __init__(self):
+        self.total = 0
+        self.duracao = 0.0
+    
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.total += 1
+            self.duracao += time.perf_counter() - inicio
+    
+    @property
+    def duracao_ms(self):
+        return self.duracao * 1000
+
+
+class AuditoriaBufferMiddleware:
+    """
+    Ao fim de cada requisição grava o buffer de auditoria se o lote estiver
+    cheio ou se o registro mais antigo já tiver passado do intervalo.
+    
+    O flush não acontece em toda requisição de propósito: endpoints que geram
+    um único registro (consulta de eventos, validação de certificado) passam
+    a compartilhar o mesmo INSERT em lote.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        response = self.get_response(request)
+        if configuracao()['ATIVO']:
+            buffer_auditoria.descarregar_se_necessario()
+        return response
+
+
+class ConsultasSQLMiddleware:
+    """
+    Conta as consultas SQL da requisição e o tempo gasto nelas.
+    
+    Se passar do orçamento configurado em settings.ORCAMENTO_CONSULTAS (por
+    nome de URL ou padrão), é registrado no log 'eventos.consultas'. Com
+    SERVER_TIMING ligado (desligado por padrão, pois expõe o custo interno
+    de cada página) o total também vai no cabeçalho Server-Timing, visível
+    nas ferramentas do navegador. Deve ser o primeiro middleware da lista, para
+    incluir as consultas de sessão e autenticação. Respostas em streaming só
+    contam as consultas feitas antes do início do envio.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        config = configuracao_orcamento()
+        if not config['ATIVO']:
+            return self.get_response(request)
+        
+        contador = ContadorConsultas()
+        with ExitStack() as pilha:
+            for alias in connections:
+                pilha.enter_context(connections[alias].execute_wrapper(contador))
+            response = self.get_response(request)
+        
+        if config['SERVER_TIMING']:
+            response['Server-Timing'] = (
+                f'db;desc="{contador.total} consultas";dur={contador.duracao_ms:.1f}'
+            )
+        
+        nome_url = request.resolver_match.view_name if request.resolver_match else None
+        limite = config['POR_URL'].get(nome_url, config['PADRAO'])
+        if contador.total > limite or contador.duracao_ms > config['TEMPO_MS']:
+            logger_consultas.warning(
+                'Orçamento de consultas excedido em %s %s (%s): %d consultas (limite %d), %.1f ms (limite %d ms)',
+                request.method, request.path, nome_url, contador.total, limite,
+                contador.duracao_ms, config['TEMPO_MS']
+            )
+        return response
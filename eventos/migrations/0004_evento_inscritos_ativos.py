@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:49
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def popular_inscritos_ativos(apps, schema_editor):
+    """
+    Preenche o contador a partir das inscrições ativas existentes
+    """
+    Evento = apps.get_model('eventos', 'Evento')
+    Inscricao = apps.get_model('eventos', 'Inscricao')
+    
+    contagem = Inscricao.objects.filter(
+        evento=OuterRef('pk'),
+        ativa=True
+    ).order_by().values('evento').annotate(total=Count('pk')).values('total')
+    
+    Evento.objects.update(
+        inscritos_ativos=Coalesce(Subquery(contagem, output_field=IntegerField()), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0003_auto_20251211_2125'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evento',
+            name='inscritos_ativos',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Contador desnormalizado de inscrições ativas'),
+        ),
+        migrations.RunPython(popular_inscritos_ativos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0004_evento_inscritos_ativos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListaEspera',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('AGUARDANDO', 'Aguardando vaga'), ('PROMOVIDO', 'Promovido para inscrição'), ('DESISTIU', 'Desistiu da fila')], default='AGUARDANDO', help_text='Situação do usuário na fila', max_length=12)),
+                ('data_entrada', models.DateTimeField(default=django.utils.timezone.now, help_text='Data e hora de entrada na fila (define a ordem)')),
+                ('data_promocao', models.DateTimeField(blank=True, help_text='Data e hora em que o usuário recebeu a vaga', null=True)),
+                ('notificado', models.BooleanField(default=False, help_text='Indica se o usuário já foi avisado da promoção')),
+                ('evento', models.ForeignKey(help_text='Evento aguardado', on_delete=django.db.models.deletion.CASCADE, related_name='lista_espera', to='eventos.evento')),
+                ('usuario', models.ForeignKey(help_text='Usuário na fila de espera', on_delete=django.db.models.deletion.CASCADE, related_name='listas_espera', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Lista de Espera',
+                'verbose_name_plural': 'Listas de Espera',
+                'ordering': ['data_entrada', 'id'],
+                'indexes': [models.Index(fields=['evento', 'status', 'data_entrada', 'id'], name='eventos_lis_evento__c07ece_idx'), models.Index(fields=['status', 'notificado'], name='eventos_lis_status_9efbf0_idx')],
+                'unique_together': {('usuario', 'evento')},
+            },
+        ),
+    ]
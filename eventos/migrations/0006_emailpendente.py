@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:56
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0005_listaespera'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailPendente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('BOAS_VINDAS', 'Boas-vindas e confirmação de email'), ('CONFIRMACAO_INSCRICAO', 'Confirmação de inscrição'), ('PROMOCAO_LISTA_ESPERA', 'Promoção da lista de espera')], help_text='Tipo de email a ser montado pelo worker', max_length=30)),
+                ('objeto_id', models.PositiveBigIntegerField(help_text='ID do registro de origem (usuário, inscrição ou lista de espera)')),
+                ('status', models.CharField(choices=[('PENDENTE', 'Pendente'), ('ENVIADO', 'Enviado'), ('FALHOU', 'Falhou')], default='PENDENTE', help_text='Situação do envio', max_length=10)),
+                ('tentativas', models.PositiveSmallIntegerField(default=0, help_text='Quantidade de tentativas de envio com falha')),
+                ('proxima_tentativa', models.DateTimeField(default=django.utils.timezone.now, help_text='Momento a partir do qual o email pode ser (re)enviado')),
+                ('lote', models.CharField(blank=True, help_text='Identificador do lote do worker que reservou o email', max_length=32, null=True)),
+                ('ultimo_erro', models.TextField(blank=True, help_text='Mensagem da última falha de envio')),
+                ('data_criacao', models.DateTimeField(auto_now_add=True, help_text='Data e hora em que o email entrou na fila')),
+                ('data_envio', models.DateTimeField(blank=True, help_text='Data e hora do envio', null=True)),
+            ],
+            options={
+                'verbose_name': 'Email Pendente',
+                'verbose_name_plural': 'Emails Pendentes',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='listaespera',
+            name='eventos_lis_status_9efbf0_idx',
+        ),
+        migrations.AddIndex(
+            model_name='emailpendente',
+            index=models.Index(fields=['status', 'proxima_tentativa'], name='eventos_ema_status_f81033_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emailpendente',
+            index=models.Index(fields=['lote'], name='eventos_ema_lote_1b9f74_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:57
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0006_emailpendente'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auditoria',
+            name='data_hora',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, help_text='Data e hora da ação'),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:06
+
+import base64
+import hashlib
+import hmac
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import migrations, models
+
+
+# Cópia congelada de eventos.codigos_certificado: a migration não pode mudar
+# junto com o código do app
+def _base36(numero):
+    digitos = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    resultado = ''
+    while True:
+        numero, resto = divmod(numero, 36)
+        resultado = digitos[resto] + resultado
+        if not numero:
+            return resultado
+
+
+def codigo_para_inscricao(inscricao_id):
+    chave = getattr(settings, 'CERTIFICADO_CHAVE_ASSINATURA', None)
+    if not chave:
+        raise ImproperlyConfigured(
+            'Defina CERTIFICADO_CHAVE_ASSINATURA para assinar os códigos dos certificados.'
+        )
+    if isinstance(chave, str):
+        chave = chave.encode('utf-8')
+    
+    identificador36 = _base36(inscricao_id)
+    mensagem = f'SGEA-{identificador36}'.encode('ascii')
+    digest = hmac.new(chave, mensagem, hashlib.sha256).digest()[:15]
+    return f'SGEA-{identificador36}-{base64.b32encode(digest).decode("ascii")}'
+
+
+def assinar_codigos_existentes(apps, schema_editor):
+    """
+    Move os códigos UUID para codigo_legado (continuam válidos) e gera o
+    código assinado de cada certificado existente
+    """
+    Certificado = apps.get_model('eventos', 'Certificado')
+    
+    certificados = list(Certificado.objects.filter(codigo_legado__isnull=True).only('pk', 'inscricao_id', 'codigo_verificacao'))
+    for certificado in certificados:
+        certificado.codigo_legado = certificado.codigo_verificacao
+        certificado.codigo_verificacao = codigo_para_inscricao(certificado.inscricao_id)
+    Certificado.objects.bulk_update(certificados, ['codigo_legado', 'codigo_verificacao'], batch_size=500)
+
+
+def restaurar_codigos_legados(apps, schema_editor):
+    Certificado = apps.get_model('eventos', 'Certificado')
+    
+    certificados = list(Certificado.objects.filter(codigo_legado__isnull=False).only('pk', 'codigo_legado'))
+    for certificado in certificados:
+        certificado.codigo_verificacao = certificado.codigo_legado
+        certificado.codigo_legado = None
+    Certificado.objects.bulk_update(certificados, ['codigo_verificacao', 'codigo_legado'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0007_auditoria_data_hora_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificado',
+            name='codigo_legado',
+            field=models.CharField(blank=True, editable=False, help_text='Código UUID anterior aos códigos assinados, ainda aceito na validação', max_length=50, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='certificado',
+            name='revogado',
+            field=models.BooleanField(default=False, help_text='Certificados revogados deixam de ser aceitos na validação'),
+        ),
+        migrations.RunPython(assinar_codigos_existentes, restaurar_codigos_legados),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:13
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0008_certificado_codigo_assinado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoExcluido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('evento_id', models.BigIntegerField(help_text='ID do evento excluído')),
+                ('data_exclusao', models.DateTimeField(default=django.utils.timezone.now, help_text='Data e hora da exclusão')),
+            ],
+            options={
+                'verbose_name': 'Evento Excluído',
+                'verbose_name_plural': 'Eventos Excluídos',
+                'ordering': ['data_exclusao', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['data_atualizacao', 'id'], name='eventos_eve_data_at_43e913_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventoexcluido',
+            index=models.Index(fields=['data_exclusao', 'id'], name='eventos_eve_data_ex_27a7c8_idx'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+from django.db import migrations
+
+
+# Cópia congelada da estrutura de busca de eventos/busca.py: a migration não
+# pode mudar junto com o código do app
+TABELA_FTS = 'eventos_evento_fts'
+
+SQL_FTS5 = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_FTS} USING fts5(
+        nome, descricao, local,
+        content='eventos_evento', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ai AFTER INSERT ON eventos_evento BEGIN
+        INSERT INTO {TABELA_FTS}(rowid, nome, descricao, local)
+        VALUES (new.id, new.nome, new.descricao, new.local);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ad AFTER DELETE ON eventos_evento BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, nome, descricao, local)
+        VALUES ('delete', old.id, old.nome, old.descricao, old.local);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_au AFTER UPDATE OF nome, descricao, local ON eventos_evento BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, nome, descricao, local)
+        VALUES ('delete', old.id, old.nome, old.descricao, old.local);
+        INSERT INTO {TABELA_FTS}(rowid, nome, descricao, local)
+        VALUES (new.id, new.nome, new.descricao, new.local);
+    END
+    """,
+    f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')",
+]
+
+VETOR_POSTGRESQL = (
+    "(setweight(to_tsvector('portuguese', sgea_unaccent(eventos_evento.nome)), 'A') || "
+    "setweight(to_tsvector('portuguese', sgea_unaccent(eventos_evento.local)), 'B') || "
+    "setweight(to_tsvector('portuguese', sgea_unaccent(eventos_evento.descricao)), 'C'))"
+)
+
+SQL_POSTGRESQL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    CREATE OR REPLACE FUNCTION sgea_unaccent(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+    """,
+    f"CREATE INDEX IF NOT EXISTS eventos_evento_busca_idx ON eventos_evento USING GIN ({VETOR_POSTGRESQL})",
+]
+
+
+def criar_indice_busca(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    comandos = {'sqlite': SQL_FTS5, 'postgresql': SQL_POSTGRESQL}.get(vendor, [])
+    for sql in comandos:
+        schema_editor.execute(sql)
+
+
+def remover_indice_busca(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for sufixo in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {TABELA_FTS}_{sufixo}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {TABELA_FTS}')
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS eventos_evento_busca_idx')
+        schema_editor.execute('DROP FUNCTION IF EXISTS sgea_unaccent(text)')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0009_eventoexcluido'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice_busca, remover_indice_busca),
+    ]
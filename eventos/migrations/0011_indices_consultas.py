@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0010_evento_busca_textual'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='certificado',
+            name='eventos_cer_codigo__3aff4f_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='evento',
+            name='eventos_eve_ativo_999f2d_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='inscricao',
+            name='eventos_ins_usuario_906444_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='inscricao',
+            name='eventos_ins_evento__2058b3_idx',
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['data_inicial', 'horario_inicio', 'id'], name='evento_ativo_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscricao',
+            index=models.Index(fields=['usuario', 'data_inscricao', 'id'], name='inscricao_usuario_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscricao',
+            index=models.Index(condition=models.Q(('ativa', True)), fields=['evento', 'data_inscricao'], name='inscricao_evento_ativa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usuario',
+            index=models.Index(condition=models.Q(('token_confirmacao__isnull', False)), fields=['token_confirmacao'], name='usuario_token_pendente_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0011_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoBusca',
+            fields=[
+                ('evento', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='busca_textual', serialize=False, to='eventos.evento')),
+                ('documento', models.TextField(db_column='eventos_evento_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'eventos_evento_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -1,13 +1,23 @@
 """
 Models para o Sistema de Gestão de Eventos Acadêmicos (SGEA)
 """
+import hashlib
 import uuid
-from django.db import models
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
+from django.db.models import BooleanField, Case, Count, ExpressionWrapper, F, Q, Value, When
+from django.db.models.functions import Greatest
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from .validators import validate_phone_number, validate_image_file, validate_future_date
+from .auditoria import configuracao as configuracao_auditoria, registrar_bufferizado
+from .codigos_certificado import codigo_para_inscricao, inscricao_do_codigo, normalizar_codigo_legado
+
+# Limite de tempo (segundos) das estatísticas do dashboard do organizador em
+# cache; normalmente elas são descartadas antes disso pelos signals
+TTL_ESTATISTICAS_ORGANIZADOR = 60 * 60
 
 
 class Usuario(AbstractUser):
@@ -62,6 +72,14 @@ class Usuario(AbstractUser):
         verbose_name = "Usuário"
         verbose_name_plural = "Usuários"
         ordering = ['first_name', 'last_name']
+        indexes = [
+            # confirmar_email; só usuários com confirmação pendente têm token
+            models.Index(
+                fields=['token_confirmacao'],
+                condition=Q(token_confirmacao__isnull=False),
+                name='usuario_token_pendente_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.get_full_name()} ({self.get_perfil_display()})"
@@ -79,6 +97,24 @@ class Usuario(AbstractUser):
         super().save(*args, **kwargs)
 
 
+class EventoQuerySet(models.QuerySet):
+    
+    def with_seat_stats(self):
+        """
+        Anota vagas_livres, lotado e encerrado calculados pelo banco na
+        própria consulta dos eventos. As propriedades vagas_disponiveis,
+        esta_lotado e ja_ocorreu usam esses valores quando presentes.
+        """
+        hoje = timezone.now().date()
+        return self.annotate(
+            vagas_livres=F('vagas_totais') - F('inscritos_ativos'),
+            lotado=ExpressionWrapper(
+                Q(inscritos_ativos__gte=F('vagas_totais')), output_field=BooleanField()
+            ),
+            encerrado=ExpressionWrapper(Q(data_final__lt=hoje), output_field=BooleanField()),
+        )
+
+
 class Evento(models.Model):
     """
     Model para eventos acadêmicos.
@@ -170,6 +206,14 @@ class Evento(models.Model):
         help_text="Indica se o evento está ativo"
     )
     
+    inscritos_ativos = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Contador desnormalizado de inscrições ativas"
+    )
+    
+    objects = EventoQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Evento"
         verbose_name_plural = "Eventos"
@@ -178,12 +222,124 @@ class Evento(models.Model):
             models.Index(fields=['data_inicial']),
             models.Index(fields=['tipo']),
             models.Index(fields=['organizador']),
-            models.Index(fields=['ativo']),
+            # Eventos ativos por data (home, lista de eventos, API): também
+            # entrega a ordenação da API e da lista sem ordenar em memória
+            models.Index(
+                fields=['data_inicial', 'horario_inicio', 'id'],
+                condition=Q(ativo=True),
+                name='evento_ativo_data_idx'
+            ),
+            # Sincronização incremental (api/eventos/changes/)
+            models.Index(fields=['data_atualizacao', 'id']),
         ]
     
     def __str__(self):
         return f"{self.nome} ({self.get_tipo_display()})"
     
+    def save(self, *args, **kwargs):
+        """
+        Override do save para nunca sobrescrever o contador de inscritos
+        com um valor possivelmente desatualizado em memória
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name != 'inscritos_ativos'
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+        self.invalidar_estatisticas()
+    
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.invalidar_estatisticas()
+    
+    @staticmethod
+    def ajustar_inscritos(evento_id, delta):
+        """
+        Atualiza atomicamente o contador de inscrições ativas do evento.
+        
+        Incrementos só são aplicados se ainda houver vagas (UPDATE condicional),
+        então o retorno 0 significa que o evento está lotado. A data de
+        atualização também avança, pois as vagas exibidas mudaram (ETag e
+        Last-Modified das páginas do evento dependem dela).
+        """
+        eventos = Evento.objects.filter(pk=evento_id)
+        if delta > 0:
+            eventos = eventos.filter(inscritos_ativos__lte=F('vagas_totais') - delta)
+        elif delta < 0:
+            eventos = eventos.filter(inscritos_ativos__gte=-delta)
+        return eventos.update(
+            inscritos_ativos=F('inscritos_ativos') + delta,
+            data_atualizacao=timezone.now()
+        )
+    
+    @staticmethod
+    def liberar_vagas(por_evento):
+        """
+        Devolve aos eventos, em um único UPDATE, as vagas de inscrições
+        ativas removidas em lote ({evento_id: quantidade})
+        """
+        if not por_evento:
+            return 0
+        liberadas = Case(*[When(pk=pk, then=Value(n)) for pk, n in por_evento.items()], default=Value(0))
+        return Evento.objects.filter(pk__in=por_evento).update(
+            inscritos_ativos=Greatest(F('inscritos_ativos') - liberadas, Value(0)),
+            data_atualizacao=timezone.now()
+        )
+    
+    @staticmethod
+    def reservar_vagas(evento_id, quantidade):
+        """
+        Reserva até `quantidade` vagas de uma vez e retorna quantas foram
+        obtidas (o que couber, se não houver vagas para todas)
+        """
+        while quantidade > 0:
+            if Evento.ajustar_inscritos(evento_id, quantidade):
+                return quantidade
+            livres = Evento.objects.filter(pk=evento_id).values_list(
+                F('vagas_totais') - F('inscritos_ativos'), flat=True
+            ).first() or 0
+            quantidade = min(quantidade, max(livres, 0))
+        return 0
+    
+    @staticmethod
+    def chave_cache_estatisticas(organizador_id):
+        return f'dashboard_organizador:{organizador_id}'
+    
+    @classmethod
+    def estatisticas_organizador(cls, organizador_id):
+        """
+        Totais do dashboard do organizador (eventos, eventos ativos,
+        inscrições ativas e certificados válidos dos seus eventos) em uma
+        única agregação, guardada em cache até o próximo signal de Evento,
+        Inscricao ou Certificado do organizador
+        """
+        chave = cls.chave_cache_estatisticas(organizador_id)
+        estatisticas = cache.get(chave)
+        if estatisticas is None:
+            # Inscrição -> certificado é 1-1, então o JOIN só repete eventos
+            estatisticas = cls.objects.filter(organizador_id=organizador_id).aggregate(
+                total_eventos=Count('id', distinct=True),
+                eventos_ativos=Count('id', filter=Q(ativo=True), distinct=True),
+                total_inscricoes=Count('inscricoes', filter=Q(inscricoes__ativa=True)),
+                total_certificados=Count(
+                    'inscricoes__certificado', filter=Q(inscricoes__certificado__revogado=False)
+                ),
+            )
+            cache.set(chave, estatisticas, TTL_ESTATISTICAS_ORGANIZADOR)
+        return estatisticas
+    
+    @classmethod
+    def limpar_cache_estatisticas(cls, *organizador_ids):
+        """
+        Descarta as estatísticas em cache dos organizadores após o commit
+        """
+        chaves = [cls.chave_cache_estatisticas(pk) for pk in organizador_ids if pk]
+        transaction.on_commit(lambda: cache.delete_many(chaves))
+    
     def clean(self):
         """
         Validações customizadas do modelo
@@ -215,28 +371,138 @@ class Evento(models.Model):
             except Usuario.DoesNotExist:
                 pass
     
+    # Propriedade -> anotação de with_seat_stats() que a substitui
+    ANOTACOES_VAGAS = {
+        'vagas_disponiveis': 'vagas_livres',
+        'esta_lotado': 'lotado',
+        'ja_ocorreu': 'encerrado',
+    }
+    
+    def _estatistica(self, nome, calcular):
+        """
+        Valor memorizado na instância: vem da anotação de with_seat_stats()
+        se ela existir, senão é calculado uma única vez
+        """
+        memoria = self.__dict__.setdefault('_estatisticas', {})
+        if nome not in memoria:
+            anotacao = self.ANOTACOES_VAGAS[nome]
+            memoria[nome] = self.__dict__[anotacao] if anotacao in self.__dict__ else calcular()
+        return memoria[nome]
+    
+    def invalidar_estatisticas(self):
+        """
+        Descarta os valores memorizados e as anotações (o contador ou os
+        campos da instância mudaram)
+        """
+        self.__dict__.pop('_estatisticas', None)
+        for anotacao in self.ANOTACOES_VAGAS.values():
+            self.__dict__.pop(anotacao, None)
+    
+    def somar_inscritos(self, delta):
+        """
+        Reflete na instância uma variação do contador já gravada no banco
+        """
+        self.inscritos_ativos += delta
+        self.invalidar_estatisticas()
+    
     @property
     def vagas_disponiveis(self):
         """
         Retorna o número de vagas disponíveis
         """
-        inscritos = self.inscricoes.filter(ativa=True).count()
-        return self.vagas_totais - inscritos
+        return self._estatistica('vagas_disponiveis', lambda: self.vagas_totais - self.inscritos_ativos)
     
     @property
     def esta_lotado(self):
         """
         Verifica se o evento está lotado
         """
-        return self.vagas_disponiveis <= 0
+        return self._estatistica('esta_lotado', lambda: self.vagas_disponiveis <= 0)
     
     @property
     def ja_ocorreu(self):
         """
         Verifica se o evento já ocorreu
         """
-        hoje = timezone.now().date()
-        return self.data_final < hoje
+        return self._estatistica('ja_ocorreu', lambda: self.data_final < timezone.now().date())
+
+
+class EventoExcluido(models.Model):
+    """
+    Registro (tombstone) de um evento excluído, para que a sincronização
+    incremental da API também informe exclusões.
+    """
+    evento_id = models.BigIntegerField(
+        help_text="ID do evento excluído"
+    )
+    
+    data_exclusao = models.DateTimeField(
+        default=timezone.now,
+        help_text="Data e hora da exclusão"
+    )
+    
+    class Meta:
+        verbose_name = "Evento Excluído"
+        verbose_name_plural = "Eventos Excluídos"
+        ordering = ['data_exclusao', 'id']
+        indexes = [
+            models.Index(fields=['data_exclusao', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"Evento #{self.evento_id} excluído em {self.data_exclusao:%d/%m/%Y %H:%M}"
+
+
+class EventoBusca(models.Model):
+    """
+    Tabela virtual FTS5 da busca textual no SQLite (eventos/busca.py),
+    mapeada só para que a busca seja uma junção do ORM com eventos_evento.
+    A estrutura é criada pela migration 0010, não pelo ORM.
+    """
+    evento = models.OneToOneField(
+        Evento,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='busca_textual'
+    )
+    
+    # Coluna oculta com o nome da tabela: é o lado esquerdo do MATCH
+    documento = models.TextField(db_column='eventos_evento_fts')
+    
+    # Relevância do bm25 na consulta corrente (coluna oculta do FTS5)
+    rank = models.FloatField()
+    
+    class Meta:
+        managed = False
+        db_table = 'eventos_evento_fts'
+
+
+class InscricaoQuerySet(models.QuerySet):
+    
+    def ativas_por_evento(self):
+        """
+        {evento_id: inscrições ativas} das inscrições do queryset
+        """
+        return dict(self.filter(ativa=True).order_by().values_list('evento_id').annotate(total=Count('pk')))
+    
+    def delete(self):
+        """
+        Exclusão em lote: as vagas voltam aos eventos em um único UPDATE e o
+        cache dos organizadores é descartado uma vez (os signals de exclusão
+        não fazem esse trabalho por linha)
+        """
+        with transaction.atomic(using=self.db):
+            por_evento = self.ativas_por_evento()
+            organizadores = list(self.order_by().values_list('evento__organizador_id', flat=True).distinct())
+            resultado = super().delete()
+            Evento.liberar_vagas(por_evento)
+            Evento.limpar_cache_estatisticas(*organizadores)
+        return resultado
+    
+    delete.alters_data = True
+    delete.queryset_only = True
 
 
 class Inscricao(models.Model):
@@ -273,20 +539,256 @@ class Inscricao(models.Model):
         help_text="Data e hora do cancelamento (se aplicável)"
     )
     
+    objects = InscricaoQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Inscrição"
         verbose_name_plural = "Inscrições"
         ordering = ['-data_inscricao']
+        # A restrição única (usuario, evento) já atende a verificação de
+        # inscrição duplicada
         unique_together = ['usuario', 'evento']
         indexes = [
-            models.Index(fields=['usuario', 'ativa']),
-            models.Index(fields=['evento', 'ativa']),
+            # Inscrições do usuário, da mais recente para a mais antiga
+            # (minhas inscrições, dashboard, API com paginação keyset)
+            models.Index(fields=['usuario', 'data_inscricao', 'id'], name='inscricao_usuario_data_idx'),
+            # Inscrições ativas do evento (lista de inscritos, inscrições recentes)
+            models.Index(
+                fields=['evento', 'data_inscricao'],
+                condition=Q(ativa=True),
+                name='inscricao_evento_ativa_idx'
+            ),
         ]
     
     def __str__(self):
         status = "Ativa" if self.ativa else "Cancelada"
         return f"{self.usuario.get_full_name()} - {self.evento.nome} ({status})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Guarda o estado carregado para calcular a variação do contador no save
+        if 'ativa' in field_names and 'evento_id' in field_names:
+            instance._estado_original = (instance.evento_id, instance.ativa)
+        return instance
+    
+    def _estado_anterior(self):
+        """
+        (evento_id, ativa) gravados no banco, ou (None, False) para uma
+        inscrição nova
+        """
+        if self._state.adding:
+            return None, False
+        if hasattr(self, '_estado_original'):
+            return self._estado_original
+        return Inscricao.objects.filter(
+            pk=self.pk
+        ).values_list('evento_id', 'ativa').first() or (None, False)
+    
+    def _ocupa_nova_vaga(self):
+        """
+        Se salvar a inscrição consome uma vaga do evento: inscrição nova
+        ativa, reativação ou troca de evento de uma inscrição ativa
+        """
+        evento_anterior, ativa_anterior = self._estado_anterior()
+        return self.ativa and not (ativa_anterior and evento_anterior == self.evento_id)
+    
+    def save(self, *args, ajustar_vagas=True, **kwargs):
+        """
+        Override do save para manter Evento.inscritos_ativos na mesma transação.
+        A vaga é reservada antes da escrita da inscrição; se o evento estiver
+        lotado, nada é gravado e ValidationError é lançado.
+        """
+        if not ajustar_vagas:
+            super().save(*args, **kwargs)
+            self._estado_original = (self.evento_id, self.ativa)
+            return
+        
+        evento_anterior, ativa_anterior = self._estado_anterior()
+        
+        with transaction.atomic():
+            if ativa_anterior and evento_anterior != self.evento_id:
+                Evento.ajustar_inscritos(evento_anterior, -1)
+                ativa_anterior = False
+            delta = int(self.ativa) - int(ativa_anterior)
+            ajustado = Evento.ajustar_inscritos(self.evento_id, delta) if delta else 0
+            if delta > 0 and not ajustado:
+                raise ValidationError(
+                    'Este evento não possui mais vagas disponíveis.',
+                    code='lotado'
+                )
+            super().save(*args, **kwargs)
+        
+        self._estado_original = (self.evento_id, self.ativa)
+        if delta and Inscricao.evento.is_cached(self):
+            self.evento.somar_inscritos(delta)
+    
+    @classmethod
+    def reservar(cls, usuario, evento, notificar=True):
+        """
+        Reserva uma vaga e cria (ou reativa) a inscrição em uma única transação.
+        
+        O primeiro comando da transação é o UPDATE condicional do contador,
+        que decide sozinho se há vaga; não existe janela entre verificar e
+        inserir. Lança ValidationError quando a inscrição é recusada.
+        Com notificar=False o email de confirmação não é enfileirado pelo signal.
+        """
+        if usuario.perfil == 'ORGANIZADOR':
+            raise ValidationError(
+                'Organizadores não podem se inscrever em eventos.'
+            )
+        
+        if evento.ja_ocorreu:
+            raise ValidationError(
+                'Não é possível se inscrever em eventos que já ocorreram.'
+            )
+        
+        try:
+            with transaction.atomic():
+                if not Evento.ajustar_inscritos(evento.pk, 1):
+                    raise ValidationError(
+                        'Este evento não possui mais vagas disponíveis.',
+                        code='lotado'
+                    )
+                
+                inscricao = cls.objects.select_for_update().filter(
+                    usuario=usuario,
+                    evento=evento
+                ).first()
+                
+                if inscricao is None:
+                    inscricao = cls(usuario=usuario, evento=evento)
+                elif inscricao.ativa:
+                    raise ValidationError(
+                        'Você já está inscrito neste evento.'
+                    )
+                else:
+                    inscricao.ativa = True
+                    inscricao.data_cancelamento = None
+                
+                inscricao.evento = evento
+                inscricao._notificar = notificar
+                inscricao.save(ajustar_vagas=False)
+        except IntegrityError:
+            # Outra requisição do mesmo usuário inseriu a inscrição primeiro
+            raise ValidationError(
+                'Você já está inscrito neste evento.'
+            )
+        
+        evento.somar_inscritos(1)
+        return inscricao
+    
+    @classmethod
+    def reservar_em_lote(cls, pares, notificar=True):
+        """
+        Inscreve vários pares (usuario, evento) em uma única transação.
+        
+        As regras de reservar() são verificadas em memória sobre duas
+        consultas (inscrições existentes antes e depois de reservar as vagas),
+        as vagas são reservadas com um UPDATE por evento, as inscrições novas
+        entram com bulk_create e auditoria e emails de confirmação também são
+        gravados em lote. Retorna uma lista paralela a `pares` com
+        (inscricao, None) ou (None, mensagem de erro).
+        """
+        resultados = [None] * len(pares)
+        
+        try:
+            with transaction.atomic():
+                cls._reservar_lote(pares, resultados, notificar)
+        except IntegrityError:
+            # Inscrição simultânea de algum dos pares; nada foi gravado
+            raise ValidationError(
+                'Algumas inscrições foram feitas ao mesmo tempo por outra requisição. Tente novamente.'
+            )
+        
+        return resultados
+    
+    @classmethod
+    def _inscricoes_existentes(cls, pares):
+        return {
+            (inscricao.usuario_id, inscricao.evento_id): inscricao
+            for inscricao in cls.objects.select_for_update().filter(
+                usuario_id__in={usuario.pk for usuario, _ in pares},
+                evento_id__in={evento.pk for _, evento in pares}
+            )
+        }
+    
+    @classmethod
+    def _reservar_lote(cls, pares, resultados, notificar):
+        """
+        Corpo transacional de reservar_em_lote
+        """
+        atuais = cls._inscricoes_existentes(pares)
+        candidatos = {}
+        vistos = set()
+        for indice, (usuario, evento) in enumerate(pares):
+            chave = (usuario.pk, evento.pk)
+            if usuario.perfil == 'ORGANIZADOR':
+                resultados[indice] = (None, 'Organizadores não podem se inscrever em eventos.')
+            elif evento.ja_ocorreu:
+                resultados[indice] = (None, 'Não é possível se inscrever em eventos que já ocorreram.')
+            elif chave in vistos:
+                resultados[indice] = (None, 'Item repetido na requisição.')
+            elif chave in atuais and atuais[chave].ativa:
+                resultados[indice] = (None, 'Usuário já inscrito neste evento.')
+            else:
+                vistos.add(chave)
+                candidatos.setdefault(evento.pk, []).append(indice)
+        
+        aceitos = []
+        for evento_id, indices in candidatos.items():
+            obtidas = Evento.reservar_vagas(evento_id, len(indices))
+            aceitos.extend(indices[:obtidas])
+            for indice in indices[obtidas:]:
+                resultados[indice] = (None, 'Este evento não possui mais vagas disponíveis.')
+        
+        # Releitura já com as vagas reservadas (lock de escrita obtido):
+        # uma inscrição feita em paralelo devolve a vaga reservada
+        atuais = cls._inscricoes_existentes(pares) if aceitos else {}
+        novas, reativadas = [], []
+        for indice in sorted(aceitos):
+            usuario, evento = pares[indice]
+            inscricao = atuais.get((usuario.pk, evento.pk))
+            if inscricao is not None and inscricao.ativa:
+                Evento.ajustar_inscritos(evento.pk, -1)
+                resultados[indice] = (None, 'Usuário já inscrito neste evento.')
+                continue
+            
+            if inscricao is None:
+                inscricao = cls(usuario=usuario, evento=evento)
+                novas.append(inscricao)
+            else:
+                inscricao.ativa = True
+                inscricao.data_cancelamento = None
+                reativadas.append(inscricao)
+            inscricao.usuario, inscricao.evento = usuario, evento
+            inscricao._estado_original = (evento.pk, True)
+            evento.somar_inscritos(1)
+            resultados[indice] = (inscricao, None)
+        
+        cls.objects.bulk_create(novas)
+        cls.objects.bulk_update(reativadas, ['ativa', 'data_cancelamento'])
+        
+        # Equivalente em lote ao signal inscricao_post_save
+        Auditoria.objects.bulk_create([
+            Auditoria(
+                usuario=inscricao.usuario,
+                acao='INSCRICAO',
+                descricao=f'Inscrição realizada no evento: {inscricao.evento.nome}',
+                dados_adicionais={
+                    'evento_id': inscricao.evento.id,
+                    'evento_nome': inscricao.evento.nome
+                }
+            )
+            for inscricao in novas
+        ])
+        Evento.limpar_cache_estatisticas(*{evento.organizador_id for _, evento in pares})
+        if notificar:
+            EmailPendente.objects.bulk_create([
+                EmailPendente(tipo='CONFIRMACAO_INSCRICAO', objeto_id=inscricao.pk)
+                for inscricao in novas
+            ])
+    
     def clean(self):
         """
         Validações customizadas
@@ -297,10 +799,12 @@ class Inscricao(models.Model):
                 'Não é possível se inscrever em eventos que já ocorreram.'
             )
         
-        # Verifica se há vagas disponíveis (apenas para novas inscrições)
-        if not self.pk and self.evento.esta_lotado:
+        # Verifica se há vagas disponíveis (novas inscrições e reativações;
+        # o save ainda reserva a vaga com o UPDATE condicional)
+        if self._ocupa_nova_vaga() and self.evento.esta_lotado:
             raise ValidationError(
-                'Este evento não possui mais vagas disponíveis.'
+                'Este evento não possui mais vagas disponíveis.',
+                code='lotado'
             )
         
         # Verifica se usuário é organizador (organizadores não podem se inscrever)
@@ -324,11 +828,180 @@ class Inscricao(models.Model):
     
     def cancelar(self):
         """
-        Cancela a inscrição
+        Cancela a inscrição e, na mesma transação, promove o próximo
+        usuário da lista de espera para a vaga liberada
+        """
+        with transaction.atomic():
+            self.ativa = False
+            self.data_cancelamento = timezone.now()
+            self.save()
+            ListaEspera.promover_proximos(self.evento)
+
+
+class ListaEspera(models.Model):
+    """
+    Model para a fila (FIFO) de espera de eventos lotados.
+    """
+    STATUS_CHOICES = [
+        ('AGUARDANDO', 'Aguardando vaga'),
+        ('PROMOVIDO', 'Promovido para inscrição'),
+        ('DESISTIU', 'Desistiu da fila'),
+    ]
+    
+    usuario = models.ForeignKey(
+        'Usuario',
+        on_delete=models.CASCADE,
+        related_name='listas_espera',
+        help_text="Usuário na fila de espera"
+    )
+    
+    evento = models.ForeignKey(
+        Evento,
+        on_delete=models.CASCADE,
+        related_name='lista_espera',
+        help_text="Evento aguardado"
+    )
+    
+    status = models.CharField(
+        max_length=12,
+        choices=STATUS_CHOICES,
+        default='AGUARDANDO',
+        help_text="Situação do usuário na fila"
+    )
+    
+    data_entrada = models.DateTimeField(
+        default=timezone.now,
+        help_text="Data e hora de entrada na fila (define a ordem)"
+    )
+    
+    data_promocao = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Data e hora em que o usuário recebeu a vaga"
+    )
+    
+    notificado = models.BooleanField(
+        default=False,
+        help_text="Indica se o usuário já foi avisado da promoção"
+    )
+    
+    class Meta:
+        verbose_name = "Lista de Espera"
+        verbose_name_plural = "Listas de Espera"
+        ordering = ['data_entrada', 'id']
+        unique_together = ['usuario', 'evento']
+        indexes = [
+            # Cabeça da fila: busca por índice, sem varrer a lista
+            models.Index(fields=['evento', 'status', 'data_entrada', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.usuario.get_full_name()} - {self.evento.nome} ({self.get_status_display()})"
+    
+    @property
+    def posicao(self):
+        """
+        Posição (1-based) do usuário na fila do evento
+        """
+        if self.status != 'AGUARDANDO':
+            return None
+        return ListaEspera.objects.filter(
+            evento_id=self.evento_id,
+            status='AGUARDANDO'
+        ).filter(
+            models.Q(data_entrada__lt=self.data_entrada) |
+            models.Q(data_entrada=self.data_entrada, id__lt=self.id)
+        ).count() + 1
+    
+    @classmethod
+    def entrar(cls, usuario, evento):
+        """
+        Coloca o usuário no fim da fila de espera do evento.
+        Se houver vaga livre, a fila é processada na mesma transação.
+        """
+        if usuario.perfil == 'ORGANIZADOR':
+            raise ValidationError(
+                'Organizadores não podem se inscrever em eventos.'
+            )
+        
+        if evento.ja_ocorreu:
+            raise ValidationError(
+                'Não é possível entrar na fila de eventos que já ocorreram.'
+            )
+        
+        if Inscricao.objects.filter(usuario=usuario, evento=evento, ativa=True).exists():
+            raise ValidationError(
+                'Você já está inscrito neste evento.'
+            )
+        
+        with transaction.atomic():
+            entrada, criada = cls.objects.select_for_update().get_or_create(
+                usuario=usuario,
+                evento=evento
+            )
+            if not criada:
+                if entrada.status == 'AGUARDANDO':
+                    raise ValidationError(
+                        'Você já está na lista de espera deste evento.'
+                    )
+                entrada.status = 'AGUARDANDO'
+                entrada.data_entrada = timezone.now()
+                entrada.data_promocao = None
+                entrada.notificado = False
+                entrada.save()
+            
+            cls.promover_proximos(evento)
+        
+        entrada.refresh_from_db(fields=['status', 'data_promocao'])
+        return entrada
+    
+    def desistir(self):
+        """
+        Remove o usuário da fila de espera
+        """
+        self.status = 'DESISTIU'
+        self.save(update_fields=['status'])
+    
+    @classmethod
+    def promover_proximos(cls, evento):
         """
-        self.ativa = False
-        self.data_cancelamento = timezone.now()
-        self.save()
+        Preenche as vagas livres do evento com a cabeça da fila, em ordem de
+        chegada. Cada promoção é uma busca indexada pelo primeiro da fila
+        seguida da reserva atômica da vaga. O aviso ao usuário vai para a
+        caixa de saída de emails. Retorna as entradas promovidas.
+        """
+        promovidos = []
+        if evento.ja_ocorreu:
+            return promovidos
+        
+        with transaction.atomic():
+            while True:
+                entrada = cls.objects.select_for_update().select_related('usuario').filter(
+                    evento_id=evento.pk,
+                    status='AGUARDANDO'
+                ).order_by('data_entrada', 'id').first()
+                
+                if entrada is None:
+                    break
+                
+                try:
+                    with transaction.atomic():
+                        Inscricao.reservar(entrada.usuario, evento, notificar=False)
+                except ValidationError as e:
+                    if e.code == 'lotado':
+                        break
+                    # Usuário já inscrito por outro caminho ou não elegível
+                    entrada.status = 'DESISTIU'
+                    entrada.save(update_fields=['status'])
+                    continue
+                
+                entrada.status = 'PROMOVIDO'
+                entrada.data_promocao = timezone.now()
+                entrada.save(update_fields=['status', 'data_promocao'])
+                EmailPendente.enfileirar('PROMOCAO_LISTA_ESPERA', entrada.pk)
+                promovidos.append(entrada)
+        
+        return promovidos
 
 
 class Certificado(models.Model):
@@ -348,6 +1021,20 @@ class Certificado(models.Model):
         help_text="Código único para verificação do certificado"
     )
     
+    codigo_legado = models.CharField(
+        max_length=50,
+        unique=True,
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Código UUID anterior aos códigos assinados, ainda aceito na validação"
+    )
+    
+    revogado = models.BooleanField(
+        default=False,
+        help_text="Certificados revogados deixam de ser aceitos na validação"
+    )
+    
     data_emissao = models.DateTimeField(
         auto_now_add=True,
         help_text="Data e hora da emissão do certificado"
@@ -371,22 +1058,64 @@ class Certificado(models.Model):
         verbose_name = "Certificado"
         verbose_name_plural = "Certificados"
         ordering = ['-data_emissao']
-        indexes = [
-            models.Index(fields=['codigo_verificacao']),
-        ]
     
     def __str__(self):
         return f"Certificado #{self.codigo_verificacao} - {self.inscricao.usuario.get_full_name()}"
     
     def save(self, *args, **kwargs):
         """
-        Gera código de verificação único se não existir
+        Gera o código de verificação assinado se não existir
         """
         if not self.codigo_verificacao:
-            import uuid
-            self.codigo_verificacao = str(uuid.uuid4())[:50]
+            self.codigo_verificacao = codigo_para_inscricao(self.inscricao_id)
         super().save(*args, **kwargs)
     
+    @classmethod
+    def buscar_por_codigo(cls, codigo):
+        """
+        Retorna o certificado válido (não revogado) para o código, ou None.
+        
+        Códigos assinados com assinatura inválida são recusados sem
+        consultar o banco; os UUID antigos são buscados em codigo_legado.
+        """
+        certificados = cls.objects.filter(revogado=False).select_related(
+            'inscricao__usuario', 'inscricao__evento'
+        )
+        
+        inscricao_id = inscricao_do_codigo(codigo)
+        if inscricao_id is not None:
+            return certificados.filter(inscricao_id=inscricao_id).first()
+        
+        codigo_legado = normalizar_codigo_legado(codigo)
+        if codigo_legado is None:
+            return None
+        return certificados.filter(codigo_legado=codigo_legado).first()
+    
+    @staticmethod
+    def normalizar_codigo(codigo):
+        """
+        Forma canônica do código digitado (os dois formatos de código são
+        aceitos sem distinção de maiúsculas)
+        """
+        return codigo.strip().upper()
+    
+    @classmethod
+    def chave_cache_validacao(cls, codigo):
+        """
+        Chave do resultado de certificado_validar no cache
+        """
+        codigo = cls.normalizar_codigo(codigo)
+        return 'certificado_validacao:' + hashlib.sha256(codigo.encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def limpar_cache_validacao(cls, *codigos):
+        """
+        Remove do cache os resultados de validação dos códigos informados,
+        após o commit (antes dele, outras conexões ainda veem o estado antigo)
+        """
+        chaves = [cls.chave_cache_validacao(codigo) for codigo in codigos if codigo]
+        transaction.on_commit(lambda: cache.delete_many(chaves))
+    
     def clean(self):
         """
         Validações customizadas
@@ -404,6 +1133,95 @@ class Certificado(models.Model):
             )
 
 
+class EmailPendente(models.Model):
+    """
+    Model para a caixa de saída (outbox) de emails transacionais.
+    
+    As mensagens são gravadas na mesma transação da ação que as originou e
+    enviadas depois pelo worker (manage.py processar_emails).
+    """
+    TIPO_CHOICES = [
+        ('BOAS_VINDAS', 'Boas-vindas e confirmação de email'),
+        ('CONFIRMACAO_INSCRICAO', 'Confirmação de inscrição'),
+        ('PROMOCAO_LISTA_ESPERA', 'Promoção da lista de espera'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('PENDENTE', 'Pendente'),
+        ('ENVIADO', 'Enviado'),
+        ('FALHOU', 'Falhou'),
+    ]
+    
+    tipo = models.CharField(
+        max_length=30,
+        choices=TIPO_CHOICES,
+        help_text="Tipo de email a ser montado pelo worker"
+    )
+    
+    objeto_id = models.PositiveBigIntegerField(
+        help_text="ID do registro de origem (usuário, inscrição ou lista de espera)"
+    )
+    
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='PENDENTE',
+        help_text="Situação do envio"
+    )
+    
+    tentativas = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Quantidade de tentativas de envio com falha"
+    )
+    
+    proxima_tentativa = models.DateTimeField(
+        default=timezone.now,
+        help_text="Momento a partir do qual o email pode ser (re)enviado"
+    )
+    
+    lote = models.CharField(
+        max_length=32,
+        null=True,
+        blank=True,
+        help_text="Identificador do lote do worker que reservou o email"
+    )
+    
+    ultimo_erro = models.TextField(
+        blank=True,
+        help_text="Mensagem da última falha de envio"
+    )
+    
+    data_criacao = models.DateTimeField(
+        auto_now_add=True,
+        help_text="Data e hora em que o email entrou na fila"
+    )
+    
+    data_envio = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Data e hora do envio"
+    )
+    
+    class Meta:
+        verbose_name = "Email Pendente"
+        verbose_name_plural = "Emails Pendentes"
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'proxima_tentativa']),
+            models.Index(fields=['lote']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_tipo_display()} #{self.objeto_id} ({self.get_status_display()})"
+    
+    @staticmethod
+    def enfileirar(tipo, objeto_id):
+        """
+        Método auxiliar para colocar um email na caixa de saída
+        """
+        return EmailPendente.objects.create(tipo=tipo, objeto_id=objeto_id)
+
+
 class Auditoria(models.Model):
     """
     Model para registro de auditoria (logs) das ações do sistema.
@@ -446,7 +1264,8 @@ class Auditoria(models.Model):
     )
     
     data_hora = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         help_text="Data e hora da ação"
     )
     
@@ -473,12 +1292,22 @@ class Auditoria(models.Model):
     @staticmethod
     def registrar(usuario, acao, descricao, ip_address=None, dados_adicionais=None):
         """
-        Método auxiliar para registrar uma ação de auditoria
+        Método auxiliar para registrar uma ação de auditoria.
+        
+        Com settings.AUDITORIA_BUFFER['ATIVO'] o registro é enfileirado em
+        memória e gravado em lote (ver eventos.auditoria); o horário da ação
+        é fixado aqui, não no momento da gravação.
         """
-        return Auditoria.objects.create(
+        registro = Auditoria(
             usuario=usuario,
             acao=acao,
             descricao=descricao,
             ip_address=ip_address,
             dados_adicionais=dados_adicionais
         )
+        
+        if configuracao_auditoria()['ATIVO']:
+            registrar_bufferizado(registro)
+        else:
+            registro.save(force_insert=True)
+        return registro
@@ -0,0 +1,109 @@
+"""
+Paginação da API REST do SGEA
+"""
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class PaginacaoKeyset(PageNumberPagination):
+    """
+    Paginação por número de página (padrão) com modo keyset opcional.
+
+    O modo keyset é ativado pelo parâmetro ?cursor= (vazio na primeira
+    página) e usa a ordenação declarada em `ordenacao_cursor` na view, que
+    deve terminar em um campo único (ex.: ('data_inicial', 'horario_inicio',
+    'id')). Cada página filtra a partir da última linha da anterior, sem
+    COUNT(*) nem OFFSET, então páginas profundas custam o mesmo que a
+    primeira. O cursor é opaco e assinado.
+    """
+    cursor_query_param = 'cursor'
+    salt_cursor = 'eventos.paginacao.cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.modo_cursor = (
+            self.cursor_query_param in request.query_params and
+            getattr(view, 'ordenacao_cursor', None) is not None
+        )
+        if not self.modo_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.campos = list(view.ordenacao_cursor)
+        tamanho = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.campos)
+        posicao = self.decodificar_cursor(request.query_params[self.cursor_query_param], queryset)
+        if posicao is not None:
+            queryset = queryset.filter(self.filtro_apos(posicao))
+
+        # Uma linha a mais indica se existe próxima página
+        resultados = list(queryset[:tamanho + 1])
+        self.proximo_cursor = None
+        if len(resultados) > tamanho:
+            resultados = resultados[:tamanho]
+            self.proximo_cursor = self.codificar_cursor(resultados[-1])
+        return resultados
+
+    def get_paginated_response(self, data):
+        if not self.modo_cursor:
+            return super().get_paginated_response(data)
+
+        proximo = None
+        if self.proximo_cursor:
+            proximo = replace_query_param(
+                self.request.build_absolute_uri(), self.cursor_query_param, self.proximo_cursor
+            )
+        return Response({'next': proximo, 'results': data})
+
+    def _nome_campo(self, campo):
+        return campo.lstrip('-')
+
+    def filtro_apos(self, posicao):
+        """
+        Linhas depois de `posicao` na ordenação, em forma de comparação de
+        tuplas: a > x OU (a = x E (b > y OU (b = y E ...))), com a faixa
+        a >= x explícita para o banco poder usar um índice no primeiro campo
+        """
+        filtro = None
+        for campo, valor in reversed(list(zip(self.campos, posicao))):
+            nome = self._nome_campo(campo)
+            comparacao = 'lt' if campo.startswith('-') else 'gt'
+            depois = Q(**{f'{nome}__{comparacao}': valor})
+            if filtro is not None:
+                depois |= Q(**{nome: valor}) & filtro
+            filtro = depois
+
+        primeiro = self.campos[0]
+        faixa = 'lte' if primeiro.startswith('-') else 'gte'
+        return Q(**{f'{self._nome_campo(primeiro)}__{faixa}': posicao[0]}) & filtro
+
+    def codificar_cursor(self, objeto):
+        valores = []
+        for campo in self.campos:
+            valor = getattr(objeto, self._nome_campo(campo))
+            valores.append(valor.isoformat() if hasattr(valor, 'isoformat') else valor)
+        return signing.dumps(valores, salt=self.salt_cursor, compress=True)
+
+    def decodificar_cursor(self, cursor, queryset):
+        """
+        Converte o cursor de volta nos valores dos campos (None = início)
+        """
+        if not cursor:
+            return None
+
+        try:
+            valores = signing.loads(cursor, salt=self.salt_cursor)
+            if len(valores) != len(self.campos):
+                raise ValueError
+            meta = queryset.model._meta
+            return [
+                meta.get_field(self._nome_campo(campo)).to_python(valor)
+                for campo, valor in zip(self.campos, valores)
+            ]
+        except (signing.BadSignature, ValidationError, ValueError, TypeError):
+            raise NotFound('Cursor inválido.')
@@ -0,0 +1,291 @@
+"""
+Verificação dos planos de execução das consultas mais frequentes
+
+CONSULTAS registra as requisições quentes do SGEA (listagem e busca de
+eventos, dashboards, filtros da auditoria, validação de certificado...).
+Cada uma passa pelas views reais com o cliente de teste do Django, contra o
+banco configurado e dentro de uma transação desfeita no final. Os SELECTs
+feitos passam por EXPLAIN e toda leitura completa de tabela (SCAN no
+SQLite, Seq Scan no PostgreSQL) com pelo menos `limite_linhas` linhas é
+apontada como regressão. A única exceção é o SELECT COUNT(*) das tabelas que
+a própria entrada declara (contagens da paginação, totais), e no SQLite só
+se ele percorrer um índice e não a tabela; qualquer outra consulta sobre
+essas tabelas continua sendo verificada.
+
+Usado pelo comando verificar_planos e pelos testes.
+"""
+import json
+import re
+from datetime import date
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+
+LIMITE_LINHAS_PADRAO = 10000
+
+# nome -> (usuário logado, função que monta o caminho a partir da amostra,
+# tabelas que a requisição conta por completo de propósito)
+CONSULTAS = {
+    # Totais de eventos e usuários exibidos na página
+    'home': (
+        None, lambda amostra: reverse('home'),
+        {'eventos_evento', 'eventos_usuario'}
+    ),
+    # O ETag da lista lê só o topo dos índices de data_atualizacao e dos
+    # tombstones; a paginação conta os ativos
+    'eventos_lista': (
+        'participante', lambda amostra: reverse('eventos_list'),
+        {'eventos_evento'}
+    ),
+    'eventos_lista_filtrada': (
+        'participante', lambda amostra: reverse('eventos_list') + '?tipo=MINICURSO&page=2',
+        {'eventos_evento'}
+    ),
+    'eventos_busca': (
+        'participante', lambda amostra: reverse('eventos_list') + '?search=django',
+        {'eventos_evento'}
+    ),
+    'evento_detalhe': (
+        'participante', lambda amostra: reverse('evento_detail', args=[amostra['evento']]),
+        set()
+    ),
+    'minhas_inscricoes': (
+        'participante', lambda amostra: reverse('minhas_inscricoes'),
+        set()
+    ),
+    'meus_certificados': (
+        'participante', lambda amostra: reverse('meus_certificados'),
+        set()
+    ),
+    'dashboard_participante': (
+        'participante', lambda amostra: reverse('dashboard'),
+        set()
+    ),
+    'dashboard_organizador': (
+        'organizador', lambda amostra: reverse('dashboard'),
+        set()
+    ),
+    'evento_inscritos': (
+        'organizador', lambda amostra: reverse('evento_inscritos', args=[amostra['evento']]),
+        set()
+    ),
+    # Sem filtro, a paginação conta todos os registros
+    'auditoria': (
+        'organizador', lambda amostra: reverse('auditoria_list'),
+        {'eventos_auditoria'}
+    ),
+    'auditoria_por_data': (
+        'organizador', lambda amostra: reverse('auditoria_list') + f'?data={date.today().isoformat()}',
+        set()
+    ),
+    'auditoria_por_acao': (
+        'organizador', lambda amostra: reverse('auditoria_list') + '?acao=INSCRICAO',
+        set()
+    ),
+    'certificado_validacao': (
+        None, lambda amostra: reverse('certificado_validar', args=[amostra['codigo']]),
+        set()
+    ),
+    'api_eventos': (
+        'participante', lambda amostra: reverse('api-evento-list'),
+        set()
+    ),
+    'api_eventos_cursor': (
+        'participante', lambda amostra: reverse('api-evento-list') + '?cursor=',
+        set()
+    ),
+    'api_inscricoes': (
+        'participante', lambda amostra: reverse('api-inscricao-list'),
+        set()
+    ),
+}
+
+# "SCAN tabela" (ou "SCAN TABLE tabela" nas versões antigas) lê a tabela
+# inteira; com "USING [COVERING] INDEX" percorre o índice inteiro, o que só
+# termina cedo se a consulta tiver LIMIT. Tabelas virtuais (FTS5) e buscas
+# por índice (SEARCH) não entram.
+SCAN_SQLITE = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?( USING (?:COVERING )?INDEX \w+)?$')
+LIMIT = re.compile(r'\bLIMIT\b', re.IGNORECASE)
+# Forma do COUNT(*) que o ORM gera para Paginator.count e QuerySet.count()
+CONTAGEM = re.compile(r'^SELECT COUNT\(\*\) AS "__count" FROM "(\w+)"')
+
+
+class CapturaSelects:
+    """
+    execute_wrapper que guarda (sql, params) de cada SELECT executado
+    """
+
+    def __init__(self):
+        self.consultas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip()[:6].upper() == 'SELECT':
+            self.consultas.append((sql, params))
+        return execute(sql, params, many, context)
+
+
+def explicar(sql, params, conexao=None):
+    """
+    Retorna (plano, tabelas lidas por completo) da consulta
+    """
+    conexao = conexao or connection
+    with conexao.cursor() as cursor:
+        if conexao.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plano = [linha[3] for linha in cursor.fetchall()]
+            com_limite = bool(LIMIT.search(sql))
+            tabelas = [
+                m.group(1) for m in map(SCAN_SQLITE.match, plano)
+                if m and not (m.group(2) and com_limite)
+            ]
+            return plano, tabelas
+
+        if conexao.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plano = cursor.fetchone()[0]
+            if isinstance(plano, str):
+                plano = json.loads(plano)
+            return plano, list(_seq_scans(plano[0]['Plan']))
+
+    return [], []
+
+
+def le_tabela_sem_indice(plano, tabela):
+    """
+    No SQLite, se o plano percorre as páginas da própria tabela em vez de um
+    índice dela (no PostgreSQL a contagem costuma ser um Seq Scan mesmo com
+    índice, então não há distinção)
+    """
+    return any(
+        m and m.group(1) == tabela and not m.group(2)
+        for m in (SCAN_SQLITE.match(linha) for linha in plano if isinstance(linha, str))
+    )
+
+
+def _seq_scans(no):
+    if no.get('Node Type') == 'Seq Scan':
+        yield no['Relation Name']
+    for filho in no.get('Plans', []):
+        yield from _seq_scans(filho)
+
+
+def linhas_tabela(tabela, conexao=None):
+    """
+    Tamanho da tabela: estimativa das estatísticas no PostgreSQL (sem
+    percorrer a tabela), COUNT(*) nos demais bancos
+    """
+    conexao = conexao or connection
+    with conexao.cursor() as cursor:
+        if conexao.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)', [tabela])
+            linha = cursor.fetchone()
+            # -1: tabela ainda não analisada
+            if linha and linha[0] >= 0:
+                return linha[0]
+        cursor.execute(f'SELECT COUNT(*) FROM {conexao.ops.quote_name(tabela)}')
+        return cursor.fetchone()[0]
+
+
+def amostra_dados():
+    """
+    Ids reais para montar as requisições: um evento ativo, o organizador
+    dele, um participante inscrito e um código de certificado
+    """
+    from .models import Certificado, Evento, Inscricao
+
+    evento = Evento.objects.filter(ativo=True).order_by('pk').values('pk', 'organizador_id').first()
+    participante = Inscricao.objects.filter(ativa=True).exclude(
+        usuario__perfil='ORGANIZADOR'
+    ).order_by('pk').values_list('usuario_id', flat=True).first()
+    codigo = Certificado.objects.order_by('pk').values_list('codigo_verificacao', flat=True).first()
+    return {
+        'evento': evento and evento['pk'],
+        'organizador': evento and evento['organizador_id'],
+        'participante': participante,
+        'codigo': codigo or 'SGEA-0000',
+    }
+
+
+def executar_consulta(nome, amostra, conexao=None):
+    """
+    Faz a requisição registrada e retorna (status HTTP, SELECTs executados)
+    """
+    from .models import Certificado, Evento, Usuario
+
+    conexao = conexao or connection
+    usuario, caminho, _ = CONSULTAS[nome]
+
+    # Sem cache, para o plano das consultas que ele evita também ser lido
+    cache.delete_many([
+        Evento.chave_cache_estatisticas(amostra['organizador']),
+        Certificado.chave_cache_validacao(amostra['codigo']),
+    ])
+
+    cliente = Client()
+    if usuario:
+        cliente.force_login(Usuario.objects.get(pk=amostra[usuario]))
+
+    captura = CapturaSelects()
+    with conexao.execute_wrapper(captura):
+        resposta = cliente.get(caminho(amostra))
+    return resposta.status_code, captura.consultas
+
+
+def verificar_planos(nomes=None, limite_linhas=LIMITE_LINHAS_PADRAO, conexao=None):
+    """
+    Executa as consultas registradas (todas, se `nomes` não for informado) e
+    retorna uma lista de resultados:
+
+        {'nome', 'status', 'consultas', 'ignorada', 'regressoes': [
+            {'tabela', 'linhas', 'sql', 'plano'}, ...
+        ]}
+
+    Consultas que dependem de dados ausentes no banco (sem evento, inscrição
+    ou organizador) são ignoradas. Nada do que as requisições gravam
+    (sessões, auditoria) permanece no banco.
+    """
+    conexao = conexao or connection
+    nomes = nomes or list(CONSULTAS)
+    resultados = []
+    tamanhos = {}
+
+    with transaction.atomic(using=conexao.alias):
+        amostra = amostra_dados()
+        for nome in nomes:
+            usuario, _, aceitas = CONSULTAS[nome]
+            resultado = {'nome': nome, 'status': None, 'consultas': 0, 'ignorada': False, 'regressoes': []}
+            resultados.append(resultado)
+
+            if amostra['evento'] is None or (usuario and amostra[usuario] is None):
+                resultado['ignorada'] = True
+                continue
+
+            # Cada requisição em seu savepoint, para não ver o que a anterior gravou
+            with transaction.atomic(using=conexao.alias):
+                status, consultas = executar_consulta(nome, amostra, conexao)
+                transaction.set_rollback(True, using=conexao.alias)
+
+            resultado['status'] = status
+            resultado['consultas'] = len(consultas)
+            for sql, params in consultas:
+                plano, tabelas = explicar(sql, params, conexao)
+                contagem = CONTAGEM.match(sql.strip())
+                for tabela in tabelas:
+                    if tabela in aceitas and contagem and contagem.group(1) == tabela \
+                            and not le_tabela_sem_indice(plano, tabela):
+                        continue
+                    if tabela not in tamanhos:
+                        tamanhos[tabela] = linhas_tabela(tabela, conexao)
+                    if tamanhos[tabela] >= limite_linhas:
+                        resultado['regressoes'].append({
+                            'tabela': tabela,
+                            'linhas': tamanhos[tabela],
+                            'sql': sql,
+                            'plano': plano,
+                        })
+
+        transaction.set_rollback(True, using=conexao.alias)
+
+    return resultados
@@ -1,8 +1,9 @@
 """
 Serializers para a API REST do SGEA
 """
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
-from .models import Evento, Inscricao, Usuario
+from .models import Evento, Inscricao, ListaEspera, Usuario
 
 
 class UsuarioSerializer(serializers.ModelSerializer):
@@ -45,7 +46,7 @@ class EventoDetailSerializer(serializers.ModelSerializer):
     professor_responsavel = UsuarioSerializer(read_only=True)
     tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
     vagas_disponiveis = serializers.IntegerField(read_only=True)
-    total_inscritos = serializers.SerializerMethodField()
+    total_inscritos = serializers.IntegerField(source='inscritos_ativos', read_only=True)
     
     class Meta:
         model = Evento
@@ -55,9 +56,6 @@ class EventoDetailSerializer(serializers.ModelSerializer):
             'local', 'vagas_totais', 'vagas_disponiveis', 'total_inscritos',
             'organizador', 'professor_responsavel', 'banner'
         ]
-    
-    def get_total_inscritos(self, obj):
-        return obj.inscricoes.filter(ativa=True).count()
 
 
 class InscricaoCreateSerializer(serializers.ModelSerializer):
@@ -69,6 +67,9 @@ class InscricaoCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Inscricao
         fields = ['evento', 'usuario']
+        # A unicidade (usuario, evento) é tratada por Inscricao.reservar,
+        # que também permite reativar uma inscrição cancelada
+        validators = []
     
     def validate(self, data):
         """
@@ -83,24 +84,64 @@ class InscricaoCreateSerializer(serializers.ModelSerializer):
                 'Organizadores não podem se inscrever em eventos.'
             )
         
-        # Verifica vagas
-        if evento.esta_lotado:
-            raise serializers.ValidationError(
-                'Este evento não possui mais vagas disponíveis.'
-            )
-        
-        # Verifica duplicidade
-        if Inscricao.objects.filter(usuario=usuario, evento=evento, ativa=True).exists():
-            raise serializers.ValidationError(
-                'Você já está inscrito neste evento.'
-            )
-        
         # Verifica se evento já ocorreu
         if evento.ja_ocorreu:
             raise serializers.ValidationError(
                 'Não é possível se inscrever em eventos que já ocorreram.'
             )
         
+        # Vagas e duplicidade são decididas atomicamente em Inscricao.reservar
+        return data
+    
+    def create(self, validated_data):
+        """
+        Cria a inscrição pela mesma rotina de reserva usada pelas views HTML
+        """
+        try:
+            return Inscricao.reservar(
+                validated_data['usuario'],
+                validated_data['evento']
+            )
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
+
+
+class InscricaoLoteItemSerializer(serializers.Serializer):
+    """
+    Par (usuário, evento) de uma inscrição em lote
+    """
+    usuario = serializers.IntegerField(min_value=1)
+    evento = serializers.IntegerField(min_value=1)
+
+
+class InscricaoLoteSerializer(serializers.Serializer):
+    """
+    Serializer para inscrições em lote via API: `eventos` inscreve o próprio
+    usuário em vários eventos; `itens` inscreve outros usuários (apenas nos
+    eventos que o usuário autenticado organiza)
+    """
+    LIMITE_ITENS = 500
+    
+    eventos = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        max_length=LIMITE_ITENS
+    )
+    itens = serializers.ListField(
+        child=InscricaoLoteItemSerializer(),
+        required=False,
+        max_length=LIMITE_ITENS
+    )
+    notificar = serializers.BooleanField(default=True)
+    
+    def validate(self, data):
+        """
+        Exige exatamente uma das listas, não vazia
+        """
+        if bool(data.get('eventos')) == bool(data.get('itens')):
+            raise serializers.ValidationError(
+                'Informe uma lista não vazia em "eventos" ou em "itens" (apenas uma delas).'
+            )
         return data
 
 
@@ -114,3 +155,44 @@ class InscricaoListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Inscricao
         fields = ['id', 'evento', 'usuario', 'data_inscricao', 'ativa']
+
+
+class ListaEsperaCreateSerializer(serializers.ModelSerializer):
+    """
+    Serializer para entrar na lista de espera via API
+    """
+    usuario = serializers.HiddenField(default=serializers.CurrentUserDefault())
+    
+    class Meta:
+        model = ListaEspera
+        fields = ['evento', 'usuario']
+        # A reentrada na fila reaproveita a linha (usuario, evento)
+        validators = []
+    
+    def create(self, validated_data):
+        """
+        Entra na fila; se houver vaga livre a promoção acontece na hora
+        """
+        try:
+            return ListaEspera.entrar(
+                validated_data['usuario'],
+                validated_data['evento']
+            )
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
+
+
+class ListaEsperaSerializer(serializers.ModelSerializer):
+    """
+    Serializer para listagem das entradas na lista de espera
+    """
+    evento = EventoListSerializer(read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    posicao = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = ListaEspera
+        fields = [
+            'id', 'evento', 'status', 'status_display', 'posicao',
+            'data_entrada', 'data_promocao'
+        ]
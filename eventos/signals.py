@@ -1,14 +1,18 @@
 """
 Signals para o Sistema de Gestão de Eventos Acadêmicos (SGEA)
 """
+import os
 import uuid
-from django.db.models.signals import post_save, post_delete
+from functools import lru_cache
+from django.db import models
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.conf import settings
-from django.utils import timezone
-from .models import Usuario, Evento, Inscricao, Certificado, Auditoria
+from django.db import transaction
+from .autocompletar import indice as indice_autocompletar
+from .models import Usuario, Evento, EventoExcluido, Inscricao, ListaEspera, Certificado, Auditoria, EmailPendente
 
 
 @receiver(post_save, sender=Usuario)
@@ -32,8 +36,8 @@ def usuario_post_save(sender, instance, created, **kwargs):
             }
         )
         
-        # Envia email de boas-vindas
-        enviar_email_boas_vindas(instance)
+        # Email de boas-vindas vai para a caixa de saída (worker processar_emails)
+        EmailPendente.enfileirar('BOAS_VINDAS', instance.pk)
 
 
 @receiver(post_save, sender=Evento)
@@ -71,6 +75,9 @@ def evento_post_delete(sender, instance, **kwargs):
     """
     Signal executado após deletar um evento
     """
+    # Tombstone para a sincronização incremental (api/eventos/changes/)
+    EventoExcluido.objects.create(evento_id=instance.id)
+    
     Auditoria.registrar(
         usuario=instance.organizador,
         acao='EXCLUIR_EVENTO',
@@ -82,6 +89,35 @@ def evento_post_delete(sender, instance, **kwargs):
     )
 
 
+@receiver(post_save, sender=Evento)
+@receiver(post_delete, sender=Evento)
+def evento_limpar_estatisticas(sender, instance, **kwargs):
+    """
+    Descarta as estatísticas em cache do dashboard do organizador
+    """
+    Evento.limpar_cache_estatisticas(instance.organizador_id)
+
+
+@receiver(post_save, sender=Evento)
+def evento_atualizar_autocompletar(sender, instance, **kwargs):
+    """
+    Atualiza o índice de autocompletar do processo após o commit
+    """
+    if indice_autocompletar.em_uso:
+        valores = (instance.pk, instance.nome, instance.local, instance.ativo)
+        transaction.on_commit(lambda: indice_autocompletar.atualizar(*valores))
+
+
+@receiver(post_delete, sender=Evento)
+def evento_remover_autocompletar(sender, instance, **kwargs):
+    """
+    Remove o evento excluído do índice de autocompletar após o commit
+    """
+    if indice_autocompletar.em_uso:
+        evento_id = instance.pk
+        transaction.on_commit(lambda: indice_autocompletar.remover(evento_id))
+
+
 @receiver(post_save, sender=Inscricao)
 def inscricao_post_save(sender, instance, created, **kwargs):
     """
@@ -99,8 +135,10 @@ def inscricao_post_save(sender, instance, created, **kwargs):
             }
         )
         
-        # Envia email de confirmação de inscrição
-        enviar_email_confirmacao_inscricao(instance)
+        # Email de confirmação vai para a caixa de saída (promoções da lista
+        # de espera já enfileiram o próprio aviso)
+        if getattr(instance, '_notificar', True):
+            EmailPendente.enfileirar('CONFIRMACAO_INSCRICAO', instance.pk)
     elif not instance.ativa and instance.data_cancelamento:
         # Registra auditoria de cancelamento
         Auditoria.registrar(
@@ -114,6 +152,69 @@ def inscricao_post_save(sender, instance, created, **kwargs):
         )
 
 
+def _excluida_em_lote(origin):
+    """
+    Inscrição removida por uma exclusão que já trata vagas e cache de uma
+    vez: em cascata do próprio evento (o contador some com ele), de um
+    usuário (usuario_pre_delete) ou por um queryset de inscrições
+    (InscricaoQuerySet.delete)
+    """
+    if isinstance(origin, models.Model):
+        return isinstance(origin, (Evento, Usuario))
+    return getattr(origin, 'model', None) in (Evento, Usuario, Inscricao)
+
+
+@receiver(pre_delete, sender=Usuario)
+def usuario_pre_delete(sender, instance, **kwargs):
+    """
+    Devolve de uma vez as vagas das inscrições ativas do usuário, que saem
+    em seguida por cascata
+    """
+    inscricoes = Inscricao.objects.filter(usuario=instance)
+    Evento.liberar_vagas(inscricoes.ativas_por_evento())
+    Evento.limpar_cache_estatisticas(
+        *inscricoes.order_by().values_list('evento__organizador_id', flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender=Inscricao)
+def inscricao_post_delete(sender, instance, origin=None, **kwargs):
+    """
+    Signal executado após deletar uma inscrição
+    """
+    # Libera a vaga no contador desnormalizado do evento
+    if instance.ativa and not _excluida_em_lote(origin):
+        Evento.ajustar_inscritos(instance.evento_id, -1)
+
+
+def _excluido_com_o_evento(origin):
+    """
+    Exclusão em cascata a partir do próprio evento (Evento.delete() ou um
+    queryset de eventos): o evento_limpar_estatisticas já cobre o organizador
+    """
+    return isinstance(origin, Evento) or getattr(origin, 'model', None) is Evento
+
+
+def _organizador_do_evento(**filtro):
+    return Evento.objects.filter(**filtro).values_list('organizador_id', flat=True).first()
+
+
+@receiver(post_save, sender=Inscricao)
+@receiver(post_delete, sender=Inscricao)
+def inscricao_limpar_estatisticas(sender, instance, origin=None, **kwargs):
+    """
+    Descarta as estatísticas em cache do dashboard do organizador do evento,
+    sem carregar o Evento quando ele ainda não estiver na inscrição
+    """
+    if _excluida_em_lote(origin):
+        return
+    if Inscricao.evento.is_cached(instance):
+        organizador_id = instance.evento.organizador_id
+    else:
+        organizador_id = _organizador_do_evento(pk=instance.evento_id)
+    Evento.limpar_cache_estatisticas(organizador_id)
+
+
 @receiver(post_save, sender=Certificado)
 def certificado_post_save(sender, instance, created, **kwargs):
     """
@@ -133,121 +234,135 @@ def certificado_post_save(sender, instance, created, **kwargs):
         )
 
 
-def enviar_email_boas_vindas(usuario):
+@receiver(post_save, sender=Certificado)
+@receiver(post_delete, sender=Certificado)
+def certificado_limpar_cache_validacao(sender, instance, origin=None, **kwargs):
     """
-    Envia email de boas-vindas com link de confirmação
+    Invalida o resultado de validação em cache (inclusive o negativo de um
+    código que acabou de ser emitido) e as estatísticas do organizador
     """
-    try:
-        from django.core.mail import EmailMultiAlternatives
-        import os
-        
-        assunto = 'Bem-vindo ao SGEA - Confirme seu email'
-        
-        # Link de confirmação
-        link_confirmacao = f"{settings.SITE_URL}/confirmar-email/{usuario.token_confirmacao}/"
-        
-        contexto = {
-            'nome': usuario.get_full_name(),
-            'username': usuario.username,
-            'link_confirmacao': link_confirmacao,
-            'perfil': usuario.get_perfil_display()
-        }
-        
-        mensagem_html = render_to_string('eventos/emails/boas_vindas.html', contexto)
-        mensagem_texto = render_to_string('eventos/emails/boas_vindas.txt', contexto)
-        
-        # Criar email com anexo inline
-        email = EmailMultiAlternatives(
-            assunto,
-            mensagem_texto,
-            settings.DEFAULT_FROM_EMAIL,
-            [usuario.email]
-        )
-        email.attach_alternative(mensagem_html, "text/html")
-        
-        # Anexar logo como inline
-        logo_path = os.path.join(settings.STATIC_ROOT or settings.STATICFILES_DIRS[0], 'images/favicon_io/android-chrome-512x512.png')
-        if os.path.exists(logo_path):
-            with open(logo_path, 'rb') as f:
-                email.attach('logo.png', f.read(), 'image/png')
-                email.content_subtype = 'html'
-        
-        email.send(fail_silently=True)
-    except Exception as e:
-        print(f"Erro ao enviar email de boas-vindas: {e}")
+    Certificado.limpar_cache_validacao(instance.codigo_verificacao, instance.codigo_legado)
+    if not _excluido_com_o_evento(origin):
+        Evento.limpar_cache_estatisticas(_organizador_do_evento(inscricoes=instance.inscricao_id))
 
 
-def enviar_email_confirmacao_inscricao(inscricao):
+@lru_cache(maxsize=1)
+def carregar_logo():
     """
-    Envia email de confirmação de inscrição
+    Lê o logo anexado aos emails uma única vez por processo
     """
-    try:
-        from django.core.mail import EmailMultiAlternatives
-        import os
-        
-        assunto = f'Inscrição confirmada - {inscricao.evento.nome}'
-        
-        contexto = {
-            'nome': inscricao.usuario.get_full_name(),
-            'evento': inscricao.evento
-        }
-        
-        mensagem_html = render_to_string('eventos/emails/confirmacao_inscricao.html', contexto)
-        mensagem_texto = render_to_string('eventos/emails/confirmacao_inscricao.txt', contexto)
-        
-        # Criar email com anexo inline
-        email = EmailMultiAlternatives(
-            assunto,
-            mensagem_texto,
-            settings.DEFAULT_FROM_EMAIL,
-            [inscricao.usuario.email]
-        )
-        email.attach_alternative(mensagem_html, "text/html")
-        
-        # Anexar logo como inline
-        logo_path = os.path.join(settings.STATIC_ROOT or settings.STATICFILES_DIRS[0], 'images/favicon_io/android-chrome-512x512.png')
-        if os.path.exists(logo_path):
-            with open(logo_path, 'rb') as f:
-                email.attach('logo.png', f.read(), 'image/png')
-                email.content_subtype = 'html'
-        
-        email.send(fail_silently=True)
-    except Exception as e:
-        print(f"Erro ao enviar email de confirmação: {e}")
+    logo_path = os.path.join(settings.STATIC_ROOT or settings.STATICFILES_DIRS[0], 'images/favicon_io/android-chrome-512x512.png')
+    if os.path.exists(logo_path):
+        with open(logo_path, 'rb') as f:
+            return f.read()
+    return None
 
 
-def gerar_certificados_automaticos():
+def _montar_email(assunto, template, contexto, destinatario, connection=None):
     """
-    Função para gerar certificados automáticos após o término dos eventos.
-    Deve ser executada por um cron job ou task scheduler.
+    Monta o email com versões texto/HTML e o logo anexado
     """
-    from datetime import date
+    mensagem_html = render_to_string(f'eventos/emails/{template}.html', contexto)
+    mensagem_texto = render_to_string(f'eventos/emails/{template}.txt', contexto)
     
-    # Busca eventos que terminaram ontem
-    ontem = date.today() - timezone.timedelta(days=1)
-    eventos_finalizados = Evento.objects.filter(
-        data_final=ontem,
-        ativo=True
+    email = EmailMultiAlternatives(
+        assunto,
+        mensagem_texto,
+        settings.DEFAULT_FROM_EMAIL,
+        [destinatario],
+        connection=connection
     )
+    email.attach_alternative(mensagem_html, "text/html")
     
-    certificados_gerados = 0
+    # Anexar logo como inline
+    logo = carregar_logo()
+    if logo:
+        email.attach('logo.png', logo, 'image/png')
+        email.content_subtype = 'html'
     
-    for evento in eventos_finalizados:
-        # Busca inscrições ativas do evento
-        inscricoes = Inscricao.objects.filter(
-            evento=evento,
-            ativa=True
-        ).exclude(certificado__isnull=False)
-        
-        for inscricao in inscricoes:
-            try:
-                # Cria certificado
-                Certificado.objects.create(
-                    inscricao=inscricao,
-                    emitido_por=evento.organizador
-                )
-                certificados_gerados += 1
-            except Exception as e:
-                print(f"Erro ao gerar certificado para {inscricao}: {e}")
+    return email
+
+
+def montar_email_boas_vindas(usuario, connection=None):
+    """
+    Monta o email de boas-vindas com link de confirmação
+    """
+    # Link de confirmação
+    link_confirmacao = f"{settings.SITE_URL}/confirmar-email/{usuario.token_confirmacao}/"
+    
+    contexto = {
+        'nome': usuario.get_full_name(),
+        'username': usuario.username,
+        'link_confirmacao': link_confirmacao,
+        'perfil': usuario.get_perfil_display()
+    }
+    
+    return _montar_email(
+        'Bem-vindo ao SGEA - Confirme seu email',
+        'boas_vindas', contexto, usuario.email, connection
+    )
+
+
+def montar_email_confirmacao_inscricao(inscricao, connection=None):
+    """
+    Monta o email de confirmação de inscrição
+    """
+    contexto = {
+        'nome': inscricao.usuario.get_full_name(),
+        'evento': inscricao.evento
+    }
+    
+    return _montar_email(
+        f'Inscrição confirmada - {inscricao.evento.nome}',
+        'confirmacao_inscricao', contexto, inscricao.usuario.email, connection
+    )
+
+
+def montar_email_promocao_lista_espera(entrada, connection=None):
+    """
+    Monta o email avisando que o usuário saiu da lista de espera e foi inscrito
+    """
+    contexto = {
+        'nome': entrada.usuario.get_full_name(),
+        'evento': entrada.evento
+    }
+    
+    return _montar_email(
+        f'Vaga liberada - {entrada.evento.nome}',
+        'promocao_lista_espera', contexto, entrada.usuario.email, connection
+    )
+
+
+# Para cada tipo de EmailPendente: queryset que carrega o objeto de origem
+# e a função que monta a mensagem
+MONTADORES_EMAIL = {
+    'BOAS_VINDAS': (
+        lambda: Usuario.objects.all(),
+        montar_email_boas_vindas
+    ),
+    'CONFIRMACAO_INSCRICAO': (
+        lambda: Inscricao.objects.select_related('usuario', 'evento'),
+        montar_email_confirmacao_inscricao
+    ),
+    'PROMOCAO_LISTA_ESPERA': (
+        lambda: ListaEspera.objects.select_related('usuario', 'evento'),
+        montar_email_promocao_lista_espera
+    ),
+}
+
+
+def gerar_certificados_automaticos():
+    """
+    Função para gerar certificados automáticos após o término dos eventos.
+    Deve ser executada por um cron job ou task scheduler.
+    
+    Delega para manage.py gerar_certificados (emissão em lote, PDFs em
+    paralelo e checkpoint). Retorna a quantidade de certificados emitidos.
+    """
+    from io import StringIO
+    from django.core.management import call_command
+    from .management.commands.gerar_certificados import Command
     
-    return certificados_gerados
+    comando = Command(stdout=StringIO())
+    call_command(comando)
+    return comando.total_emitidos
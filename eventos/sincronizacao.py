@@ -0,0 +1,115 @@
+"""
+Sincronização incremental do catálogo de eventos (api/eventos/changes/)
+
+O token devolvido a cada chamada guarda, de forma opaca e assinada, até onde
+o cliente já recebeu as alterações de Evento (data_atualizacao, id) e as
+exclusões registradas em EventoExcluido (data_exclusao, id). Cada chamada lê
+apenas as linhas posteriores a essas posições, pelos índices das duas
+tabelas, então o custo acompanha o volume de alterações e não o tamanho do
+catálogo.
+"""
+from datetime import timedelta
+
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Evento, EventoExcluido
+
+SALT_TOKEN = 'eventos.sincronizacao.token'
+
+# Alterações mais recentes que isto podem pertencer a transações ainda não
+# confirmadas; a última página não avança o token além desse ponto
+MARGEM_SEGURANCA = timedelta(seconds=10)
+
+
+class TokenInvalido(Exception):
+    pass
+
+
+def codificar_token(posicoes):
+    return signing.dumps(
+        {chave: [data.isoformat() if data else None, pk] for chave, (data, pk) in posicoes.items()},
+        salt=SALT_TOKEN,
+        compress=True
+    )
+
+
+def decodificar_token(token):
+    """
+    Posições (data, id) de cada fluxo; sem token, desde o início
+    """
+    if not token:
+        return {'eventos': (None, 0), 'exclusoes': (None, 0)}
+
+    try:
+        dados = signing.loads(token, salt=SALT_TOKEN)
+        return {
+            chave: (parse_datetime(dados[chave][0]) if dados[chave][0] else None, int(dados[chave][1]))
+            for chave in ('eventos', 'exclusoes')
+        }
+    except (signing.BadSignature, KeyError, IndexError, TypeError, ValueError):
+        raise TokenInvalido('Token de sincronização inválido.')
+
+
+def _apos(campo_data, posicao):
+    data, pk = posicao
+    if data is None:
+        return Q()
+    return Q(**{f'{campo_data}__gt': data}) | Q(**{campo_data: data, 'pk__gt': pk})
+
+
+def _ler_fluxo(queryset, campo_data, posicao, limite):
+    linhas = list(
+        queryset.filter(_apos(campo_data, posicao)).order_by(campo_data, 'pk')[:limite + 1]
+    )
+    mais = len(linhas) > limite
+    return linhas[:limite], mais
+
+
+def _nova_posicao(linhas, campo_data, posicao, mais, limite_seguro):
+    if not linhas:
+        return posicao
+
+    ultima = linhas[-1]
+    data = getattr(ultima, campo_data)
+    if not mais and data > limite_seguro:
+        # Recua para reenviar o trecho recente na próxima chamada, cobrindo
+        # transações que confirmarem depois desta leitura
+        anterior = (limite_seguro, 0)
+        if posicao[0] is None or anterior[0] > posicao[0]:
+            return anterior
+        return posicao
+    return (data, ultima.pk)
+
+
+def alteracoes_desde(token, limite=500):
+    """
+    Retorna (eventos alterados e ativos, ids removidos, próximo token, mais).
+
+    `removidos` reúne eventos desativados e excluídos. Uma mesma alteração
+    pode ser entregue mais de uma vez; os clientes devem aplicá-las como
+    upsert/remoção idempotente.
+    """
+    posicoes = decodificar_token(token)
+    limite_seguro = timezone.now() - MARGEM_SEGURANCA
+
+    eventos, mais_eventos = _ler_fluxo(
+        Evento.objects.with_seat_stats().select_related('organizador'),
+        'data_atualizacao', posicoes['eventos'], limite
+    )
+    exclusoes, mais_exclusoes = _ler_fluxo(
+        EventoExcluido.objects.all(),
+        'data_exclusao', posicoes['exclusoes'], limite
+    )
+
+    proximo = codificar_token({
+        'eventos': _nova_posicao(eventos, 'data_atualizacao', posicoes['eventos'], mais_eventos, limite_seguro),
+        'exclusoes': _nova_posicao(exclusoes, 'data_exclusao', posicoes['exclusoes'], mais_exclusoes, limite_seguro),
+    })
+
+    ativos = [evento for evento in eventos if evento.ativo]
+    removidos = [evento.pk for evento in eventos if not evento.ativo]
+    removidos += [exclusao.evento_id for exclusao in exclusoes]
+    return ativos, removidos, proximo, mais_eventos or mais_exclusoes
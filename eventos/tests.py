@@ -1,13 +1,1973 @@
 """
 Testes para o Sistema de Gestão de Eventos Acadêmicos (SGEA)
-
-TODO: Implementar testes unitários e de integração
-- Testar validações de formulários
-- Testar regras de negócio
-- Testar API REST
-- Testar emissão de certificados
-- Testar envio de emails
 """
-from django.test import TestCase
+import importlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time as time_module
+import uuid
+import zipfile
+import zlib
+from datetime import date, time, timedelta
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError, OperationalError, close_old_connections, connection, transaction
+from django.db.models import Count, Max, Q
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .auditoria import buffer_auditoria, lote_gravado
+from .autocompletar import IndicePrefixos, agendar_recarga, indice as indice_autocompletar
+from .benchmark import CENARIOS, comparar, executar_cenario, percentis
+from .busca import buscar_eventos, consulta_fts5
+from .certificados import ModeloCertificado, dados_certificado
+from .apps import verificar_chave_certificados
+from .codigos_certificado import chave_assinatura, gerar_codigo, verificar_codigo
+from .planos_consulta import CONSULTAS, explicar, verificar_planos
+from .views import EVENTOS_POR_PAGINA
+from .sincronizacao import alteracoes_desde
+from .models import (
+    Usuario, Evento, Inscricao, ListaEspera, Certificado, EmailPendente, Auditoria
+)
+
+# Configuração comum aos testes: auditoria gravada na hora (sem buffer) e
+# índice de autocompletar recarregado na própria requisição (uma thread não
+# enxerga a transação do TestCase)
+configuracao_testes = override_settings(
+    AUDITORIA_BUFFER={'ATIVO': False, 'TAMANHO_LOTE': 100, 'INTERVALO': 5.0},
+    AUTOCOMPLETAR_SEGUNDO_PLANO=False,
+)
+
+
+def setUpModule():
+    configuracao_testes.enable()
+
+
+def tearDownModule():
+    configuracao_testes.disable()
+
+
+class DadosTesteMixin:
+    """
+    Helpers para criar usuários e eventos de teste
+    """
+    telefone = '(11) 91234-5678'
+
+    def criar_organizador(self, username='organizador'):
+        return Usuario.objects.create_user(
+            username=username, email=f'{username}@sgea.com', password='Senha@123',
+            perfil='ORGANIZADOR', telefone=self.telefone
+        )
+
+    def criar_professor(self, username='professor'):
+        return Usuario.objects.create_user(
+            username=username, email=f'{username}@sgea.com', password='Senha@123',
+            perfil='PROFESSOR', instituicao='Universidade', telefone=self.telefone
+        )
+
+    def criar_aluno(self, username='aluno'):
+        return Usuario.objects.create_user(
+            username=username, email=f'{username}@sgea.com', password='Senha@123',
+            perfil='ALUNO', instituicao='Universidade', telefone=self.telefone
+        )
+
+    def criar_evento(self, organizador, professor, vagas_totais=10, **kwargs):
+        data = date.today() + timedelta(days=7)
+        dados = {
+            'tipo': 'MINICURSO',
+            'nome': 'Minicurso de Django',
+            'descricao': 'Minicurso introdutório de Django',
+            'data_inicial': data,
+            'data_final': data,
+            'horario_inicio': time(14, 0),
+            'horario_fim': time(18, 0),
+            'local': 'Laboratório 1',
+            'vagas_totais': vagas_totais,
+            'organizador': organizador,
+            'professor_responsavel': professor,
+        }
+        dados.update(kwargs)
+        return Evento.objects.create(**dados)
+
+
+class ReservaVagaTest(DadosTesteMixin, TestCase):
+    """
+    Testes da rotina de reserva atômica de vagas
+    """
+
+    def setUp(self):
+        self.organizador = self.criar_organizador()
+        self.professor = self.criar_professor()
+        self.evento = self.criar_evento(self.organizador, self.professor, vagas_totais=1)
+
+    def test_reserva_recusa_evento_lotado(self):
+        Inscricao.reservar(self.criar_aluno('aluno1'), self.evento)
+
+        with self.assertRaisesMessage(ValidationError, 'não possui mais vagas'):
+            Inscricao.reservar(self.criar_aluno('aluno2'), self.evento)
+
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos_ativos, 1)
+        self.assertEqual(Inscricao.objects.filter(evento=self.evento).count(), 1)
+
+    def test_reserva_recusa_duplicidade_sem_consumir_vaga(self):
+        self.evento.vagas_totais = 5
+        self.evento.save()
+        aluno = self.criar_aluno()
+        Inscricao.reservar(aluno, self.evento)
+
+        with self.assertRaisesMessage(ValidationError, 'já está inscrito'):
+            Inscricao.reservar(aluno, self.evento)
+
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos_ativos, 1)
+
+    def test_reserva_reativa_inscricao_cancelada(self):
+        aluno = self.criar_aluno()
+        inscricao = Inscricao.reservar(aluno, self.evento)
+        inscricao.cancelar()
+
+        reativada = Inscricao.reservar(aluno, self.evento)
+
+        self.assertEqual(reativada.pk, inscricao.pk)
+        self.assertTrue(reativada.ativa)
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos_ativos, 1)
+
+    def test_reativacao_em_evento_lotado_pelo_admin(self):
+        aluno = self.criar_aluno('aluno1')
+        cancelada = Inscricao.reservar(aluno, self.evento)
+        cancelada.cancelar()
+        Inscricao.reservar(self.criar_aluno('aluno2'), self.evento)
+
+        admin = Usuario.objects.create_superuser('admin', 'admin@sgea.com', 'Senha@123', telefone=self.telefone)
+        self.client.force_login(admin)
+        resposta = self.client.post(f'/admin/eventos/inscricao/{cancelada.pk}/change/', {
+            'usuario': aluno.pk,
+            'evento': self.evento.pk,
+            'ativa': 'on',
+            'data_cancelamento_0': '',
+            'data_cancelamento_1': '',
+        })
+
+        # Erro no formulário, não um 500 vindo do save
+        self.assertEqual(resposta.status_code, 200)
+        self.assertContains(resposta, 'Este evento não possui mais vagas disponíveis.')
+        self.assertFalse(Inscricao.objects.get(pk=cancelada.pk).ativa)
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos_ativos, 1)
+
+        # Editar uma inscrição já ativa no evento lotado continua permitido
+        Inscricao.objects.get(usuario__username='aluno2').full_clean()
+
+    def test_api_usa_reserva(self):
+        client = APIClient()
+        client.force_authenticate(self.criar_aluno('aluno1'))
+        resposta = client.post('/api/inscricoes/', {'evento': self.evento.pk})
+        self.assertEqual(resposta.status_code, 201)
+
+        client.force_authenticate(self.criar_aluno('aluno2'))
+        resposta = client.post('/api/inscricoes/', {'evento': self.evento.pk})
+        self.assertEqual(resposta.status_code, 400)
+
+
+class ExclusaoInscricoesTest(DadosTesteMixin, TestCase):
+    """
+    Vagas devolvidas ao contador quando inscrições são excluídas
+    """
+
+    def setUp(self):
+        self.organizador = self.criar_organizador()
+        self.professor = self.criar_professor()
+        self.eventos = [self.criar_evento(self.organizador, self.professor, nome=f'Evento {i}') for i in range(2)]
+        self.alunos = [self.criar_aluno(f'aluno{i}') for i in range(3)]
+        for aluno in self.alunos:
+            for evento in self.eventos:
+                Inscricao.reservar(aluno, evento)
+        Inscricao.objects.get(usuario=self.alunos[2], evento=self.eventos[0]).cancelar()
+
+    def inscritos(self):
+        return [Evento.objects.get(pk=evento.pk).inscritos_ativos for evento in self.eventos]
+
+    def test_exclusao_individual(self):
+        Inscricao.objects.get(usuario=self.alunos[0], evento=self.eventos[0]).delete()
+        self.assertEqual(self.inscritos(), [1, 3])
+
+    def test_exclusao_em_lote_com_um_update(self):
+        with CaptureQueriesContext(connection) as consultas:
+            Inscricao.objects.filter(usuario__in=self.alunos[1:]).delete()
+
+        self.assertEqual(self.inscritos(), [1, 1])
+        self.assertEqual(
+            len([c for c in consultas if c['sql'].startswith('UPDATE "eventos_evento"')]), 1
+        )
+
+    def test_exclusao_de_usuario(self):
+        with CaptureQueriesContext(connection) as consultas:
+            self.alunos[0].delete()
+
+        self.assertEqual(self.inscritos(), [1, 2])
+        self.assertEqual(
+            len([c for c in consultas if c['sql'].startswith('UPDATE "eventos_evento"')]), 1
+        )
+
+    def test_exclusao_de_evento_em_cascata(self):
+        with CaptureQueriesContext(connection) as consultas:
+            self.eventos[0].delete()
+
+        # As inscrições somem com o evento, sem ajustar o contador dele
+        self.assertFalse(Inscricao.objects.filter(evento_id=self.eventos[0].pk).exists())
+        self.assertEqual(Evento.objects.get(pk=self.eventos[1].pk).inscritos_ativos, 3)
+        self.assertFalse([c for c in consultas if c['sql'].startswith('UPDATE "eventos_evento"')])
+
+        Evento.objects.filter(pk=self.eventos[1].pk).delete()
+        self.assertFalse(Inscricao.objects.exists())
+
+
+class ContadorInscritosTest(DadosTesteMixin, TestCase):
+    """
+    Contador desnormalizado Evento.inscritos_ativos e o comando
+    reconciliar_vagas
+    """
+
+    def setUp(self):
+        self.evento = self.criar_evento(self.criar_organizador(), self.criar_professor())
+        self.alunos = [self.criar_aluno(f'aluno{i}') for i in range(3)]
+
+    def inscritos(self):
+        return Evento.objects.get(pk=self.evento.pk).inscritos_ativos
+
+    def test_criar_cancelar_e_reativar(self):
+        inscricao = Inscricao.reservar(self.alunos[0], self.evento)
+        Inscricao.objects.create(usuario=self.alunos[1], evento=self.evento)
+        self.assertEqual(self.inscritos(), 2)
+
+        inscricao.cancelar()
+        self.assertEqual(self.inscritos(), 1)
+        # Salvar de novo sem mudar o estado não altera o contador
+        inscricao.save()
+        self.assertEqual(self.inscritos(), 1)
+
+        Inscricao.reservar(self.alunos[0], self.evento)
+        self.assertEqual(self.inscritos(), 2)
+
+        # Reativação direta pelo save (admin, formulários)
+        outra = Inscricao.objects.get(usuario=self.alunos[1])
+        outra.cancelar()
+        outra = Inscricao.objects.get(pk=outra.pk)
+        outra.ativa = True
+        outra.save()
+        self.assertEqual(self.inscritos(), 2)
+
+    def test_reconciliar_vagas_dry_run_nao_grava(self):
+        Inscricao.reservar(self.alunos[0], self.evento)
+        Evento.objects.filter(pk=self.evento.pk).update(inscritos_ativos=5)
+
+        saida = StringIO()
+        with CaptureQueriesContext(connection) as consultas:
+            call_command('reconciliar_vagas', '--dry-run', stdout=saida)
+
+        self.assertIn(f'Evento #{self.evento.pk}', saida.getvalue())
+        self.assertIn('contador=5, real=1', saida.getvalue())
+        self.assertIn('1 evento(s) com divergência.', saida.getvalue())
+        self.assertEqual(self.inscritos(), 5)
+        self.assertFalse([c for c in consultas if c['sql'].startswith('UPDATE')])
+
+    def test_reconciliar_vagas_corrige_divergencia(self):
+        certo = self.criar_evento(self.evento.organizador, self.evento.professor_responsavel, nome='Certo')
+        for aluno in self.alunos:
+            Inscricao.reservar(aluno, self.evento)
+        Inscricao.reservar(self.alunos[0], certo)
+        Inscricao.objects.get(usuario=self.alunos[2], evento=self.evento).cancelar()
+        Evento.objects.filter(pk=self.evento.pk).update(inscritos_ativos=0)
+
+        saida = StringIO()
+        call_command('reconciliar_vagas', stdout=saida)
+
+        self.assertIn('1 evento(s) corrigido(s).', saida.getvalue())
+        self.assertEqual(self.inscritos(), 2)
+        self.assertEqual(Evento.objects.get(pk=certo.pk).inscritos_ativos, 1)
+
+        saida = StringIO()
+        call_command('reconciliar_vagas', '--dry-run', stdout=saida)
+        self.assertIn('0 evento(s) com divergência.', saida.getvalue())
+
+
+class ReservaVagaConcorrenciaTest(DadosTesteMixin, TransactionTestCase):
+    """
+    Teste de estresse: N workers disputando as vagas de um mesmo evento
+    """
+    workers = 20
+    vagas = 5
+
+    def test_sem_overbooking_com_workers_paralelos(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            # Threads compartilham o banco em memória e disputam o lock da tabela
+            tentativas_por_worker = 50
+        else:
+            tentativas_por_worker = 1
+
+        evento = self.criar_evento(
+            self.criar_organizador(), self.criar_professor(), vagas_totais=self.vagas
+        )
+        alunos = [self.criar_aluno(f'aluno{i}') for i in range(self.workers)]
+        barreira = threading.Barrier(self.workers)
+        aceitas, recusadas = [], []
+
+        def worker(aluno):
+            try:
+                barreira.wait()
+                for _ in range(tentativas_por_worker):
+                    try:
+                        Inscricao.reservar(aluno, evento)
+                        aceitas.append(aluno.pk)
+                    except ValidationError:
+                        recusadas.append(aluno.pk)
+                    except OperationalError:
+                        time_module.sleep(0.01)
+                        continue
+                    break
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(aluno,)) for aluno in alunos]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        evento.refresh_from_db()
+        total_ativas = Inscricao.objects.filter(evento=evento, ativa=True).count()
+
+        self.assertEqual(len(aceitas), self.vagas)
+        self.assertEqual(len(aceitas) + len(recusadas), self.workers)
+        self.assertEqual(total_ativas, self.vagas)
+        self.assertEqual(evento.inscritos_ativos, self.vagas)
+
+
+class ListaEsperaTest(DadosTesteMixin, TestCase):
+    """
+    Testes da fila de espera com promoção automática
+    """
+
+    def setUp(self):
+        self.evento = self.criar_evento(
+            self.criar_organizador(), self.criar_professor(), vagas_totais=1
+        )
+        self.inscricao = Inscricao.reservar(self.criar_aluno('aluno1'), self.evento)
+
+    def test_cancelamento_promove_primeiro_da_fila(self):
+        segundo = ListaEspera.entrar(self.criar_aluno('aluno2'), self.evento)
+        terceiro = ListaEspera.entrar(self.criar_aluno('aluno3'), self.evento)
+        self.assertEqual((segundo.posicao, terceiro.posicao), (1, 2))
+
+        self.inscricao.cancelar()
+
+        segundo.refresh_from_db()
+        terceiro.refresh_from_db()
+        self.assertEqual(segundo.status, 'PROMOVIDO')
+        self.assertEqual(terceiro.status, 'AGUARDANDO')
+        self.assertEqual(terceiro.posicao, 1)
+        self.assertTrue(
+            Inscricao.objects.filter(usuario=segundo.usuario, evento=self.evento, ativa=True).exists()
+        )
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos_ativos, 1)
+
+    def test_notificacao_adiada_para_worker(self):
+        ListaEspera.entrar(self.criar_aluno('aluno2'), self.evento)
+        mail.outbox.clear()
+
+        self.inscricao.cancelar()
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertTrue(EmailPendente.objects.filter(tipo='PROMOCAO_LISTA_ESPERA').exists())
+
+        call_command('processar_emails', stdout=StringIO())
+        self.assertIn('Vaga liberada', mail.outbox[-1].subject)
+        self.assertFalse(ListaEspera.objects.filter(notificado=False, status='PROMOVIDO').exists())
+
+
+class CaixaSaidaEmailTest(DadosTesteMixin, TestCase):
+    """
+    Testes da caixa de saída de emails e do worker processar_emails
+    """
+
+    def test_signals_enfileiram_sem_enviar(self):
+        aluno = self.criar_aluno()
+        evento = self.criar_evento(self.criar_organizador(), self.criar_professor())
+        Inscricao.reservar(aluno, evento)
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            set(EmailPendente.objects.filter(status='PENDENTE').values_list('tipo', flat=True)),
+            {'BOAS_VINDAS', 'CONFIRMACAO_INSCRICAO'}
+        )
+
+    def test_worker_envia_lote_em_uma_conexao(self):
+        for i in range(3):
+            self.criar_aluno(f'aluno{i}')
+
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.open', autospec=True
+        ) as abrir:
+            call_command('processar_emails', stdout=StringIO())
+
+        self.assertEqual(abrir.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(EmailPendente.objects.exclude(status='ENVIADO').exists())
+
+    def test_worker_reagenda_com_backoff_apos_falha(self):
+        self.criar_aluno()
+
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            side_effect=ConnectionError('SMTP indisponível')
+        ):
+            call_command('processar_emails', '--backoff=60', stdout=StringIO(), stderr=StringIO())
+
+        pendente = EmailPendente.objects.get()
+        self.assertEqual(pendente.status, 'PENDENTE')
+        self.assertEqual(pendente.tentativas, 1)
+        self.assertGreater(pendente.proxima_tentativa, timezone.now() + timedelta(seconds=30))
+
+        EmailPendente.objects.update(proxima_tentativa=timezone.now())
+        call_command('processar_emails', stdout=StringIO())
+        self.assertEqual(EmailPendente.objects.get().status, 'ENVIADO')
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_falha_ao_conectar_reagenda_o_lote(self):
+        for i in range(2):
+            self.criar_aluno(f'aluno{i}')
+        erros = StringIO()
+
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.open',
+            side_effect=ConnectionRefusedError('Conexão recusada')
+        ):
+            call_command('processar_emails', '--backoff=60', stdout=StringIO(), stderr=erros)
+
+        self.assertIn('Conexão recusada', erros.getvalue())
+        self.assertEqual(len(mail.outbox), 0)
+        for pendente in EmailPendente.objects.all():
+            self.assertEqual(pendente.status, 'PENDENTE')
+            self.assertEqual(pendente.tentativas, 1)
+            self.assertEqual(pendente.ultimo_erro, 'Conexão recusada')
+            self.assertGreater(pendente.proxima_tentativa, timezone.now() + timedelta(seconds=30))
+            self.assertLess(pendente.proxima_tentativa, timezone.now() + timedelta(seconds=90))
+
+
+@override_settings(AUDITORIA_BUFFER={'ATIVO': True, 'TAMANHO_LOTE': 3, 'INTERVALO': 0})
+class AuditoriaBufferTest(TestCase):
+    """
+    Testes da gravação em lote da auditoria
+    """
+
+    def tearDown(self):
+        buffer_auditoria.descarregar()
+
+    def registrar(self, descricao):
+        with self.captureOnCommitCallbacks(execute=True):
+            Auditoria.registrar(usuario=None, acao='API_CONSULTA', descricao=descricao)
+
+    def test_grava_em_lote_ao_atingir_tamanho(self):
+        self.registrar('1')
+        self.registrar('2')
+        self.assertEqual(Auditoria.objects.count(), 0)
+
+        recebidos = []
+
+        def receptor(sender, registros, **kwargs):
+            recebidos.extend(registro.pk for registro in registros)
+
+        lote_gravado.connect(receptor)
+        self.addCleanup(lote_gravado.disconnect, receptor)
+
+        with self.assertNumQueries(3):  # savepoint + INSERT em lote + release
+            self.registrar('3')
+        self.assertEqual(Auditoria.objects.count(), 3)
+        self.assertEqual(sorted(recebidos), sorted(Auditoria.objects.values_list('pk', flat=True)))
+
+    def test_transacao_revertida_nao_gera_auditoria(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Auditoria.registrar(usuario=None, acao='API_CONSULTA', descricao='x')
+                    raise DatabaseError
+            except DatabaseError:
+                pass
+
+        self.assertEqual(len(buffer_auditoria), 0)
+
+    def test_benchmark_remove_apenas_os_proprios_registros(self):
+        from .management.commands.benchmark_auditoria import Command
+        medir = Command.medir
+
+        def medir_com_requisicao_real(comando, total, ativo):
+            # Registro gravado pela aplicação enquanto o benchmark roda
+            Auditoria.objects.create(acao='API_CONSULTA', descricao='Requisição real')
+            return medir(comando, total, ativo)
+
+        with mock.patch.object(Command, 'medir', medir_com_requisicao_real):
+            call_command('benchmark_auditoria', requisicoes=5, stdout=StringIO())
+
+        self.assertEqual(list(Auditoria.objects.values_list('descricao', flat=True)), ['Requisição real'] * 2)
+
+
+class CertificadoPdfTest(DadosTesteMixin, TestCase):
+    """
+    Testes da geração e do cache dos certificados em PDF
+    """
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        organizador = self.criar_organizador()
+        self.aluno = self.criar_aluno()
+        evento = self.criar_evento(organizador, self.criar_professor())
+        inscricao = Inscricao.reservar(self.aluno, evento)
+        self.certificado = Certificado.objects.create(inscricao=inscricao, emitido_por=organizador)
+
+    def test_download_gera_pdf_uma_unica_vez(self):
+        self.client.force_login(self.aluno)
+        url = f'/certificados/{self.certificado.pk}/download/'
+
+        with mock.patch(
+            'eventos.certificados.ModeloCertificado.renderizar',
+            autospec=True, side_effect=ModeloCertificado.renderizar
+        ) as renderizar:
+            primeira = self.client.get(url)
+            segunda = self.client.get(url)
+
+        self.assertEqual(renderizar.call_count, 1)
+        self.assertEqual(primeira['Content-Type'], 'application/pdf')
+        conteudo = b''.join(primeira.streaming_content)
+        self.assertTrue(conteudo.startswith(b'%PDF'))
+        self.assertEqual(conteudo, b''.join(segunda.streaming_content))
+
+        self.certificado.refresh_from_db()
+        self.assertRegex(self.certificado.arquivo_pdf.name, r'^certificados/[0-9a-f]{2}/[0-9a-f]{64}\.pdf$')
+
+    def test_logo_embutido_em_jpeg_sem_recompressao(self):
+        modelo = ModeloCertificado()
+        if modelo.logo is None:
+            self.skipTest('Logo não encontrado em STATICFILES_DIRS')
+
+        with mock.patch('reportlab.pdfbase.pdfdoc.zlib.compress', wraps=zlib.compress) as comprimir:
+            conteudo = modelo.renderizar(dados_certificado(self.certificado))
+
+        self.assertTrue(b'/DCTDecode' in conteudo)
+        self.assertFalse(b'/SMask' in conteudo)
+        # Só o fluxo de conteúdo da página é comprimido; a imagem já vem pronta
+        self.assertLessEqual(comprimir.call_count, 1)
+
+    def test_zip_do_evento_inclui_todos_os_certificados(self):
+        evento = self.certificado.inscricao.evento
+        outra = Inscricao.reservar(self.criar_aluno('aluno2'), evento)
+        Certificado.objects.create(inscricao=outra, emitido_por=evento.organizador)
+        url = f'/eventos/{evento.pk}/certificados.zip'
+
+        self.client.force_login(self.aluno)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(evento.organizador)
+        resposta = self.client.get(url)
+
+        self.assertEqual(resposta['Content-Type'], 'application/zip')
+        with zipfile.ZipFile(io.BytesIO(b''.join(resposta.streaming_content))) as arquivo_zip:
+            nomes = arquivo_zip.namelist()
+            self.assertEqual(len(nomes), 2)
+            self.assertTrue(all(arquivo_zip.read(nome).startswith(b'%PDF') for nome in nomes))
+
+    def test_zip_do_evento_ignora_revogados(self):
+        evento = self.certificado.inscricao.evento
+        outra = Inscricao.reservar(self.criar_aluno('aluno2'), evento)
+        Certificado.objects.create(inscricao=outra, emitido_por=evento.organizador, revogado=True)
+        url = f'/eventos/{evento.pk}/certificados.zip'
+        self.client.force_login(evento.organizador)
+
+        with zipfile.ZipFile(io.BytesIO(b''.join(self.client.get(url).streaming_content))) as arquivo_zip:
+            self.assertEqual(len(arquivo_zip.namelist()), 1)
+
+        Certificado.objects.filter(pk=self.certificado.pk).update(revogado=True)
+        self.assertRedirects(self.client.get(url), f'/eventos/{evento.pk}/inscritos/', fetch_redirect_response=False)
+
+
+class CodigoCertificadoTest(DadosTesteMixin, TestCase):
+    """
+    Testes dos códigos de verificação assinados
+    """
+
+    def setUp(self):
+        cache.clear()
+        organizador = self.criar_organizador()
+        evento = self.criar_evento(organizador, self.criar_professor())
+        self.inscricao = Inscricao.reservar(self.criar_aluno(), evento)
+        self.certificado = Certificado.objects.create(inscricao=self.inscricao, emitido_por=organizador)
+
+    def test_codigo_verificavel_sem_banco(self):
+        chave = b'chave-externa'
+        codigo = gerar_codigo(12345, chave)
+
+        self.assertEqual(verificar_codigo(codigo, chave), 12345)
+        self.assertEqual(verificar_codigo(codigo.lower(), chave), 12345)
+        self.assertIsNone(verificar_codigo(codigo, b'outra-chave'))
+        self.assertIsNone(verificar_codigo(codigo.replace('SGEA-9IX', 'SGEA-9IY'), chave))
+
+    def test_chave_independente_da_secret_key(self):
+        codigo = self.certificado.codigo_verificacao
+
+        with self.settings(SECRET_KEY='outra-secret-key-' + 'x' * 40):
+            self.assertEqual(Certificado.buscar_por_codigo(codigo), self.certificado)
+
+        with self.settings(CERTIFICADO_CHAVE_ASSINATURA=None):
+            with self.assertRaises(ImproperlyConfigured):
+                chave_assinatura()
+            self.assertEqual([erro.id for erro in verificar_chave_certificados(None)], ['eventos.E001'])
+
+    def test_codigo_adulterado_recusado_sem_consulta(self):
+        codigo = self.certificado.codigo_verificacao
+        adulterado = codigo[:-1] + ('A' if codigo[-1] != 'A' else 'B')
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(Certificado.buscar_por_codigo(adulterado))
+            self.assertIsNone(Certificado.buscar_por_codigo('qualquer-coisa'))
+
+    def test_validacao_respeita_revogacao(self):
+        url = f'/certificados/validar/{self.certificado.codigo_verificacao}/'
+        self.assertTrue(self.client.get(url).context['valido'])
+
+        self.certificado.revogado = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.certificado.save()
+        self.assertFalse(self.client.get(url).context['valido'])
+
+    def test_resultado_da_validacao_fica_em_cache(self):
+        url = f'/certificados/validar/{self.certificado.codigo_verificacao}/'
+        self.client.get(url)
+
+        # Apenas o INSERT da auditoria (bufferizada fora dos testes)
+        with self.assertNumQueries(1):
+            resposta = self.client.get(url)
+        self.assertContains(resposta, self.inscricao.evento.nome)
+
+        # Código inexistente também fica em cache (TTL curto)
+        url_invalida = f'/certificados/validar/{uuid.uuid4()}/'
+        with self.assertNumQueries(1):
+            self.client.get(url_invalida)
+        with self.assertNumQueries(0):
+            self.assertFalse(self.client.get(url_invalida).context['valido'])
+
+    def test_cache_nao_repete_o_codigo_como_digitado(self):
+        codigo = gerar_codigo(99999, b'outra-chave')
+        self.client.get('/certificados/validar/', {'codigo': f'  {codigo.lower()} '})
+
+        resposta = self.client.get('/certificados/validar/', {'codigo': codigo})
+        self.assertContains(resposta, f'<strong>{codigo}</strong>')
+        self.assertNotContains(resposta, codigo.lower())
+
+    def test_codigo_uuid_legado_continua_valido(self):
+        legado = str(uuid.uuid4())
+        Certificado.objects.filter(pk=self.certificado.pk).update(codigo_legado=legado)
+
+        self.assertEqual(Certificado.buscar_por_codigo(legado), self.certificado)
+        self.assertIsNone(Certificado.buscar_por_codigo(str(uuid.uuid4())))
+
+
+class GerarCertificadosTest(DadosTesteMixin, TestCase):
+    """
+    Testes do comando de emissão de certificados em lote
+    """
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.checkpoint = f'{self.media}/checkpoint.json'
+
+        organizador = self.criar_organizador()
+        self.evento = self.criar_evento(organizador, self.criar_professor())
+        self.inscricoes = [
+            Inscricao.reservar(self.criar_aluno(f'aluno{i}'), self.evento) for i in range(5)
+        ]
+        self.inscricoes[-1].cancelar()
+        ontem = date.today() - timedelta(days=1)
+        Evento.objects.filter(pk=self.evento.pk).update(data_inicial=ontem, data_final=ontem)
+
+    def gerar(self, **kwargs):
+        saida = StringIO()
+        call_command(
+            'gerar_certificados', processos=1, lote=2, checkpoint=self.checkpoint,
+            stdout=saida, **kwargs
+        )
+        return saida.getvalue()
+
+    def test_emite_certificados_com_pdf_e_auditoria(self):
+        saida = self.gerar()
+
+        certificados = Certificado.objects.filter(inscricao__evento=self.evento)
+        self.assertEqual(certificados.count(), 4)
+        self.assertFalse(certificados.filter(arquivo_pdf='').exists())
+        self.assertEqual(Auditoria.objects.filter(acao='EMITIR_CERTIFICADO').count(), 4)
+        self.assertIn('certificados/s', saida)
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+        # Segunda execução não encontra nada pendente
+        self.gerar()
+        self.assertEqual(certificados.count(), 4)
+
+    def test_retoma_a_partir_do_checkpoint(self):
+        with open(self.checkpoint, 'w') as arquivo:
+            json.dump({
+                'filtro': {'evento__data_final': (date.today() - timedelta(days=1)).isoformat()},
+                'ultimo_inscricao_id': self.inscricoes[1].pk,
+                'emitidos': 2,
+                'pdfs': 2,
+            }, arquivo)
+
+        saida = self.gerar()
+
+        self.assertIn(f'Retomando a partir da inscrição #{self.inscricoes[1].pk}', saida)
+        self.assertEqual(
+            set(Certificado.objects.values_list('inscricao_id', flat=True)),
+            {self.inscricoes[2].pk, self.inscricoes[3].pk}
+        )
+
+    def test_completa_pdf_de_certificado_emitido_manualmente(self):
+        certificado = Certificado.objects.create(
+            inscricao=self.inscricoes[0], emitido_por=self.evento.organizador
+        )
+
+        self.gerar(evento=[self.evento.pk])
+
+        certificado.refresh_from_db()
+        self.assertTrue(certificado.arquivo_pdf.name.startswith('certificados/'))
+        self.assertEqual(Certificado.objects.count(), 4)
+
+
+class PaginacaoKeysetTest(DadosTesteMixin, TestCase):
+    """
+    Testes do modo keyset (?cursor=) da paginação da API
+    """
+
+    def setUp(self):
+        cache.clear()
+        organizador = self.criar_organizador()
+        professor = self.criar_professor()
+        amanha = date.today() + timedelta(days=1)
+        # Vários eventos no mesmo dia e horário exercitam o desempate por id
+        self.eventos = [
+            self.criar_evento(
+                organizador, professor,
+                data_inicial=amanha + timedelta(days=i % 3),
+                data_final=amanha + timedelta(days=i % 3),
+                horario_inicio=time(8 + i % 2, 0)
+            )
+            for i in range(25)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(organizador)
+
+    def test_percorre_catalogo_sem_repetir_nem_contar(self):
+        ordem_esperada = [
+            evento.pk for evento in sorted(
+                self.eventos, key=lambda e: (e.data_inicial, e.horario_inicio, e.pk)
+            )
+        ]
+
+        vistos = []
+        url = '/api/eventos/?cursor='
+        while url:
+            with CaptureQueriesContext(connection) as consultas:
+                resposta = self.client.get(url)
+            self.assertEqual(resposta.status_code, 200)
+            self.assertNotIn('count', resposta.data)
+            self.assertFalse(any('COUNT(' in q['sql'] for q in consultas.captured_queries))
+            vistos.extend(item['id'] for item in resposta.data['results'])
+            url = resposta.data['next']
+
+        self.assertEqual(vistos, ordem_esperada)
+
+    def test_cursor_invalido(self):
+        resposta = self.client.get('/api/eventos/?cursor=adulterado')
+        self.assertEqual(resposta.status_code, 404)
+
+    def test_paginacao_por_pagina_continua_padrao(self):
+        resposta = self.client.get('/api/eventos/')
+        self.assertEqual(resposta.data['count'], 25)
+
+    def test_inscricoes_da_mais_recente_para_a_mais_antiga(self):
+        aluno = self.criar_aluno()
+        for evento in self.eventos[:12]:
+            Inscricao.reservar(aluno, evento)
+        self.client.force_authenticate(aluno)
+
+        primeira = self.client.get('/api/inscricoes/?cursor=').data
+        segunda = self.client.get(primeira['next']).data
+
+        ids = [item['id'] for item in primeira['results'] + segunda['results']]
+        esperados = list(
+            Inscricao.objects.filter(usuario=aluno).order_by('-data_inscricao', '-id').values_list('pk', flat=True)
+        )
+        self.assertEqual(ids, esperados)
+        self.assertIsNone(segunda['next'])
+
+
+class GetCondicionalTest(DadosTesteMixin, TestCase):
+    """
+    Testes de ETag / Last-Modified nas páginas e na API de eventos
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.organizador = self.criar_organizador()
+        self.evento = self.criar_evento(self.organizador, self.criar_professor())
+
+    def test_api_retrieve_responde_304_sem_serializar(self):
+        api = APIClient()
+        api.force_authenticate(self.organizador)
+        url = f'/api/eventos/{self.evento.pk}/'
+
+        primeira = api.get(url)
+        self.assertEqual(primeira.status_code, 200)
+
+        with mock.patch('eventos.api_views.EventoDetailSerializer') as serializer:
+            segunda = api.get(url, HTTP_IF_NONE_MATCH=primeira['ETag'])
+        self.assertEqual(segunda.status_code, 304)
+        serializer.assert_not_called()
+
+        # Uma inscrição muda as vagas, então a versão em cache deixa de valer
+        Inscricao.reservar(self.criar_aluno(), self.evento)
+        terceira = api.get(url, HTTP_IF_NONE_MATCH=primeira['ETag'])
+        self.assertEqual(terceira.status_code, 200)
+        self.assertEqual(terceira.data['total_inscritos'], 1)
+
+    def test_detalhe_anonimo_usa_last_modified(self):
+        url = f'/eventos/{self.evento.pk}/'
+        primeira = self.client.get(url)
+        self.assertIn('Last-Modified', primeira)
+
+        segunda = self.client.get(url, HTTP_IF_MODIFIED_SINCE=primeira['Last-Modified'])
+        self.assertEqual(segunda.status_code, 304)
+
+    def test_detalhe_muda_com_estado_do_usuario(self):
+        aluno = self.criar_aluno()
+        self.client.force_login(aluno)
+        url = f'/eventos/{self.evento.pk}/'
+        primeira = self.client.get(url)
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=primeira['ETag']).status_code, 304)
+
+        Inscricao.reservar(aluno, self.evento)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=primeira['ETag']).status_code, 200)
+
+    def test_lista_de_eventos(self):
+        primeira = self.client.get('/eventos/')
+        self.assertEqual(
+            self.client.get('/eventos/', HTTP_IF_NONE_MATCH=primeira['ETag']).status_code, 304
+        )
+
+        self.criar_evento(self.organizador, self.evento.professor_responsavel, nome='Outro')
+        self.assertEqual(
+            self.client.get('/eventos/', HTTP_IF_NONE_MATCH=primeira['ETag']).status_code, 200
+        )
+
+    def test_lista_de_eventos_muda_com_exclusao(self):
+        # A exclusão de um evento que não é o mais recente não altera a maior
+        # data_atualizacao; quem muda o ETag é o tombstone
+        self.criar_evento(self.organizador, self.evento.professor_responsavel, nome='Outro')
+        primeira = self.client.get('/eventos/')
+
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.get('/eventos/', HTTP_IF_NONE_MATCH=primeira['ETag'])
+        self.assertFalse(any('COUNT(' in consulta['sql'] for consulta in consultas.captured_queries))
+
+        self.evento.delete()
+        self.assertEqual(
+            self.client.get('/eventos/', HTTP_IF_NONE_MATCH=primeira['ETag']).status_code, 200
+        )
+
+
+@mock.patch('eventos.sincronizacao.MARGEM_SEGURANCA', timedelta(0))
+class SincronizacaoEventosTest(DadosTesteMixin, TestCase):
+    """
+    Testes da sincronização incremental (api/eventos/changes/)
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.organizador = self.criar_organizador()
+        self.professor = self.criar_professor()
+        self.eventos = [
+            self.criar_evento(self.organizador, self.professor, nome=f'Evento {i}') for i in range(4)
+        ]
+        self.api = APIClient()
+        self.api.force_authenticate(self.organizador)
+
+    def sincronizar(self, since=None):
+        params = {'since': since} if since else {}
+        resposta = self.api.get('/api/eventos/changes/', params)
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.data
+
+    def test_devolve_apenas_o_que_mudou(self):
+        inicial = self.sincronizar()
+        self.assertEqual(len(inicial['eventos']), 4)
+        self.assertFalse(inicial['mais'])
+
+        self.assertEqual(self.sincronizar(inicial['since'])['eventos'], [])
+
+        alterado, desativado, excluido = self.eventos[:3]
+        alterado.local = 'Auditório'
+        alterado.save()
+        desativado.ativo = False
+        desativado.save()
+        excluido_id = excluido.pk
+        excluido.delete()
+        novo = self.criar_evento(self.organizador, self.professor, nome='Novo')
+
+        delta = self.sincronizar(inicial['since'])
+        self.assertEqual([e['id'] for e in delta['eventos']], [alterado.pk, novo.pk])
+        self.assertEqual(sorted(delta['removidos']), sorted([desativado.pk, excluido_id]))
+
+    def test_pagina_alteracoes_grandes(self):
+        with mock.patch('eventos.api_views.alteracoes_desde', side_effect=lambda token: alteracoes_desde(token, limite=3)):
+            primeira = self.sincronizar()
+            segunda = self.sincronizar(primeira['since'])
+
+        self.assertTrue(primeira['mais'])
+        self.assertFalse(segunda['mais'])
+        ids = [e['id'] for e in primeira['eventos'] + segunda['eventos']]
+        self.assertEqual(sorted(ids), sorted(e.pk for e in self.eventos))
+
+    def test_token_invalido(self):
+        resposta = self.api.get('/api/eventos/changes/', {'since': 'abc'})
+        self.assertEqual(resposta.status_code, 400)
+
+
+class InscricaoLoteTest(DadosTesteMixin, TestCase):
+    """
+    Testes da inscrição em lote pela API
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.organizador = self.criar_organizador()
+        self.professor = self.criar_professor()
+        self.api = APIClient()
+
+    def test_aluno_se_inscreve_em_varios_eventos(self):
+        aluno = self.criar_aluno()
+        livre = self.criar_evento(self.organizador, self.professor)
+        lotado = self.criar_evento(self.organizador, self.professor, vagas_totais=1)
+        Inscricao.reservar(self.criar_aluno('outro'), lotado)
+        ja_inscrito = self.criar_evento(self.organizador, self.professor)
+        Inscricao.reservar(aluno, ja_inscrito)
+
+        self.api.force_authenticate(aluno)
+        resposta = self.api.post('/api/inscricoes/lote/', {
+            'eventos': [livre.pk, lotado.pk, ja_inscrito.pk, 999999]
+        }, format='json')
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(
+            [item['status'] for item in resposta.data['resultados']],
+            ['inscrito', 'recusado', 'recusado', 'recusado']
+        )
+        self.assertIn('vagas', resposta.data['resultados'][1]['erro'])
+        livre.refresh_from_db()
+        self.assertEqual(livre.inscritos_ativos, 1)
+        self.assertTrue(EmailPendente.objects.filter(
+            tipo='CONFIRMACAO_INSCRICAO', objeto_id=resposta.data['resultados'][0]['inscricao']
+        ).exists())
+
+    def test_organizador_inscreve_turma_ate_lotar(self):
+        evento = self.criar_evento(self.organizador, self.professor, vagas_totais=20)
+        alunos = [self.criar_aluno(f'aluno{i}') for i in range(25)]
+        # Uma inscrição cancelada é reativada em vez de duplicada
+        Inscricao.reservar(alunos[0], evento).cancelar()
+        outro_evento = self.criar_evento(self.criar_organizador('outro_org'), self.professor)
+
+        self.api.force_authenticate(self.organizador)
+        itens = [{'usuario': aluno.pk, 'evento': evento.pk} for aluno in alunos]
+        itens.append({'usuario': alunos[0].pk, 'evento': outro_evento.pk})
+
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.api.post('/api/inscricoes/lote/', {'itens': itens}, format='json')
+
+        self.assertEqual(resposta.data['total_inscritos'], 20)
+        self.assertIn('organizador', resposta.data['resultados'][-1]['erro'])
+        evento.refresh_from_db()
+        self.assertEqual(evento.inscritos_ativos, 20)
+        self.assertEqual(Inscricao.objects.filter(evento=evento, ativa=True).count(), 20)
+        self.assertEqual(Inscricao.objects.filter(evento=evento).count(), 20)
+        # Consultas em conjunto: não cresce com o número de itens
+        self.assertLess(len(consultas), 20)
+
+    def test_evento_desativado_tratado_como_inexistente(self):
+        aluno = self.criar_aluno()
+        desativado = self.criar_evento(self.organizador, self.professor)
+        Evento.objects.filter(pk=desativado.pk).update(ativo=False)
+
+        self.api.force_authenticate(aluno)
+        resposta = self.api.post('/api/inscricoes/lote/', {'eventos': [desativado.pk, 999999]}, format='json')
+
+        self.assertEqual(
+            [item['erro'] for item in resposta.data['resultados']],
+            ['Evento não encontrado.', 'Evento não encontrado.']
+        )
+        self.assertFalse(Inscricao.objects.filter(evento=desativado).exists())
+
+    def test_exige_uma_das_listas(self):
+        self.api.force_authenticate(self.criar_aluno())
+        resposta = self.api.post('/api/inscricoes/lote/', {'eventos': []}, format='json')
+        self.assertEqual(resposta.status_code, 400)
+
+
+class ExportacaoInscritosTest(DadosTesteMixin, TestCase):
+    """
+    Testes da exportação de participantes em CSV / NDJSON
+    """
+
+    def setUp(self):
+        self.organizador = self.criar_organizador()
+        self.evento = self.criar_evento(self.organizador, self.criar_professor())
+        for i in range(3):
+            Inscricao.reservar(self.criar_aluno(f'aluno{i}'), self.evento)
+        Inscricao.reservar(self.criar_aluno('desistente'), self.evento).cancelar()
+        self.url = f'/eventos/{self.evento.pk}/inscritos/exportar/'
+
+    def test_csv(self):
+        self.client.force_login(self.organizador)
+        resposta = self.client.get(self.url)
+
+        self.assertTrue(resposta.streaming)
+        linhas = b''.join(resposta.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(linhas[0].split(',')[:2], ['inscricao_id', 'nome'])
+        self.assertEqual(len(linhas), 4)
+        self.assertNotIn('desistente', '\n'.join(linhas))
+
+    def test_ndjson(self):
+        self.client.force_login(self.organizador)
+        resposta = self.client.get(self.url, {'formato': 'ndjson'})
+
+        registros = [json.loads(linha) for linha in b''.join(resposta.streaming_content).splitlines()]
+        self.assertEqual([r['usuario'] for r in registros], ['aluno0', 'aluno1', 'aluno2'])
+        self.assertIsNone(registros[0]['codigo_certificado'])
+
+    def test_apenas_organizador(self):
+        self.client.force_login(self.criar_aluno('curioso'))
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+
+class BuscaEventosTest(DadosTesteMixin, TestCase):
+    """
+    Testes da busca textual de eventos (FTS5 no SQLite)
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.organizador = self.criar_organizador()
+        professor = self.criar_professor()
+        self.no_nome = self.criar_evento(
+            self.organizador, professor,
+            nome='Semana de Computação', descricao='Palestras e oficinas', local='Auditório'
+        )
+        self.na_descricao = self.criar_evento(
+            self.organizador, professor,
+            nome='Palestra de abertura', descricao='Tópicos de computação em nuvem', local='Sala 2'
+        )
+        self.outro = self.criar_evento(
+            self.organizador, professor,
+            nome='Minicurso de Python', descricao='Introdução à linguagem', local='Laboratório 3'
+        )
+
+    def buscar(self, termo):
+        return list(buscar_eventos(Evento.objects.all(), termo))
+
+    def test_sem_acentos_e_por_prefixo(self):
+        self.assertEqual(self.buscar('computacao'), [self.no_nome, self.na_descricao])
+        self.assertEqual(self.buscar('LABORAT'), [self.outro])
+
+    def test_nome_tem_mais_relevancia_que_descricao(self):
+        self.assertEqual(self.buscar('computação')[0], self.no_nome)
+
+    def test_todas_as_palavras_sao_obrigatorias(self):
+        self.assertEqual(self.buscar('computação nuvem'), [self.na_descricao])
+
+    def test_indice_acompanha_alteracoes_e_exclusoes(self):
+        Evento.objects.filter(pk=self.outro.pk).update(nome='Oficina de Robótica')
+        self.assertEqual(self.buscar('robotica'), [self.outro])
+        self.assertEqual(self.buscar('python'), [])
+
+        self.outro.delete()
+        self.assertEqual(self.buscar('robotica'), [])
+
+    @skipUnless(connection.vendor == 'sqlite', 'FTS5 só no SQLite')
+    def test_match_executado_uma_vez(self):
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.buscar('computação')[0], self.no_nome)
+
+        sql = consultas.captured_queries[0]['sql']
+        self.assertEqual(sql.count('"eventos_evento_fts" MATCH'), 1)
+        self.assertNotIn('SELECT bm25', sql)
+
+    def test_sintaxe_do_fts5_nao_vaza(self):
+        self.assertEqual(consulta_fts5('"python" OR nome:*'), '"python"* "OR"* "nome"*')
+        self.assertEqual(self.buscar('"()*:'), [])
+
+    def test_lista_e_api(self):
+        resposta = self.client.get('/eventos/', {'search': 'computacao'})
+        self.assertEqual(list(resposta.context['eventos']), [self.no_nome, self.na_descricao])
+
+        cliente = APIClient()
+        cliente.force_authenticate(self.organizador)
+        resposta = cliente.get('/api/eventos/', {'q': 'oficinas'})
+        self.assertEqual([item['id'] for item in resposta.data['results']], [self.no_nome.pk])
+
+
+class AutocompletarTest(DadosTesteMixin, TestCase):
+    """
+    Testes do índice de prefixos do autocompletar
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.organizador = self.criar_organizador()
+        self.professor = self.criar_professor()
+        self.evento = self.criar_evento(
+            self.organizador, self.professor, nome='Semana de Computação', local='Auditório Central'
+        )
+        indice_autocompletar.carregar([])
+        indice_autocompletar._carregado_em = None
+        self.client = APIClient()
+
+    def test_indice_por_palavra_e_sem_acentos(self):
+        indice = IndicePrefixos()
+        indice.carregar([(1, 'Semana de Computação', 'Auditório'), (2, 'Computação Gráfica', 'Sala 1')])
+
+        self.assertEqual(
+            [s['texto'] for s in indice.buscar('COMPUT')],
+            ['Computação Gráfica', 'Semana de Computação']
+        )
+        self.assertEqual(indice.buscar('audi'), [{'texto': 'Auditório', 'campo': 'local', 'evento': 1}])
+        self.assertEqual(indice.buscar('semana de c')[0]['evento'], 1)
+
+        indice.atualizar(1, 'Oficina', 'Auditório', ativo=False)
+        self.assertEqual([s['evento'] for s in indice.buscar('comp')], [2])
+        indice.remover(2)
+        self.assertEqual(indice.buscar('comp'), [])
+
+    def test_api_sem_consultas_ao_banco(self):
+        self.client.get('/api/eventos/autocompletar/', {'q': 'x'})
+
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get('/api/eventos/autocompletar/', {'q': 'computa'})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.data, [{'texto': 'Semana de Computação', 'campo': 'nome', 'evento': self.evento.pk}])
+        self.assertEqual(len(consultas), 0)
+
+    def test_signals_atualizam_indice_apos_commit(self):
+        self.client.get('/api/eventos/autocompletar/', {'q': 'x'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            novo = self.criar_evento(self.organizador, self.professor, nome='Oficina de Robótica')
+        self.assertEqual(self.client.get('/api/eventos/autocompletar/', {'q': 'robo'}).data[0]['evento'], novo.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            novo.delete()
+            self.evento.ativo = False
+            self.evento.save()
+        self.assertEqual(self.client.get('/api/eventos/autocompletar/', {'q': 'robo'}).data, [])
+        self.assertEqual(self.client.get('/api/eventos/autocompletar/', {'q': 'semana'}).data, [])
+
+    @override_settings(AUTOCOMPLETAR_SEGUNDO_PLANO=True)
+    def test_recarga_em_segundo_plano_responde_com_indice_anterior(self):
+        indice_autocompletar.carregar([(1, 'Semana de Computação', '')])
+        liberar = threading.Event()
+
+        def eventos_ativos():
+            liberar.wait(5)
+            return [(1, 'Semana de Computação', ''), (2, 'Oficina de Robótica', '')]
+
+        with mock.patch('eventos.autocompletar._eventos_ativos', side_effect=eventos_ativos):
+            thread = agendar_recarga()
+            self.assertIsNone(agendar_recarga())
+
+            # A requisição não espera a recarga nem consulta o banco
+            with CaptureQueriesContext(connection) as consultas:
+                resposta = self.client.get('/api/eventos/autocompletar/', {'q': 'semana'})
+            self.assertEqual(resposta.data[0]['evento'], 1)
+            self.assertEqual(len(consultas), 0)
+
+            # Alteração recebida durante a recarga sobrevive à troca
+            indice_autocompletar.atualizar(3, 'Robótica Avançada', '')
+            liberar.set()
+            thread.join(5)
+
+        self.assertEqual({s['evento'] for s in indice_autocompletar.buscar('robo')}, {2, 3})
+        self.assertFalse(thread.is_alive())
+
+    @override_settings(AUTOCOMPLETAR_SEGUNDO_PLANO=True)
+    def test_primeira_consulta_espera_a_carga_inicial(self):
+        def eventos_ativos():
+            time_module.sleep(0.2)
+            return [(1, 'Semana de Computação', '')]
+
+        with mock.patch('eventos.autocompletar._eventos_ativos', side_effect=eventos_ativos):
+            # Carga disparada na subida do processo, ainda em andamento
+            thread = agendar_recarga()
+            resposta = self.client.get('/api/eventos/autocompletar/', {'q': 'semana'})
+            thread.join(5)
+
+        self.assertEqual([s['evento'] for s in resposta.data], [1])
+
+    def test_carga_inicial_disparada_pelo_wsgi(self):
+        sys.modules.pop('sgea.wsgi', None)
+        with mock.patch('eventos.autocompletar.agendar_recarga') as agendar:
+            importlib.import_module('sgea.wsgi')
+        agendar.assert_called_once_with()
+
+    @override_settings(AUTOCOMPLETAR_SEGUNDO_PLANO=True)
+    def test_indice_vencido_agenda_recarga(self):
+        with mock.patch('eventos.autocompletar.agendar_recarga') as agendar:
+            resposta = self.client.get('/api/eventos/autocompletar/', {'q': 'semana'})
+        self.assertEqual(resposta.data, [])
+        agendar.assert_called_once_with()
+
+
+class ListaEventosTest(DadosTesteMixin, TestCase):
+    """
+    Testes da paginação e do custo em consultas da lista de eventos
+    """
+
+    def setUp(self):
+        self.organizador = self.criar_organizador()
+        self.professor = self.criar_professor()
+
+    def criar_eventos(self, quantidade):
+        aluno = Usuario.objects.filter(perfil='ALUNO').first() or self.criar_aluno()
+        for i in range(quantidade):
+            evento = self.criar_evento(self.organizador, self.professor, nome=f'Evento {i}', vagas_totais=1)
+            if i % 2:
+                Inscricao.reservar(aluno, evento)
+
+    def consultas_da_pagina(self, **parametros):
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get('/eventos/', parametros)
+        self.assertEqual(resposta.status_code, 200)
+        return len(consultas), resposta
+
+    def test_numero_de_consultas_independe_do_catalogo(self):
+        self.client.force_login(self.organizador)
+        self.criar_eventos(15)
+        pequeno, resposta = self.consultas_da_pagina()
+        self.assertContains(resposta, 'Lotado', count=6)
+        self.assertContains(resposta, 'Vagas Disponíveis', count=6)
+
+        self.criar_eventos(45)
+        grande, _ = self.consultas_da_pagina(page=3)
+        self.assertEqual(pequeno, grande)
+        self.assertLessEqual(grande, 5)
+
+    def test_paginacao_preserva_filtros(self):
+        self.criar_eventos(EVENTOS_POR_PAGINA + 1)
+        _, resposta = self.consultas_da_pagina(tipo='MINICURSO')
+
+        self.assertEqual(len(resposta.context['eventos']), EVENTOS_POR_PAGINA)
+        self.assertContains(resposta, 'href="?page=2&tipo=MINICURSO"')
+        _, resposta = self.consultas_da_pagina(tipo='MINICURSO', page=2)
+        self.assertEqual([e.nome for e in resposta.context['eventos']], [f'Evento {EVENTOS_POR_PAGINA}'])
+
+
+class OrcamentoConsultasTest(DadosTesteMixin, TestCase):
+    """
+    Orçamento fixo de consultas SQL para cada URL de eventos/urls.py e
+    eventos/api_urls.py, medido sobre uma base com vários eventos,
+    inscrições, certificados e registros de auditoria. Um N+1 novo faz a
+    contagem crescer e o teste falhar; uma URL nova precisa entrar na tabela.
+    """
+    participantes = 12
+
+    # nome da URL: (usuário, método, orçamento)
+    ORCAMENTOS = {
+        'home': (None, 'get', 3),
+        'registro': (None, 'get', 0),
+        'login': (None, 'get', 0),
+        'logout': ('aluno', 'get', 4),
+        'dashboard': ('organizador', 'get', 5),
+        'eventos_list': ('aluno', 'get', 5),
+        'evento_detail': ('aluno', 'get', 8),
+        'evento_create': ('organizador', 'get', 3),
+        'evento_edit': ('organizador', 'get', 5),
+        'evento_delete': ('organizador', 'get', 4),
+        'evento_inscritos': ('organizador', 'get', 5),
+        'evento_inscritos_exportar': ('organizador', 'get', 5),
+        'evento_certificados_zip': ('organizador', 'get', 8),
+        'inscricao_create': ('novato', 'get', 7),
+        'inscricao_cancelar': ('aluno', 'get', 3),
+        'minhas_inscricoes': ('aluno', 'get', 6),
+        'lista_espera_entrar': ('aluno', 'get', 3),
+        'lista_espera_sair': ('aluno', 'get', 3),
+        'meus_certificados': ('aluno', 'get', 3),
+        'certificado_download': ('aluno', 'get', 3),
+        'certificado_emitir': ('organizador', 'get', 9),
+        'certificado_validar_form': (None, 'get', 0),
+        'certificado_validar': (None, 'get', 2),
+        'confirmar_email': (None, 'get', 2),
+        'auditoria_list': ('organizador', 'get', 4),
+        'api-login': (None, 'post', 5),
+        'api-root': ('aluno', 'get', 2),
+        'api-evento-list': ('aluno', 'get', 5),
+        'api-evento-detail': ('aluno', 'get', 5),
+        'api-evento-changes': ('aluno', 'get', 5),
+        'api-evento-autocompletar': ('aluno', 'get', 3),
+        'api-inscricao-list': ('aluno', 'get', 7),
+        'api-inscricao-detail': ('aluno', 'get', 4),
+        'api-inscricao-lote': ('novato', 'post', 14),
+        'api-lista-espera-list': ('aluno', 'get', 5),
+        'api-lista-espera-detail': ('aluno', 'get', 4),
+    }
+
+    def setUp(self):
+        cache.clear()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.usuarios = {
+            'organizador': self.criar_organizador(),
+            'aluno': self.criar_aluno(),
+            'novato': self.criar_aluno('novato'),
+        }
+        professor = self.criar_professor()
+        self.eventos = [
+            self.criar_evento(self.usuarios['organizador'], professor, nome=f'Evento {i}', vagas_totais=self.participantes + 1)
+            for i in range(3)
+        ]
+        self.lotado = self.criar_evento(self.usuarios['organizador'], professor, nome='Lotado', vagas_totais=1)
+        Inscricao.reservar(self.criar_aluno('primeiro'), self.lotado)
+        self.espera = ListaEspera.entrar(self.usuarios['aluno'], self.lotado)
+        for i in range(self.participantes):
+            participante = self.criar_aluno(f'participante{i}')
+            ListaEspera.entrar(participante, self.lotado)
+            for evento in self.eventos:
+                inscricao = Inscricao.reservar(participante, evento)
+                if evento is self.eventos[0]:
+                    Certificado.objects.create(inscricao=inscricao, emitido_por=self.usuarios['organizador'])
+
+        self.inscricao = Inscricao.reservar(self.usuarios['aluno'], self.eventos[0])
+        self.certificado = Certificado.objects.create(inscricao=self.inscricao, emitido_por=self.usuarios['organizador'])
+        self.sem_certificado = Inscricao.objects.filter(evento=self.eventos[1]).first()
+        for evento in self.eventos[1:]:
+            Inscricao.reservar(self.usuarios['aluno'], evento)
+        self.pendente = Usuario.objects.get(username='novato')
+        Usuario.objects.filter(pk=self.pendente.pk).update(token_confirmacao='token-teste')
+
+    def requisicao(self, nome):
+        """
+        (caminho, dados) da requisição de teste para cada URL
+        """
+        evento = self.eventos[0]
+        caminhos = {
+            'home': ('/', None),
+            'registro': ('/registro/', None),
+            'login': ('/login/', None),
+            'logout': ('/logout/', None),
+            'dashboard': ('/dashboard/', None),
+            'eventos_list': ('/eventos/', None),
+            'evento_detail': (f'/eventos/{evento.pk}/', None),
+            'evento_create': ('/eventos/novo/', None),
+            'evento_edit': (f'/eventos/{evento.pk}/editar/', None),
+            'evento_delete': (f'/eventos/{evento.pk}/excluir/', None),
+            'evento_inscritos': (f'/eventos/{evento.pk}/inscritos/', None),
+            'evento_inscritos_exportar': (f'/eventos/{evento.pk}/inscritos/exportar/', None),
+            'evento_certificados_zip': (f'/eventos/{evento.pk}/certificados.zip', None),
+            'inscricao_create': (f'/inscricoes/criar/{evento.pk}/', None),
+            'inscricao_cancelar': (f'/inscricoes/{self.inscricao.pk}/cancelar/', None),
+            'minhas_inscricoes': ('/minhas-inscricoes/', None),
+            'lista_espera_entrar': (f'/lista-espera/entrar/{self.lotado.pk}/', None),
+            'lista_espera_sair': (f'/lista-espera/{self.espera.pk}/sair/', None),
+            'meus_certificados': ('/certificados/', None),
+            'certificado_download': (f'/certificados/{self.certificado.pk}/download/', None),
+            'certificado_emitir': (f'/certificados/emitir/{self.sem_certificado.pk}/', None),
+            'certificado_validar_form': ('/certificados/validar/', None),
+            'certificado_validar': (f'/certificados/validar/{self.certificado.codigo_verificacao}/', None),
+            'confirmar_email': ('/confirmar-email/token-teste/', None),
+            'auditoria_list': ('/auditoria/', None),
+            'api-login': ('/api/auth/login/', {'username': 'aluno', 'password': 'Senha@123'}),
+            'api-root': ('/api/', None),
+            'api-evento-list': ('/api/eventos/', None),
+            'api-evento-detail': (f'/api/eventos/{evento.pk}/', None),
+            'api-evento-changes': ('/api/eventos/changes/', None),
+            'api-evento-autocompletar': ('/api/eventos/autocompletar/', {'q': 'even'}),
+            'api-inscricao-list': ('/api/inscricoes/', None),
+            'api-inscricao-detail': (f'/api/inscricoes/{self.inscricao.pk}/', None),
+            'api-inscricao-lote': ('/api/inscricoes/lote/', {'eventos': [e.pk for e in self.eventos]}),
+            'api-lista-espera-list': ('/api/lista-espera/', None),
+            'api-lista-espera-detail': (f'/api/lista-espera/{self.espera.pk}/', None),
+        }
+        return caminhos[nome]
+
+    def nomes_de_url(self):
+        from django.urls import URLResolver
+        from . import api_urls, urls
+
+        nomes = set()
+        pendentes = list(urls.urlpatterns) + list(api_urls.urlpatterns)
+        while pendentes:
+            padrao = pendentes.pop()
+            if isinstance(padrao, URLResolver):
+                pendentes.extend(padrao.url_patterns)
+            else:
+                nomes.add(padrao.name)
+        return nomes
+
+    def contar_consultas(self, nome):
+        usuario, metodo, _ = self.ORCAMENTOS[nome]
+        caminho, dados = self.requisicao(nome)
+        cliente = APIClient()
+        if usuario:
+            cliente.force_login(self.usuarios[usuario])
+        with CaptureQueriesContext(connection) as consultas:
+            if metodo == 'post':
+                resposta = cliente.post(caminho, dados, format='json')
+            else:
+                resposta = cliente.get(caminho, dados)
+            if resposta.streaming:
+                b''.join(resposta.streaming_content)
+        self.assertLess(resposta.status_code, 400, nome)
+        return len(consultas), resposta
+
+    def test_todas_as_urls_tem_orcamento(self):
+        self.assertEqual(self.nomes_de_url(), set(self.ORCAMENTOS))
+
+    def test_orcamento_de_consultas_por_url(self):
+        for nome, (_, _, orcamento) in self.ORCAMENTOS.items():
+            with self.subTest(url=nome):
+                total, _ = self.contar_consultas(nome)
+                self.assertLessEqual(total, orcamento)
+
+    @override_settings(ORCAMENTO_CONSULTAS={'SERVER_TIMING': True, 'POR_URL': {'eventos_list': 1}})
+    def test_middleware_server_timing_e_log(self):
+        with self.assertLogs('eventos.consultas', level='WARNING') as logs:
+            resposta = self.client.get('/eventos/')
+        self.assertRegex(resposta['Server-Timing'], r'^db;desc="\d+ consultas";dur=[\d.]+$')
+        self.assertIn('(eventos_list)', logs.output[0])
+
+        with self.assertNoLogs('eventos.consultas', level='WARNING'):
+            resposta = self.client.get('/')
+        self.assertIn('Server-Timing', resposta)
+
+    @override_settings(ORCAMENTO_CONSULTAS={'POR_URL': {'eventos_list': 1}})
+    def test_server_timing_desligado_por_padrao(self):
+        # O orçamento continua valendo, mas o cabeçalho só sai quando ativado
+        with self.assertLogs('eventos.consultas', level='WARNING'):
+            resposta = self.client.get('/eventos/')
+        self.assertNotIn('Server-Timing', resposta)
+
+    def test_listagens_do_admin(self):
+        admin = Usuario.objects.create_superuser('admin', 'admin@sgea.com', 'Senha@123', telefone=self.telefone)
+        self.client.force_login(admin)
+        for modelo in ('evento', 'inscricao', 'certificado', 'auditoria'):
+            with self.subTest(modelo=modelo):
+                with CaptureQueriesContext(connection) as consultas:
+                    resposta = self.client.get(f'/admin/eventos/{modelo}/')
+                self.assertEqual(resposta.status_code, 200)
+                self.assertLessEqual(len(consultas), 7)
+
+
+class DashboardOrganizadorTest(DadosTesteMixin, TestCase):
+    """
+    Testes das estatísticas em cache do dashboard do organizador
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.organizador = self.criar_organizador()
+        self.professor = self.criar_professor()
+        self.eventos = [self.criar_evento(self.organizador, self.professor, nome=f'Evento {i}') for i in range(3)]
+        self.eventos[2].ativo = False
+        self.eventos[2].save()
+        self.alunos = [self.criar_aluno(f'aluno{i}') for i in range(3)]
+        for aluno in self.alunos:
+            Inscricao.reservar(aluno, self.eventos[0])
+        Inscricao.reservar(self.alunos[0], self.eventos[1]).cancelar()
+        inscricao = Inscricao.objects.filter(evento=self.eventos[0]).first()
+        Certificado.objects.create(inscricao=inscricao, emitido_por=self.organizador)
+        # Outro organizador não entra nos totais
+        self.criar_evento(self.criar_organizador('outro'), self.professor)
+        self.client.force_login(self.organizador)
+
+    def get_dashboard(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get('/dashboard/')
+        return resposta, len(consultas)
+
+    def test_totais_e_listas(self):
+        resposta, _ = self.get_dashboard()
+
+        for nome, valor in [('total_eventos', 3), ('eventos_ativos', 2), ('total_inscricoes', 3), ('total_certificados', 1)]:
+            self.assertEqual(resposta.context[nome], valor, nome)
+        self.assertEqual(len(resposta.context['meus_eventos']), 2)
+        self.assertEqual(len(resposta.context['inscricoes_recentes']), 3)
+        self.assertContains(resposta, self.alunos[0].get_full_name())
+
+    def test_estatisticas_em_cache_e_invalidadas_pelos_signals(self):
+        _, primeira = self.get_dashboard()
+        resposta, segunda = self.get_dashboard()
+        self.assertEqual(segunda, primeira - 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Inscricao.reservar(self.alunos[1], self.eventos[1])
+        self.assertEqual(self.get_dashboard()[0].context['total_inscricoes'], 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Inscricao.reservar_em_lote([(self.alunos[2], self.eventos[1])])
+        self.assertEqual(self.get_dashboard()[0].context['total_inscricoes'], 5)
+
+        certificado = Certificado.objects.get()
+        certificado.revogado = True
+        with self.captureOnCommitCallbacks(execute=True):
+            certificado.save()
+        self.assertEqual(self.get_dashboard()[0].context['total_certificados'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.eventos[2].delete()
+        self.assertEqual(self.get_dashboard()[0].context['total_eventos'], 2)
+
+    def consultas_exclusao_evento(self, inscricoes):
+        evento = self.criar_evento(self.organizador, self.professor, nome='Evento excluído')
+        for i in range(inscricoes):
+            inscricao = Inscricao.reservar(self.criar_aluno(f'excluido{inscricoes}-{i}'), evento)
+            Certificado.objects.create(inscricao=inscricao, emitido_por=self.organizador)
+        evento = Evento.objects.get(pk=evento.pk)
+        with CaptureQueriesContext(connection) as consultas:
+            evento.delete()
+        return [consulta['sql'] for consulta in consultas]
+
+    def test_exclusao_de_evento_nao_carrega_o_evento_por_inscricao(self):
+        def leituras_evento(inscricoes):
+            return len([
+                sql for sql in self.consultas_exclusao_evento(inscricoes)
+                if sql.startswith('SELECT') and '"eventos_evento"' in sql
+            ])
+
+        self.assertEqual(leituras_evento(6), leituras_evento(2))
+
+    def test_exclusao_de_evento_sem_consultas_por_inscricao(self):
+        self.assertEqual(len(self.consultas_exclusao_evento(6)), len(self.consultas_exclusao_evento(2)))
+
+
+class EstatisticasVagasTest(DadosTesteMixin, TestCase):
+    """
+    Testes de Evento.objects.with_seat_stats() e da memória das propriedades
+    """
+
+    def setUp(self):
+        self.organizador = self.criar_organizador()
+        self.professor = self.criar_professor()
+        self.evento = self.criar_evento(self.organizador, self.professor, vagas_totais=2)
+        self.passado = self.criar_evento(self.organizador, self.professor)
+        Evento.objects.filter(pk=self.passado.pk).update(
+            data_inicial=date.today() - timedelta(days=3), data_final=date.today() - timedelta(days=2)
+        )
+
+    def test_anotacoes_em_uma_consulta(self):
+        with self.assertNumQueries(1):
+            eventos = {e.pk: e for e in Evento.objects.with_seat_stats()}
+            evento, passado = eventos[self.evento.pk], eventos[self.passado.pk]
+            self.assertEqual(evento.vagas_disponiveis, 2)
+            self.assertFalse(evento.esta_lotado)
+            self.assertFalse(evento.ja_ocorreu)
+            self.assertTrue(passado.ja_ocorreu)
+
+    def test_reserva_e_cancelamento_invalidam_valores(self):
+        evento = Evento.objects.with_seat_stats().get(pk=self.evento.pk)
+        self.assertEqual(evento.vagas_disponiveis, 2)
+
+        Inscricao.reservar(self.criar_aluno('a1'), evento)
+        inscricao = Inscricao.reservar(self.criar_aluno('a2'), evento)
+        self.assertEqual(evento.vagas_disponiveis, 0)
+        self.assertTrue(evento.esta_lotado)
+
+        inscricao.evento = evento
+        inscricao.cancelar()
+        self.assertEqual(evento.vagas_disponiveis, 1)
+
+    def test_save_descarta_anotacoes(self):
+        evento = Evento.objects.with_seat_stats().get(pk=self.evento.pk)
+        self.assertEqual(evento.vagas_disponiveis, 2)
+
+        evento.vagas_totais = 5
+        evento.save()
+        self.assertEqual(evento.vagas_disponiveis, 5)
+        self.assertFalse(hasattr(evento, 'vagas_livres'))
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Plano de consulta no formato do SQLite')
+class IndicesConsultasTest(DadosTesteMixin, TestCase):
+    """
+    As consultas mais frequentes usam um índice (EXPLAIN QUERY PLAN), sem
+    varrer a tabela nem ordenar em memória
+    """
+
+    def plano(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [linha[3] for linha in cursor.fetchall()]
+
+    def assertUsaIndice(self, queryset, indice, ordena=False):
+        plano = self.plano(queryset)
+        self.assertTrue(any(f'USING INDEX {indice}' in passo or f'USING COVERING INDEX {indice}' in passo for passo in plano), plano)
+        self.assertFalse(any(passo.startswith('SCAN') and 'USING' not in passo for passo in plano), plano)
+        if not ordena:
+            self.assertFalse(any('TEMP B-TREE' in passo for passo in plano), plano)
+
+    def test_eventos_ativos_por_data(self):
+        hoje = date.today()
+        self.assertUsaIndice(
+            Evento.objects.with_seat_stats().filter(ativo=True, data_inicial__gte=hoje).order_by('data_inicial')[:6],
+            'evento_ativo_data_idx'
+        )
+        self.assertUsaIndice(
+            Evento.objects.filter(ativo=True, data_inicial__gte=hoje).order_by('data_inicial', 'horario_inicio', 'id')[:10],
+            'evento_ativo_data_idx'
+        )
+        self.assertUsaIndice(
+            Evento.objects.filter(ativo=True).order_by('data_inicial', 'horario_inicio', 'id')[:12],
+            'evento_ativo_data_idx'
+        )
+
+    def test_inscricoes(self):
+        self.assertUsaIndice(
+            Inscricao.objects.filter(evento_id=1, ativa=True).select_related('usuario', 'certificado'),
+            'inscricao_evento_ativa_idx'
+        )
+        self.assertUsaIndice(
+            Inscricao.objects.filter(usuario_id=1, ativa=True).order_by('-data_inscricao', '-id')[:10],
+            'inscricao_usuario_data_idx'
+        )
+        self.assertUsaIndice(Inscricao.objects.filter(usuario_id=1), 'inscricao_usuario_data_idx')
+        self.assertUsaIndice(
+            Inscricao.objects.filter(usuario_id=1, evento_id=1, ativa=True),
+            'eventos_inscricao_usuario_id_evento_id'
+        )
+
+    def test_token_confirmacao_e_codigo_certificado(self):
+        self.assertUsaIndice(
+            Usuario.objects.filter(token_confirmacao='token'), 'usuario_token_pendente_idx', ordena=True
+        )
+        self.assertUsaIndice(
+            Certificado.objects.filter(codigo_verificacao='SGEA-1-X'), 'sqlite_autoindex_eventos_certificado'
+        )
+
+
+class VerificacaoPlanosTest(DadosTesteMixin, TestCase):
+    """
+    Nenhuma consulta registrada em planos_consulta lê uma tabela inteira
+    """
+
+    def setUp(self):
+        cache.clear()
+        organizador = self.criar_organizador()
+        self.aluno = self.criar_aluno()
+        self.evento = self.criar_evento(organizador, self.criar_professor())
+        inscricao = Inscricao.reservar(self.aluno, self.evento)
+        Certificado.objects.create(inscricao=inscricao, emitido_por=organizador)
+        Auditoria.objects.create(usuario=organizador, acao='INSCRICAO', descricao='Login')
+
+    def test_consultas_registradas_sem_varredura(self):
+        # Limite zero: qualquer leitura completa conta, mesmo em tabelas pequenas
+        resultados = verificar_planos(limite_linhas=0)
+
+        self.assertEqual([r['nome'] for r in resultados], list(CONSULTAS))
+        for resultado in resultados:
+            with self.subTest(resultado['nome']):
+                self.assertFalse(resultado['ignorada'])
+                self.assertEqual(resultado['status'], 200)
+                self.assertGreater(resultado['consultas'], 0)
+                self.assertEqual(
+                    resultado['regressoes'], [],
+                    [(r['tabela'], r['sql'], r['plano']) for r in resultado['regressoes']]
+                )
+
+    def test_requisicoes_desfeitas(self):
+        sessoes = Session.objects.count()
+        auditorias = Auditoria.objects.count()
+
+        verificar_planos(['dashboard_organizador', 'api_eventos', 'certificado_validacao'])
+
+        self.assertEqual(Session.objects.count(), sessoes)
+        self.assertEqual(Auditoria.objects.count(), auditorias)
+
+    def test_filtro_de_auditoria_por_data(self):
+        antiga = Auditoria.objects.create(acao='INSCRICAO', descricao='Login antigo')
+        Auditoria.objects.filter(pk=antiga.pk).update(data_hora=timezone.now() - timedelta(days=2))
+        self.client.force_login(Usuario.objects.get(username='organizador'))
+
+        resposta = self.client.get('/auditoria/', {'data': timezone.localdate().isoformat()})
+        descricoes = [a.descricao for a in resposta.context['page_obj']]
+        self.assertIn('Login', descricoes)
+        self.assertNotIn('Login antigo', descricoes)
+
+        resposta = self.client.get('/auditoria/', {'data': 'ontem'})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(len(resposta.context['page_obj']), Auditoria.objects.count())
+
+    def test_detecta_varredura(self):
+        sql, params = Evento.objects.filter(descricao='x').order_by().query.sql_with_params()
+        plano, tabelas = explicar(sql, params)
+
+        if connection.vendor in ('sqlite', 'postgresql'):
+            self.assertEqual(tabelas, ['eventos_evento'])
+        self.assertEqual(explicar(*Evento.objects.filter(pk=1).query.sql_with_params())[1], [])
+
+    def test_limite_de_linhas_e_leituras_aceitas(self):
+        with mock.patch('eventos.planos_consulta.explicar', return_value=([], ['eventos_inscricao'])):
+            self.assertEqual(verificar_planos(['home'], limite_linhas=2)[0]['regressoes'], [])
+            regressoes = verificar_planos(['home'], limite_linhas=1)[0]['regressoes']
+
+        self.assertTrue(regressoes)
+        self.assertEqual({r['tabela'] for r in regressoes}, {'eventos_inscricao'})
+        self.assertEqual(regressoes[0]['linhas'], 1)
+
+        # A home conta eventos_evento por completo de propósito (totais), mas
+        # só o COUNT dessa tabela fica de fora
+        with mock.patch('eventos.planos_consulta.explicar', return_value=([], ['eventos_evento'])):
+            regressoes = verificar_planos(['home'], limite_linhas=0)[0]['regressoes']
+        self.assertTrue(regressoes)
+        self.assertFalse(any(
+            r['sql'].startswith('SELECT COUNT(*) AS "__count" FROM "eventos_evento"') for r in regressoes
+        ))
+
+    @skipUnless(connection.vendor == 'sqlite', 'Planos do SQLite')
+    def test_sem_indice_dos_eventos_ativos_a_listagem_falha(self):
+        self.assertEqual(verificar_planos(['eventos_lista'], limite_linhas=0)[0]['regressoes'], [])
+
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX evento_ativo_data_idx')
+        regressoes = verificar_planos(['eventos_lista'], limite_linhas=0)[0]['regressoes']
+
+        # A contagem da paginação só é aceita percorrendo um índice, e a
+        # exceção dela não cobre o SELECT da página
+        self.assertEqual({r['tabela'] for r in regressoes}, {'eventos_evento'})
+        self.assertTrue(any(r['sql'].startswith('SELECT COUNT(*)') for r in regressoes))
+        self.assertTrue(any(not r['sql'].startswith('SELECT COUNT(*)') for r in regressoes))
+
+    def test_comando_falha_com_regressao(self):
+        saida = StringIO()
+        call_command('verificar_planos', '--limite-linhas', '0', stdout=saida)
+        self.assertIn('certificado_validacao', saida.getvalue())
+
+        with mock.patch('eventos.planos_consulta.explicar', return_value=(['SCAN eventos_inscricao'], ['eventos_inscricao'])):
+            with self.assertRaises(CommandError):
+                call_command('verificar_planos', '--consulta', 'home', '--limite-linhas', '0', stdout=StringIO())
+
+
+class GerarDadosSinteticosTest(TestCase):
+    """
+    Comando gerar_dados_sinteticos
+    """
+    opcoes = {
+        'usuarios': 300, 'eventos': 30, 'inscricoes': 1200, 'auditorias': 400,
+        'lote': 100, 'data_referencia': '2026-03-10', 'stdout': StringIO(),
+    }
+
+    def gerar(self, **opcoes):
+        call_command('gerar_dados_sinteticos', **{**self.opcoes, **opcoes})
+
+    def retrato(self):
+        return (
+            list(Usuario.objects.order_by('pk').values_list('pk', 'username', 'perfil', 'data_cadastro')),
+            list(Evento.objects.order_by('pk').values_list('pk', 'nome', 'data_inicial', 'vagas_totais', 'organizador_id')),
+            list(Inscricao.objects.order_by('pk').values_list('pk', 'usuario_id', 'evento_id', 'data_inscricao', 'ativa')),
+            list(Certificado.objects.order_by('pk').values_list('pk', 'inscricao_id', 'codigo_verificacao')),
+            list(Auditoria.objects.order_by('pk').values_list('pk', 'usuario_id', 'acao', 'data_hora')),
+        )
+
+    def test_volumes_e_consistencia(self):
+        self.gerar()
+
+        self.assertEqual(Usuario.objects.count(), 300)
+        self.assertEqual(Evento.objects.count(), 30)
+        self.assertAlmostEqual(Inscricao.objects.count(), 1200, delta=30)
+        # Sem signals: nenhuma auditoria ou email além dos gerados
+        self.assertEqual(Auditoria.objects.count(), 400)
+        self.assertFalse(EmailPendente.objects.exists())
+
+        for evento in Evento.objects.annotate(ativas=Count('inscricoes', filter=Q(inscricoes__ativa=True))):
+            self.assertEqual(evento.inscritos_ativos, evento.ativas)
+            self.assertLessEqual(evento.inscritos_ativos, evento.vagas_totais)
+            self.assertEqual(evento.organizador.perfil, 'ORGANIZADOR')
+            self.assertLess(evento.data_criacao.date(), evento.data_inicial)
+        self.assertFalse(Inscricao.objects.filter(usuario__perfil='ORGANIZADOR').exists())
+        self.assertFalse(Certificado.objects.filter(
+            Q(inscricao__ativa=False) | Q(inscricao__evento__data_final__gte=date(2026, 3, 10))
+        ).exists())
+        certificado = Certificado.objects.first()
+        self.assertEqual(Certificado.buscar_por_codigo(certificado.codigo_verificacao), certificado)
+
+        # As sequências continuam depois dos ids gerados
+        self.assertGreater(self.criar_usuario().pk, Usuario.objects.exclude(username='novo').aggregate(m=Max('pk'))['m'])
+
+    def criar_usuario(self):
+        return Usuario.objects.create_user(
+            username='novo', email='novo@sgea.com', password='Senha@123',
+            perfil='ORGANIZADOR', telefone='(11) 91234-5678'
+        )
+
+    def test_mesma_semente_gera_os_mesmos_dados(self):
+        with transaction.atomic():
+            self.gerar()
+            primeiro = self.retrato()
+            transaction.set_rollback(True)
+
+        self.gerar()
+        self.assertEqual(self.retrato(), primeiro)
+
+        self.gerar(semente=7)
+        self.assertNotEqual(self.retrato()[2][len(primeiro[2]):], primeiro[2])
+
+    def test_distribuicao_invalida(self):
+        with self.assertRaises(CommandError):
+            self.gerar(perfis='ALUNO=90,VISITANTE=10')
+        with self.assertRaises(CommandError):
+            self.gerar(acoes='INSCRICAO')
+        self.assertFalse(Usuario.objects.exists())
+
+
+class BenchmarkHTTPTest(DadosTesteMixin, TestCase):
+    """
+    Testes dos cenários de carga do comando benchmark_http
+    """
+
+    def setUp(self):
+        cache.clear()
+        organizador = self.criar_organizador()
+        professor = self.criar_professor()
+        self.alunos = [self.criar_aluno(f'aluno{i}') for i in range(6)]
+        self.evento = self.criar_evento(organizador, professor, nome='Semana de Python')
+        inscricao = Inscricao.reservar(self.alunos[0], self.evento)
+        Certificado.objects.create(inscricao=inscricao, emitido_por=organizador)
+
+    def retrato(self):
+        return (
+            Inscricao.objects.count(),
+            Auditoria.objects.count(),
+            EmailPendente.objects.count(),
+            Session.objects.count(),
+            Evento.objects.get(pk=self.evento.pk).inscritos_ativos,
+        )
+
+    def test_cenarios_medem_e_desfazem_o_que_gravam(self):
+        antes = self.retrato()
+
+        for nome in CENARIOS:
+            with self.subTest(nome):
+                resultado = executar_cenario(nome, usuarios=3, aquecimento=1)
+
+                self.assertFalse(resultado['ignorado'])
+                self.assertGreater(resultado['requisicoes'], 0)
+                self.assertEqual(sum(resultado['status'].values()), resultado['requisicoes'])
+                self.assertFalse([s for s in resultado['status'] if s.startswith('5')])
+                self.assertLessEqual(resultado['latencia_ms']['p50'], resultado['latencia_ms']['p99'])
+                self.assertGreater(resultado['consultas']['max'], 0)
+                self.assertEqual(
+                    sum(url['requisicoes'] for url in resultado['por_url'].values()),
+                    resultado['requisicoes']
+                )
+                self.assertEqual(self.retrato(), antes)
+
+        resultado = executar_cenario('abertura_inscricoes', usuarios=3, aquecimento=0)
+        self.assertEqual(resultado['por_url']['inscricao_create']['status'], {'302': 3})
+
+    def test_preserva_o_que_outros_processos_gravam_durante_a_execucao(self):
+        from .benchmark import Execucao
+        executar = Execucao.executar
+        aluno = self.alunos[5]
+
+        def executar_com_outro_processo(execucao, roteiros):
+            # Gravações sem signals neste processo, como as de outro servidor
+            if not Inscricao.objects.filter(usuario=aluno).exists():
+                Inscricao.objects.bulk_create([Inscricao(usuario=aluno, evento=self.evento)])
+                Evento.ajustar_inscritos(self.evento.pk, 1)
+                Auditoria.objects.bulk_create([Auditoria(acao='INSCRICAO', descricao='Requisição real')])
+            return executar(execucao, roteiros)
+
+        with mock.patch.object(Execucao, 'executar', executar_com_outro_processo):
+            resultado = executar_cenario('abertura_inscricoes', usuarios=3, aquecimento=0)
+
+        self.assertEqual(resultado['por_url']['inscricao_create']['status'], {'302': 3})
+        self.assertEqual(
+            list(Inscricao.objects.filter(evento=self.evento).order_by('pk').values_list('usuario', flat=True)),
+            [self.alunos[0].pk, aluno.pk]
+        )
+        self.assertEqual(Evento.objects.get(pk=self.evento.pk).inscritos_ativos, 2)
+        self.assertTrue(Auditoria.objects.filter(descricao='Requisição real').exists())
+
+    def test_roteiros_reproduziveis(self):
+        def roteiro():
+            resultado = executar_cenario('navegacao_catalogo', usuarios=4, aquecimento=0)
+            return {url: dados['requisicoes'] for url, dados in resultado['por_url'].items()}
+
+        self.assertEqual(roteiro(), roteiro())
+
+    def test_cenario_sem_dados_ignorado(self):
+        Certificado.objects.all().delete()
+        self.assertEqual(executar_cenario('validacao_certificados', usuarios=2), {'ignorado': True})
+
+    def test_percentis(self):
+        self.assertEqual(percentis([]), {'p50': None, 'p95': None, 'p99': None})
+        self.assertEqual(percentis([7]), {'p50': 7, 'p95': 7, 'p99': 7})
+        self.assertEqual(percentis(list(range(1, 102)))['p50'], 51)
+
+    def test_comando_grava_json_e_compara(self):
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta)
+        anterior = os.path.join(pasta, 'anterior.json')
+        atual = os.path.join(pasta, 'atual.json')
+        opcoes = {'cenario': ['validacao_certificados'], 'usuarios': 2, 'aquecimento': 0}
+
+        call_command('benchmark_http', saida=anterior, stdout=StringIO(), **opcoes)
+        saida = StringIO()
+        call_command('benchmark_http', saida=atual, comparar=anterior, stdout=saida, **opcoes)
+
+        with open(atual, encoding='utf-8') as arquivo:
+            relatorio = json.load(arquivo)
+        self.assertEqual(relatorio['parametros']['usuarios'], 2)
+        self.assertEqual(relatorio['dados']['certificado'], 1)
+        cenario = relatorio['cenarios']['validacao_certificados']
+        self.assertEqual(cenario['requisicoes'], 20)
+        self.assertIn('p95', cenario['latencia_ms'])
+        self.assertIn('vazao_rps', cenario)
+        self.assertIn('validacao_certificados: p50', saida.getvalue())
+
+        with open(anterior, encoding='utf-8') as arquivo:
+            self.assertEqual(len(comparar(relatorio, json.load(arquivo))), 2)
 
-# Testes serão implementados conforme necessidade
+        with self.assertRaises(CommandError):
+            call_command('benchmark_http', comparar=os.path.join(pasta, 'nao-existe.json'), stdout=StringIO())
@@ -16,3 +16,19 @@ class InscricoesCreateThrottle(UserRateThrottle):
     Throttle para inscrições: 50 requisições por dia
     """
     rate = '50/day'
+
+
+class EventosChangesThrottle(UserRateThrottle):
+    """
+    Throttle para a sincronização incremental de eventos, com contagem
+    separada da listagem (taxa 'eventos_changes' em settings)
+    """
+    scope = 'eventos_changes'
+
+
+class EventosAutocompletarThrottle(UserRateThrottle):
+    """
+    Throttle do autocompletar (uma requisição por tecla), por usuário ou IP
+    (taxa 'eventos_autocompletar' em settings)
+    """
+    scope = 'eventos_autocompletar'
@@ -23,6 +23,8 @@ urlpatterns = [
     path('eventos/<int:pk>/editar/', views.evento_edit, name='evento_edit'),
     path('eventos/<int:pk>/excluir/', views.evento_delete, name='evento_delete'),
     path('eventos/<int:pk>/inscritos/', views.evento_inscritos, name='evento_inscritos'),
+    path('eventos/<int:pk>/inscritos/exportar/', views.evento_inscritos_exportar, name='evento_inscritos_exportar'),
+    path('eventos/<int:pk>/certificados.zip', views.evento_certificados_zip, name='evento_certificados_zip'),
     
     
     # Inscrições
@@ -30,6 +32,10 @@ urlpatterns = [
     path('inscricoes/<int:pk>/cancelar/', views.inscricao_cancelar, name='inscricao_cancelar'),
     path('minhas-inscricoes/', views.minhas_inscricoes, name='minhas_inscricoes'),
     
+    # Lista de espera
+    path('lista-espera/entrar/<int:evento_pk>/', views.lista_espera_entrar, name='lista_espera_entrar'),
+    path('lista-espera/<int:pk>/sair/', views.lista_espera_sair, name='lista_espera_sair'),
+    
     # Certificados
     path('certificados/', views.meus_certificados, name='meus_certificados'),
     path('certificados/<int:pk>/download/', views.certificado_download, name='certificado_download'),
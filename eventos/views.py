@@ -1,18 +1,141 @@
 """
 Views para o Sistema de Gestão de Eventos Acadêmicos (SGEA)
 """
+import csv
+import hashlib
+import json
+from datetime import date, datetime, time, timedelta
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Count
-from django.http import HttpResponse
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+from django.conf import settings
+from django.core.cache import cache
+from django.http import FileResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
 from django.utils import timezone
+from django.utils.safestring import mark_safe
+from django.views.decorators.http import condition
 from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
-from django.template.loader import render_to_string
-from .models import Usuario, Evento, Inscricao, Certificado, Auditoria
+from .models import Usuario, Evento, EventoExcluido, Inscricao, ListaEspera, Certificado, Auditoria
 from .forms import UsuarioRegistroForm, EventoForm, LoginForm
+from .busca import buscar_eventos
+from .certificados import certificados_do_evento, obter_pdf_certificado, zip_certificados
+
+EVENTOS_POR_PAGINA = 12
+
+# Itens listados no dashboard do organizador
+DASHBOARD_EVENTOS = 10
+DASHBOARD_INSCRICOES_RECENTES = 5
+
+# Tempo (segundos) dos resultados de validação de certificado no cache
+CERTIFICADO_VALIDACAO_CACHE_PADRAO = {
+    'TTL': 60 * 60,
+    'TTL_NEGATIVO': 60,
+}
+
+
+# ============================================
+# GET CONDICIONAL (ETag / Last-Modified)
+# ============================================
+
+def _cache_condicional_permitido(request):
+    """
+    Mensagens pendentes precisam aparecer na página, então não há 304
+    """
+    return not len(messages.get_messages(request))
+
+
+def _hash_etag(*partes):
+    return hashlib.sha1('|'.join(str(parte) for parte in partes).encode('utf-8')).hexdigest()
+
+
+def _inicio_do_dia():
+    """
+    Campos como "já ocorreu" mudam à meia-noite sem alteração no banco
+    """
+    return timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+
+
+def eventos_list_etag(request):
+    """
+    ETag da lista de eventos: muda quando qualquer evento é criado, alterado
+    ou tem inscrições alteradas (data_atualizacao mais recente) ou excluído
+    (último tombstone). Os dois valores saem de índices, sem percorrer a
+    tabela de eventos.
+    """
+    if not _cache_condicional_permitido(request):
+        return None
+    
+    versao = Evento.objects.order_by('-data_atualizacao', '-id').annotate(
+        exclusao=Subquery(EventoExcluido.objects.order_by('-data_exclusao', '-id').values('id')[:1])
+    ).values_list('data_atualizacao', 'exclusao').first()
+    return _hash_etag(
+        *(versao or (None, None)), request.get_full_path(),
+        request.user.pk, timezone.localdate()
+    )
+
+
+def _versao_evento_detail(request, pk):
+    """
+    Dados que determinam a página do evento para o usuário, obtidos em uma
+    única consulta e guardados na requisição (usados pelo ETag e pelo
+    Last-Modified)
+    """
+    if not hasattr(request, '_versao_evento'):
+        eventos = Evento.objects.filter(pk=pk, ativo=True)
+        campos = ['data_atualizacao']
+        
+        if request.user.is_authenticated:
+            eventos = eventos.annotate(
+                inscricao_ativa=Subquery(
+                    Inscricao.objects.filter(
+                        usuario=request.user, evento=OuterRef('pk'), ativa=True
+                    ).values('pk')[:1]
+                ),
+                espera=Subquery(
+                    ListaEspera.objects.filter(
+                        usuario=request.user, evento=OuterRef('pk'), status='AGUARDANDO'
+                    ).values('pk')[:1]
+                ),
+                certificado=Exists(
+                    Certificado.objects.filter(
+                        inscricao__usuario=request.user, inscricao__evento=OuterRef('pk')
+                    )
+                ),
+            )
+            campos += ['inscricao_ativa', 'espera', 'certificado']
+        
+        request._versao_evento = eventos.values_list(*campos).first()
+    return request._versao_evento
+
+
+def evento_detail_etag(request, pk):
+    if not _cache_condicional_permitido(request):
+        return None
+    
+    versao = _versao_evento_detail(request, pk)
+    if versao is None:
+        return None
+    return _hash_etag(pk, *versao, request.user.pk, timezone.localdate())
+
+
+def evento_detail_last_modified(request, pk):
+    """
+    Apenas para visitantes anônimos; para usuários logados o estado da
+    inscrição e da lista de espera não tem data própria, então vale só o ETag
+    """
+    if request.user.is_authenticated or not _cache_condicional_permitido(request):
+        return None
+    
+    versao = _versao_evento_detail(request, pk)
+    if versao is None:
+        return None
+    return max(versao[0], _inicio_do_dia())
 
 
 # ============================================
@@ -23,7 +146,7 @@ def home(request):
     """
     Página inicial do sistema
     """
-    eventos_proximos = Evento.objects.filter(
+    eventos_proximos = Evento.objects.with_seat_stats().filter(
         ativo=True,
         data_inicial__gte=timezone.now().date()
     ).order_by('data_inicial')[:6]
@@ -47,7 +170,9 @@ def registro(request):
         form = UsuarioRegistroForm(request.POST)
         if form.is_valid():
             try:
-                usuario = form.save()
+                # Usuário, auditoria e email de boas-vindas na mesma transação
+                with transaction.atomic():
+                    usuario = form.save()
                 messages.success(
                     request, 
                     'Cadastro realizado com sucesso! Faça login para continuar.'
@@ -126,18 +251,18 @@ def dashboard(request):
     }
     
     if user.perfil == 'ORGANIZADOR':
-        # Dashboard para organizadores
-        eventos = Evento.objects.filter(organizador=user, ativo=True)
+        # Dashboard para organizadores: totais em cache (uma agregação) e
+        # listas limitadas, então o custo não cresce com o número de eventos
+        context.update(Evento.estatisticas_organizador(user.pk))
         context.update({
-            'eventos_organizados': eventos,
-            'total_eventos': eventos.count(),
-            'total_inscritos': Inscricao.objects.filter(
+            'meus_eventos': Evento.objects.with_seat_stats().filter(
+                organizador=user,
+                ativo=True
+            ).order_by('-data_inicial', 'id')[:DASHBOARD_EVENTOS],
+            'inscricoes_recentes': Inscricao.objects.filter(
                 evento__organizador=user,
                 ativa=True
-            ).count(),
-            'certificados_emitidos': Certificado.objects.filter(
-                emitido_por=user
-            ).count(),
+            ).select_related('usuario', 'evento').order_by('-data_inscricao')[:DASHBOARD_INSCRICOES_RECENTES],
         })
         return render(request, 'eventos/dashboard_organizador.html', context)
     
@@ -162,23 +287,22 @@ def dashboard(request):
 # VIEWS DE EVENTOS
 # ============================================
 
+@condition(etag_func=eventos_list_etag)
 def eventos_list(request):
     """
-    Lista de eventos disponíveis
+    Lista de eventos disponíveis, paginada (EVENTOS_POR_PAGINA por página).
+    
+    A disponibilidade de vagas vem do contador inscritos_ativos, então a
+    página custa o mesmo número de consultas qualquer que seja o catálogo.
     """
-    eventos = Evento.objects.filter(
+    eventos = Evento.objects.with_seat_stats().filter(
         ativo=True
-    ).annotate(
-        total_inscritos=Count('inscricoes', filter=Q(inscricoes__ativa=True))
-    ).order_by('data_inicial')
+    ).order_by('data_inicial', 'horario_inicio', 'id')
     
-    # Filtro de pesquisa
+    # Filtro de pesquisa (índice de busca textual, ordenado por relevância)
     search = request.GET.get('search')
     if search:
-        eventos = eventos.filter(
-            Q(nome__icontains=search) | 
-            Q(descricao__icontains=search)
-        )
+        eventos = buscar_eventos(eventos, search)
     
     # Filtro de tipo
     tipo = request.GET.get('tipo')
@@ -192,21 +316,32 @@ def eventos_list(request):
     elif status == 'encerrado':
         eventos = eventos.filter(data_inicial__lt=timezone.now().date())
     
+    # Paginação (os links preservam os filtros)
+    paginator = Paginator(eventos, EVENTOS_POR_PAGINA)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    filtros = request.GET.copy()
+    filtros.pop('page', None)
+    
     context = {
-        'eventos': eventos,
+        'eventos': page_obj,
+        'page_obj': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
+        'filtros': filtros.urlencode(),
     }
     return render(request, 'eventos/eventos_list.html', context)
 
 
+@condition(etag_func=evento_detail_etag, last_modified_func=evento_detail_last_modified)
 def evento_detail(request, pk):
     """
     Detalhes de um evento específico
     """
-    evento = get_object_or_404(Evento, pk=pk, ativo=True)
+    evento = get_object_or_404(Evento.objects.with_seat_stats(), pk=pk, ativo=True)
     
     inscrito = False
     tem_certificado = False
     inscricao = None
+    entrada_espera = None
     
     if request.user.is_authenticated:
         inscricao = Inscricao.objects.filter(
@@ -222,12 +357,20 @@ def evento_detail(request, pk):
                 inscricao__usuario=request.user,
                 inscricao__evento=evento
             ).exists()
+        elif evento.esta_lotado:
+            entrada_espera = ListaEspera.objects.filter(
+                usuario=request.user,
+                evento=evento,
+                status='AGUARDANDO'
+            ).first()
     
     context = {
         'evento': evento,
         'inscrito': inscrito,
+        'ja_inscrito': inscrito,
         'inscricao': inscricao,
         'tem_certificado': tem_certificado,
+        'entrada_espera': entrada_espera,
     }
     return render(request, 'eventos/evento_detail.html', context)
 
@@ -330,7 +473,7 @@ def evento_delete(request, pk):
         return redirect('evento_detail', pk=pk)
     
     # Verifica se há inscrições ativas
-    inscricoes_ativas = Inscricao.objects.filter(evento=evento, ativa=True).count()
+    inscricoes_ativas = evento.inscritos_ativos
     
     if request.method == 'POST':
         nome_evento = evento.nome
@@ -356,34 +499,17 @@ def inscricao_create(request, evento_pk):
     """
     Inscrição em evento
     """
-    evento = get_object_or_404(Evento, pk=evento_pk, ativo=True)
-    
-    # Verifica se já está inscrito
-    inscricao_existente = Inscricao.objects.filter(
-        usuario=request.user,
-        evento=evento,
-        ativa=True
-    ).first()
-    
-    if inscricao_existente:
-        messages.warning(
-            request, 
-            'Você já está inscrito neste evento.'
-        )
-        return redirect('evento_detail', pk=evento_pk)
-    
-    # Cria nova inscrição
-    inscricao = Inscricao(usuario=request.user, evento=evento)
+    evento = get_object_or_404(Evento.objects.with_seat_stats(), pk=evento_pk, ativo=True)
     
+    # Reserva atômica: verificação de vaga e inserção no mesmo UPDATE condicional
     try:
-        inscricao.full_clean()
-        inscricao.save()
+        Inscricao.reservar(request.user, evento)
         messages.success(
             request, 
             f'Inscrição realizada com sucesso no evento "{evento.nome}"!'
         )
     except ValidationError as e:
-        messages.error(request, str(e))
+        messages.error(request, ' '.join(e.messages))
     
     return redirect('evento_detail', pk=evento_pk)
 
@@ -413,6 +539,55 @@ def inscricao_cancelar(request, pk):
     })
 
 
+@login_required
+def lista_espera_entrar(request, evento_pk):
+    """
+    Entrada na lista de espera de um evento lotado
+    """
+    evento = get_object_or_404(Evento, pk=evento_pk, ativo=True)
+    
+    if request.method == 'POST':
+        try:
+            entrada = ListaEspera.entrar(request.user, evento)
+            if entrada.status == 'PROMOVIDO':
+                messages.success(
+                    request, 
+                    f'Uma vaga estava disponível: inscrição realizada no evento "{evento.nome}"!'
+                )
+            else:
+                messages.success(
+                    request, 
+                    f'Você entrou na lista de espera (posição {entrada.posicao}). '
+                    'Avisaremos por email quando uma vaga for liberada.'
+                )
+        except ValidationError as e:
+            messages.error(request, ' '.join(e.messages))
+    
+    return redirect('evento_detail', pk=evento_pk)
+
+
+@login_required
+def lista_espera_sair(request, pk):
+    """
+    Saída da lista de espera
+    """
+    entrada = get_object_or_404(
+        ListaEspera, 
+        pk=pk, 
+        usuario=request.user,
+        status='AGUARDANDO'
+    )
+    
+    if request.method == 'POST':
+        entrada.desistir()
+        messages.success(
+            request, 
+            'Você saiu da lista de espera.'
+        )
+    
+    return redirect('evento_detail', pk=entrada.evento_id)
+
+
 @login_required
 def minhas_inscricoes(request):
     """
@@ -478,7 +653,7 @@ def evento_inscritos(request, pk):
     """
     Lista de inscritos em um evento (apenas organizador)
     """
-    evento = get_object_or_404(Evento, pk=pk)
+    evento = get_object_or_404(Evento.objects.with_seat_stats(), pk=pk)
     
     if evento.organizador != request.user:
         messages.error(
@@ -487,17 +662,129 @@ def evento_inscritos(request, pk):
         )
         return redirect('dashboard')
     
-    inscricoes = Inscricao.objects.filter(
+    inscricoes = list(Inscricao.objects.filter(
         evento=evento,
         ativa=True
-    ).select_related('usuario').prefetch_related('certificado')
+    ).select_related('usuario', 'certificado'))
     
     return render(request, 'eventos/evento_inscritos.html', {
         'evento': evento,
         'inscricoes': inscricoes,
+        'certificados_emitidos': sum(hasattr(inscricao, 'certificado') for inscricao in inscricoes),
     })
 
 
+# Colunas da exportação de participantes (cabeçalho, campo de values_list)
+COLUNAS_EXPORTACAO_INSCRITOS = [
+    ('inscricao_id', 'pk'),
+    ('nome', 'usuario__first_name'),
+    ('sobrenome', 'usuario__last_name'),
+    ('usuario', 'usuario__username'),
+    ('email', 'usuario__email'),
+    ('instituicao', 'usuario__instituicao'),
+    ('perfil', 'usuario__perfil'),
+    ('data_inscricao', 'data_inscricao'),
+    ('codigo_certificado', 'certificado__codigo_verificacao'),
+]
+
+
+class _Eco:
+    """
+    Pseudo-arquivo para o csv.writer: devolve a linha em vez de guardá-la
+    """
+    def write(self, valor):
+        return valor
+
+
+def _linhas_inscritos(evento):
+    """
+    Tuplas dos participantes ativos lidas do cursor em blocos, sem
+    instanciar models nem carregar o resultado inteiro na memória
+    """
+    campos = [campo for _, campo in COLUNAS_EXPORTACAO_INSCRITOS]
+    inscricoes = Inscricao.objects.filter(
+        evento=evento,
+        ativa=True
+    ).order_by('pk').values_list(*campos)
+    
+    for linha in inscricoes.iterator(chunk_size=2000):
+        yield [
+            timezone.localtime(valor).isoformat() if isinstance(valor, datetime) else valor
+            for valor in linha
+        ]
+
+
+def _exportar_csv(evento):
+    escritor = csv.writer(_Eco())
+    # BOM para o Excel reconhecer UTF-8; o cabeçalho sai antes da consulta
+    yield '\ufeff' + escritor.writerow([nome for nome, _ in COLUNAS_EXPORTACAO_INSCRITOS])
+    for linha in _linhas_inscritos(evento):
+        yield escritor.writerow(linha)
+
+
+def _exportar_ndjson(evento):
+    nomes = [nome for nome, _ in COLUNAS_EXPORTACAO_INSCRITOS]
+    for linha in _linhas_inscritos(evento):
+        yield json.dumps(dict(zip(nomes, linha)), ensure_ascii=False) + '\n'
+
+
+@login_required
+def evento_inscritos_exportar(request, pk):
+    """
+    Exportação dos participantes em CSV ou NDJSON (apenas organizador),
+    enviada em partes enquanto o banco é lido
+    """
+    evento = get_object_or_404(Evento, pk=pk)
+    
+    if evento.organizador != request.user:
+        messages.error(
+            request, 
+            'Você não tem permissão para exportar os inscritos deste evento.'
+        )
+        return redirect('dashboard')
+    
+    formato = request.GET.get('formato', 'csv')
+    if formato == 'ndjson':
+        conteudo, content_type = _exportar_ndjson(evento), 'application/x-ndjson; charset=utf-8'
+    else:
+        formato = 'csv'
+        conteudo, content_type = _exportar_csv(evento), 'text/csv; charset=utf-8'
+    
+    response = StreamingHttpResponse(conteudo, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="inscritos-evento-{evento.pk}.{formato}"'
+    return response
+
+
+@login_required
+def evento_certificados_zip(request, pk):
+    """
+    Download de todos os certificados do evento em um ZIP (apenas organizador)
+    """
+    evento = get_object_or_404(Evento, pk=pk)
+    
+    if evento.organizador != request.user:
+        messages.error(
+            request, 
+            'Você não tem permissão para baixar os certificados deste evento.'
+        )
+        return redirect('dashboard')
+    
+    if not Certificado.objects.filter(inscricao__evento=evento, revogado=False).exists():
+        messages.warning(
+            request, 
+            'Nenhum certificado foi emitido para este evento.'
+        )
+        return redirect('evento_inscritos', pk=evento.pk)
+    
+    # O ZIP é montado e enviado em partes enquanto os PDFs são lidos
+    response = StreamingHttpResponse(
+        (parte for parte in zip_certificados(certificados_do_evento(evento)) if parte),
+        content_type='application/zip'
+    )
+    response['Content-Disposition'] = f'attachment; filename="certificados-evento-{evento.pk}.zip"'
+    return response
+
+
 def certificado_validar(request, codigo=None):
     """Validação de certificado por código"""
     
@@ -509,9 +796,29 @@ def certificado_validar(request, codigo=None):
     if not codigo:
         return render(request, 'eventos/certificado_validar.html')
     
-    try:
-        certificado = Certificado.objects.get(codigo_verificacao=codigo)
-        
+    # O HTML fica em cache para todas as grafias do mesmo código, então
+    # exibe a forma normalizada e não o que o primeiro visitante digitou
+    codigo = Certificado.normalizar_codigo(codigo)
+    chave = Certificado.chave_cache_validacao(codigo)
+    resultado = cache.get(chave)
+    
+    if resultado is None:
+        # Códigos com assinatura inválida são recusados sem consultar o banco
+        certificado = Certificado.buscar_por_codigo(codigo)
+        valido = certificado is not None
+        resultado = {
+            'valido': valido,
+            'html': render_to_string('eventos/certificado_validacao_resultado.html', {
+                'certificado': certificado,
+                'valido': valido,
+                'codigo': codigo
+            }),
+        }
+        # Códigos inválidos ficam pouco tempo, só para absorver varreduras
+        config = {**CERTIFICADO_VALIDACAO_CACHE_PADRAO, **getattr(settings, 'CERTIFICADO_VALIDACAO_CACHE', {})}
+        cache.set(chave, resultado, config['TTL'] if valido else config['TTL_NEGATIVO'])
+    
+    if resultado['valido']:
         # Registra auditoria
         Auditoria.registrar(
             usuario=request.user if request.user.is_authenticated else None,
@@ -522,16 +829,11 @@ def certificado_validar(request, codigo=None):
                 'valido': True
             }
         )
-        
-        return render(request, 'eventos/certificado_validacao.html', {
-            'certificado': certificado,
-            'valido': True
-        })
-    except Certificado.DoesNotExist:
-        return render(request, 'eventos/certificado_validacao.html', {
-            'valido': False,
-            'codigo': codigo
-        })
+    
+    return render(request, 'eventos/certificado_validacao.html', {
+        'valido': resultado['valido'],
+        'resultado': mark_safe(resultado['html'])
+    })
 
 
 def confirmar_email(request, token):
@@ -570,12 +872,21 @@ def auditoria_list(request):
         return redirect('dashboard')
     
     # Filtros
-    auditorias = Auditoria.objects.all()
+    auditorias = Auditoria.objects.select_related('usuario')
     
     # Filtro por data
     data_filtro = request.GET.get('data')
     if data_filtro:
-        auditorias = auditorias.filter(data_hora__date=data_filtro)
+        # Faixa do dia em vez de data_hora__date, que impede o uso do índice
+        try:
+            dia = date.fromisoformat(data_filtro)
+        except ValueError:
+            dia = None
+        if dia:
+            auditorias = auditorias.filter(
+                data_hora__gte=timezone.make_aware(datetime.combine(dia, time.min)),
+                data_hora__lt=timezone.make_aware(datetime.combine(dia + timedelta(days=1), time.min))
+            )
     
     # Filtro por usuário
     usuario_filtro = request.GET.get('usuario')
@@ -618,7 +929,12 @@ def certificado_download(request, pk):
     """
     Download de certificado em PDF
     """
-    certificado = get_object_or_404(Certificado, pk=pk)
+    certificado = get_object_or_404(
+        Certificado.objects.select_related(
+            'inscricao__usuario', 'inscricao__evento__organizador'
+        ),
+        pk=pk
+    )
     
     # Verifica permissão
     if certificado.inscricao.usuario != request.user:
@@ -628,15 +944,12 @@ def certificado_download(request, pk):
         )
         return redirect('meus_certificados')
     
-    # TODO: Implementar geração de PDF
-    # Por enquanto, retorna uma resposta simples
-    
-    html_content = render_to_string('eventos/certificado_pdf.html', {
-        'certificado': certificado,
-        'inscricao': certificado.inscricao,
-        'evento': certificado.inscricao.evento,
-        'usuario': certificado.inscricao.usuario,
-    })
+    # Renderiza apenas se o PDF com o hash atual ainda não estiver no storage
+    obter_pdf_certificado(certificado)
     
-    return HttpResponse(html_content, content_type='text/html')
-    # Para produção, usar biblioteca como reportlab ou weasyprint
+    return FileResponse(
+        certificado.arquivo_pdf.open('rb'),
+        as_attachment=True,
+        filename=f'certificado-{certificado.codigo_verificacao}.pdf',
+        content_type='application/pdf'
+    )
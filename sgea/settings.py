@@ -33,6 +33,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'eventos.middleware.ConsultasSQLMiddleware',  # Primeiro: conta todas as consultas da requisição
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -40,6 +41,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'eventos.middleware.AuditoriaBufferMiddleware',
 ]
 
 ROOT_URLCONF = 'sgea.urls'
@@ -68,6 +70,10 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Aguarda o lock de escrita em picos de inscrição em vez de falhar
+            'timeout': 20,
+        },
     }
 }
 
@@ -149,6 +155,53 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # Para desenvo
 # EMAIL_HOST_PASSWORD = 'sua-senha-de-app'
 
 DEFAULT_FROM_EMAIL = 'noreply@sgea.com'
+
+# Auditoria bufferizada: registros gravados em lote (bulk_create) quando o
+# lote enche, quando o mais antigo passa de INTERVALO segundos ou no fim do
+# processo. Com ATIVO = False cada registro é gravado na hora (os testes
+# desativam o buffer com override_settings).
+AUDITORIA_BUFFER = {
+    'ATIVO': True,
+    'TAMANHO_LOTE': 100,
+    'INTERVALO': 5.0,
+}
+
+# Consultas SQL por requisição (eventos.middleware.ConsultasSQLMiddleware):
+# acima do orçamento (PADRAO ou POR_URL, pelo nome da URL) ou de TEMPO_MS,
+# um aviso é registrado no log 'eventos.consultas'. SERVER_TIMING põe o total
+# e o tempo no cabeçalho Server-Timing; fica só em desenvolvimento, pois
+# expõe o custo de cada página a qualquer visitante
+ORCAMENTO_CONSULTAS = {
+    'ATIVO': True,
+    'SERVER_TIMING': DEBUG,
+    'PADRAO': 20,
+    'TEMPO_MS': 200,
+    'POR_URL': {},
+}
+
+# Chave dos códigos de verificação assinados dos certificados
+# (eventos/codigos_certificado.py). Obrigatória e independente da SECRET_KEY:
+# trocá-la invalida os códigos já impressos, então não a rotacione junto com
+# o segredo do Django. Use uma chave própria em produção.
+CERTIFICADO_CHAVE_ASSINATURA = 'django-insecure-certificados-troque-em-producao'
+
+# Resultado de certificado_validar em cache por código (segundos); os
+# inválidos ficam pouco tempo para absorver varreduras de códigos aleatórios
+CERTIFICADO_VALIDACAO_CACHE = {
+    'TTL': 60 * 60,
+    'TTL_NEGATIVO': 60,
+}
+
+# Intervalo (segundos) para recarregar do banco o índice de autocompletar de
+# cada processo; entre recargas ele é mantido pelos signals de Evento. A
+# recarga roda em uma thread, fora das requisições (False: na própria
+# requisição, usado nos testes). A primeira carga começa quando o processo
+# sobe (sgea/wsgi.py); uma consulta que chegue antes de ela terminar espera
+# até AUTOCOMPLETAR_ESPERA_INICIAL segundos
+AUTOCOMPLETAR_RECARGA = 300
+AUTOCOMPLETAR_SEGUNDO_PLANO = True
+AUTOCOMPLETAR_ESPERA_INICIAL = 2.0
+
 SITE_URL = 'http://localhost:8000'  # Alterar para produção
 
 # Django REST Framework Configuration
@@ -167,7 +220,10 @@ REST_FRAMEWORK = {
         'user': '1000/day',  # Limite geral
         'eventos_list': '20/day',  # Limite para consulta de eventos
         'inscricoes_create': '50/day',  # Limite para inscrições
+        'eventos_changes': '500/day',  # Sincronização incremental (api/eventos/changes/)
+        'eventos_autocompletar': '2000/day',  # Autocompletar da busca (api/eventos/autocompletar/)
     },
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # Paginação por página; ?cursor= ativa o modo keyset (eventos e inscrições)
+    'DEFAULT_PAGINATION_CLASS': 'eventos.pagination.PaginacaoKeyset',
     'PAGE_SIZE': 10,
 }
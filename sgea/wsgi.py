@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sgea.settings')
 
 application = get_wsgi_application()
+
+# Primeira carga do índice do autocompletar assim que o processo sobe, fora
+# das requisições (comandos de gerenciamento e testes não passam por aqui)
+from eventos.autocompletar import agendar_recarga  # noqa: E402
+
+agendar_recarga()